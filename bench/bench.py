@@ -0,0 +1,175 @@
+"""Scenario benchmarks for the game loop.
+
+    python bench/bench.py                              # все сценарии, результат в bench/results.json
+    python bench/bench.py --scenario mixed --ticks 600
+    python bench/bench.py --output bench/baseline.json # сохранить базовую линию
+    python bench/bench.py --compare bench/baseline.json  # прогнать и сравнить, код возврата 1 при регрессии
+"""
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import subprocess
+import contextlib
+from collections import deque
+
+# Без окна и звука: замер должен работать на CI
+os.environ["SPACE_MOUSE_HEADLESS"] = "1"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import pygame
+    import numpy
+    import main
+from profiler import profiler
+from rng import rng
+from timestep import game_clock
+from scenarios import SCENARIOS
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+
+def new_game(seed):
+    rng.seed(seed)
+    game_clock.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        achievements = main.Achievements(main.config)
+    # Замер не зависит от сохранения на этой машине
+    achievements.stats = {k: type(v)() for k, v in achievements.stats.items()}
+    achievements.achievements = {k: False for k in achievements.achievements}
+    state = main.reset_game_state(2)
+    game_api = main.build_game_api(state, achievements)
+    state = game_api["reset_game_state"](2, game_api)
+    state["current_event_name"] = ""
+    state["current_event_timer"] = 0
+    game_api["state"] = state
+    game_api["player"] = state["player"]
+    game_api["camera"] = state["camera"]
+    return game_api, achievements
+
+def run_scenario(name, ticks, warmup, draw, seed):
+    game_api, achievements = new_game(seed)
+    scene = SCENARIOS[name]()
+    scene.setup(game_api)
+    profiler.history = deque(maxlen=ticks)
+    profiler.count_history = deque(maxlen=ticks)
+    profiler.enabled = True
+    start = time.perf_counter()
+    for i in range(warmup + ticks):
+        if i == warmup:
+            profiler.clear()
+            start = time.perf_counter()
+        state = game_api["state"]
+        scene.refill(game_api)
+        profiler.start()
+        game_clock.tick()
+        main.run_tick(state, achievements, game_api)
+        if draw:
+            game_api["draw_game"](state, achievements, main.screen, main.config, game_api)
+            profiler.lap("draw")
+        profiler.count(state)
+        profiler.end()
+    elapsed = time.perf_counter() - start
+    profiler.enabled = False
+    phases = profiler.summary()
+    totals = {}
+    for counts in profiler.count_history:
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    return {
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed,
+        "phases": phases,
+        "counts": {key: value / ticks for key, value in totals.items()},
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def compare(results, baseline, threshold, min_delta):
+    """Print per-phase changes against baseline; return the list of regressions."""
+    regressions = []
+    for name, run in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            print(f"{name}: нет в базовой линии")
+            continue
+        print(f"{name}:")
+        for phase, stats in run["phases"].items():
+            old = base["phases"].get(phase)
+            if old is None:
+                continue
+            new_ms, old_ms = stats["mean_ms"], old["mean_ms"]
+            change = (new_ms - old_ms) / old_ms if old_ms > 0 else 0.0
+            # Мелкие фазы шумят: регрессией считается рост и в процентах, и в миллисекундах
+            regressed = change > threshold and new_ms - old_ms > min_delta
+            mark = "  РЕГРЕССИЯ" if regressed else ""
+            print(f"  {phase:<22}{old_ms:9.3f} -> {new_ms:9.3f} мс  {change:+7.1%}{mark}")
+            if regressed:
+                regressions.append((name, phase, old_ms, new_ms))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Space Mouse Flyer scenario benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--ticks", type=int, default=600, help="measured ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="ticks before measuring (caches, pools)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-draw", dest="draw", action="store_false", help="measure the logic only")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a stored results file")
+    parser.add_argument("--results", metavar="PATH", help="compare these stored results instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns smaller than this many ms")
+    return parser.parse_args(argv)
+
+def main_bench(argv=None):
+    args = parse_args(argv)
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        results = {
+            "meta": {
+                "revision": git_revision(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "numpy": numpy.__version__,
+                "platform": platform.platform(),
+                "ticks": args.ticks,
+                "draw": args.draw,
+                "seed": args.seed,
+            },
+            "scenarios": {},
+        }
+        for name in args.scenario or list(SCENARIOS):
+            run = run_scenario(name, args.ticks, args.warmup, args.draw, args.seed)
+            results["scenarios"][name] = run
+            total = run["phases"]["total"]
+            print(f"{name:<20}{total['mean_ms']:8.2f} мс/тик  p95 {total['p95_ms']:7.2f}  p99 {total['p99_ms']:7.2f}  {run['ticks_per_second']:8.0f} тиков/с")
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Результаты записаны в {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"Регрессий: {len(regressions)}")
+            return 1
+        print("Регрессий нет")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_bench())
@@ -0,0 +1,95 @@
+import math
+import pygame
+from rng import rng
+from settings import *
+
+SCENARIOS = {}
+
+def scenario(name):
+    def register(cls):
+        SCENARIOS[name] = cls
+        cls.name = name
+        return cls
+    return register
+
+def around(center, near, far):
+    angle = rng.uniform(0, 2 * math.pi)
+    dist = rng.uniform(near, far)
+    return pygame.Vector2(center.x + math.cos(angle) * dist, center.y + math.sin(angle) * dist)
+
+class Scenario:
+    """Stress scene built through reset_game_state and game_api; refill() keeps the load steady."""
+    enemies = 0
+    bullets = 0
+    enemy_bullets = 0
+    explosions = 0
+    blackholes = 0
+    meteor_shower = False
+
+    def setup(self, game_api):
+        player = game_api["player"]
+        # Игрок неуязвим, иначе сцена закончится смертью и замер станет нечестным
+        player.apply_effect("shield", duration=10 ** 9)
+        self.refill(game_api)
+
+    def refill(self, game_api):
+        state = game_api["state"]
+        player = state["player"]
+        config = game_api["config"]
+        types = ["default", "fast", "tank", "zigzag"]
+        while len(state["enemies"]) < self.enemies:
+            game_api["spawn_enemy"](around(player.pos, 300, 1500), types[len(state["enemies"]) % len(types)])
+        projectiles = state["projectiles"]
+        for key, owner, target, lifetime in (("bullets", 0, self.bullets, BULLET_LIFETIME), ("enemy_bullets", 1, self.enemy_bullets, ENEMY_BULLET_LIFETIME)):
+            bullets = state[key]
+            count = len(bullets) + int((projectiles.owner[:projectiles.count] == owner).sum())
+            for _ in range(target - count):
+                angle = rng.uniform(0, 2 * math.pi)
+                velocity = pygame.Vector2(math.cos(angle), math.sin(angle)) * BULLET_SPEED
+                bullets.spawn(around(player.pos, 0, 1200), velocity, BULLET_SPEED, (255, 255, 255), lifetime, config)
+        while len(state["explosions"]) < self.explosions:
+            game_api["spawn_explosion"](around(player.pos, 0, 900), (255, 200, 50), rng.choice(["big", "small", "hollow"]))
+        while len(state["blackholes"]) < self.blackholes:
+            state["blackholes"].append(game_api["BlackHole"](around(player.pos, 300, 700), config))
+        if self.meteor_shower:
+            state["event_active"] = "meteor_shower"
+            state["event_duration"] = 10 ** 6
+            state["event_timer"] = 10 ** 6
+            state["current_event_name"] = "Метеоритный дождь!"
+
+@scenario("idle")
+class Idle(Scenario):
+    pass
+
+@scenario("enemies_500")
+class Enemies(Scenario):
+    enemies = 500
+
+@scenario("enemies_2k")
+class Swarm(Scenario):
+    enemies = 2000
+
+@scenario("bullets_5k")
+class Bullets(Scenario):
+    enemies = 50
+    bullets = 4000
+    enemy_bullets = 1000
+
+@scenario("meteor_blackholes")
+class MeteorShower(Scenario):
+    enemies = 20
+    blackholes = 2
+    meteor_shower = True
+
+@scenario("explosions_200")
+class Explosions(Scenario):
+    explosions = 200
+
+@scenario("mixed")
+class Mixed(Scenario):
+    enemies = 150
+    bullets = 1000
+    enemy_bullets = 500
+    explosions = 100
+    blackholes = 2
+    meteor_shower = True
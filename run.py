@@ -10,4 +10,4 @@ import importlib.util
 main = importlib.import_module("main")
 
 if __name__ == "__main__":
-    main.main()
\ No newline at end of file
+    main.main(**vars(main.parse_args()))
\ No newline at end of file
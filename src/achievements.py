@@ -1,7 +1,179 @@
 import pygame
 import os
 import json
+import time
+import operator
 from settings import *
+from text import text_cache
+from saves import save_writer
+from dispatch import dispatch
+
+_MISSING = object()
+
+class TrackedDict(dict):
+    """Dict that bumps `version` and calls `listeners(key)` whenever a value actually changes (None — many keys)."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.listeners = []
+
+    def __setitem__(self, key, value):
+        old = dict.get(self, key, _MISSING)
+        dict.__setitem__(self, key, value)
+        if old is _MISSING or old != value:
+            self.version += 1
+            for listener in self.listeners:
+                listener(key)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version += 1
+        for listener in self.listeners:
+            listener(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        self.version += 1
+        value = dict.pop(self, key, *args)
+        for listener in self.listeners:
+            listener(key)
+        return value
+
+    def clear(self):
+        dict.clear(self)
+        self.version += 1
+        for listener in self.listeners:
+            listener(None)
+
+def _tracked(value, previous=None):
+    # Версия новой таблицы продолжает старую, а подписчики переходят к ней и узнают о замене
+    tracked = value if isinstance(value, TrackedDict) else TrackedDict(value)
+    tracked.version = (previous.version if previous is not None else 0) + 1
+    if previous is not None and tracked is not previous:
+        tracked.listeners = previous.listeners
+        for listener in tracked.listeners:
+            listener(None)
+    return tracked
+
+OPERATORS = {
+    ">=": operator.ge, ">": operator.gt, "==": operator.eq, "!=": operator.ne, "<=": operator.le, "<": operator.lt,
+    "truthy": lambda value, target: bool(value) == target,
+}
+
+# Достижения ядра: (ключ, текст всплывашки, [(стат, оператор, значение), ...]).
+# Кроме статов условия видят "score" и "game_time" — их передаёт check()
+ACHIEVEMENT_RULES = [
+    ("first_blood", "Достижение: Первый фраг!", [("score", ">=", 1)]),
+    ("survivor", "Достижение: Выживший!", [("game_time", ">=", 60)]),
+    ("sharpshooter", "Достижение: Меткий стрелок!", [("shots_hit", ">=", 10)]),
+    ("unstoppable", "Достижение: Неостановим!", [("enemies_killed", ">=", 20)]),
+    ("long_run", "Достижение: Марафонец!", [("game_time", ">=", 180)]),
+    ("meteor_survivor", "Достижение: Пережить метеоритный дождь!", [("survived_meteor", "truthy", True)]),
+    ("blackhole_escape", "Достижение: Выбраться из черной дыры!", [("survived_blackhole", "truthy", True)]),
+    ("no_damage", "Достижение: Без единой царапины!", [("damage_taken", "==", 0), ("levels_completed", ">", 1)]),
+    ("bonus_collector", "Достижение: Коллекционер бонусов!", [("bonuses_collected", ">=", 10)]),
+    ("tank_slayer", "Достижение: Убийца танков!", [("tank_kills", ">=", 5)]),
+    ("fast_hunter", "Достижение: Охотник на быстрых!", [("fast_kills", ">=", 10)]),
+    ("zigzag_master", "Достижение: Мастер зигзага!", [("zigzag_kills", ">=", 10)]),
+    ("combo_killer", "Достижение: Комбо-киллер!", [("combo_counter", ">=", 3)]),
+    ("shield_master", "Достижение: Мастер щита!", [("shield_collected", ">=", 5)]),
+    ("heal_master", "Достижение: Мастер лечения!", [("heal_collected", ">=", 5)]),
+]
+
+class AchievementRule:
+    """Unlocks `name` once every condition (key, operator, value) holds; operator may be a callable."""
+    def __init__(self, name, text, conditions, title=None, order=0, **kwargs):
+        self.name = name
+        self.text = text  # текст всплывашки
+        self.title = title  # подпись в списке достижений
+        self.conditions = [(key, OPERATORS.get(op, op), value) for key, op, value in conditions]
+        self.keys = {key for key, _, _ in self.conditions}
+        self.order = order
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def met(self, value):
+        # Отсутствующий стат считается нулём, как .get(key, 0) в прежних проверках
+        return all(op(value(key), target) for key, op, target in self.conditions)
+
+class AchievementRules:
+    """Rules indexed by the keys they read; only rules whose keys changed are re-evaluated.
+
+    Stats report changes through TrackedDict listeners, "score" and "game_time" through feed().
+    A rule is retired from the index once its achievement is unlocked.
+    """
+    def __init__(self, **kwargs):
+        self.rules = {}  # имя -> AchievementRule
+        self.index = {}  # ключ -> незаработанные правила, читающие его
+        self.dirty = {None}  # изменившиеся ключи; None — перепроверить всё
+        self.inputs = {}  # значения не из статов: score, game_time
+        self.version = None  # версия таблицы достижений, по которой собран index
+        self.evaluated = 0  # сколько проверок условий сделано (для замеров)
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def add(self, name, text, conditions, title=None, **kwargs):
+        rule = self.rules[name] = AchievementRule(name, text, conditions, title, len(self.rules), **kwargs)
+        self.version = None
+        self.dirty.add(None)
+        return rule
+
+    def remove(self, name):
+        self.rules.pop(name, None)
+        self.version = None
+
+    def reindex(self, achievements):
+        index = {}
+        for rule in self.rules.values():
+            if not achievements.get(rule.name, False):
+                for key in rule.keys:
+                    index.setdefault(key, []).append(rule)
+        self.index = index
+        self.version = achievements.version
+        self.dirty.add(None)
+
+    def retire(self, rule):
+        for key in rule.keys:
+            subscribed = self.index.get(key)
+            if subscribed is not None and rule in subscribed:
+                subscribed.remove(rule)
+                if not subscribed:
+                    del self.index[key]
+
+    def feed(self, key, value):
+        if key in self.index and self.inputs.get(key, _MISSING) != value:
+            self.inputs[key] = value
+            self.dirty.add(key)
+        else:
+            self.inputs[key] = value
+
+    def due(self):
+        """Unretired rules subscribed to the changed keys, in registration order; clears the changes."""
+        dirty = self.dirty
+        if None in dirty:
+            found = {id(rule): rule for subscribed in self.index.values() for rule in subscribed}
+        else:
+            found = {}
+            index = self.index
+            for key in dirty:
+                for rule in index.get(key, ()):
+                    found[id(rule)] = rule
+        dirty.clear()
+        return sorted(found.values(), key=lambda rule: rule.order)
+
+    def title(self, name, default=None):
+        rule = self.rules.get(name)
+        return rule.title if rule is not None and rule.title else default
 
 class Achievements:
     def __init__(self, config, game_api=None, **kwargs):
@@ -44,13 +216,19 @@ class Achievements:
             "survived_blackhole": False,
         })
         self.load()
+        self.rules = AchievementRules()
+        for name, text, conditions in ACHIEVEMENT_RULES:
+            self.rules.add(name, text, conditions)
         self.popup_queue = []
         self.active_popups = []
         self.POPUP_TIME = 90
+        self.autosave_at = time.monotonic() + AUTOSAVE_INTERVAL
 
         # Моды могут добавить любые новые поля через kwargs
         for k, v in kwargs.items():
             setattr(self, k, v)
+        self.stats.listeners.append(self.rules.dirty.add)
+        self.saved_version = self._version()
 
         # Позволяет модам заменить методы через game_api
         if game_api:
@@ -60,82 +238,66 @@ class Achievements:
             game_api["update_popups"] = self.update_popups
             game_api["show_popup"] = self.show_popup
             game_api["check_achievements"] = self.check
+            game_api["add_achievement"] = self.add_rule
+
+    # stats и achievements всегда хранятся как TrackedDict, даже если мод присвоит обычный dict
+    @property
+    def stats(self):
+        return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = _tracked(value, getattr(self, "_stats", None))
+
+    @property
+    def achievements(self):
+        return self._achievements
+
+    @achievements.setter
+    def achievements(self, value):
+        self._achievements = _tracked(value, getattr(self, "_achievements", None))
 
     def check(self, score, game_time, player, surface, achievement_sound=None, game_api=None):
-        # Моды могут заменить этот метод или расширить его через наследование
-        if game_api and "check_achievements" in game_api and game_api["check_achievements"] is not self.check:
-            return game_api["check_achievements"](score, game_time, player, surface, achievement_sound, game_api)
-        if score >= 1 and not self.achievements.get("first_blood", False):
-            self.achievements["first_blood"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Первый фраг!")
-        if game_time >= 60 and not self.achievements.get("survivor", False):
-            self.achievements["survivor"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Выживший!")
-        if self.stats.get("shots_hit", 0) >= 10 and not self.achievements.get("sharpshooter", False):
-            self.achievements["sharpshooter"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Меткий стрелок!")
-        if self.stats.get("enemies_killed", 0) >= 20 and not self.achievements.get("unstoppable", False):
-            self.achievements["unstoppable"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Неостановим!")
-        if game_time >= 180 and not self.achievements.get("long_run", False):
-            self.achievements["long_run"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Марафонец!")
-        if self.stats.get("survived_meteor", False) and not self.achievements.get("meteor_survivor", False):
-            self.achievements["meteor_survivor"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Пережить метеоритный дождь!")
-        if self.stats.get("survived_blackhole", False) and not self.achievements.get("blackhole_escape", False):
-            self.achievements["blackhole_escape"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Выбраться из черной дыры!")
-        if self.stats.get("damage_taken", 0) == 0 and self.stats.get("levels_completed", 1) > 1 and not self.achievements.get("no_damage", False):
-            self.achievements["no_damage"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Без единой царапины!")
-        if self.stats.get("bonuses_collected", 0) >= 10 and not self.achievements.get("bonus_collector", False):
-            self.achievements["bonus_collector"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Коллекционер бонусов!")
-        if self.stats.get("tank_kills", 0) >= 5 and not self.achievements.get("tank_slayer", False):
-            self.achievements["tank_slayer"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Убийца танков!")
-        if self.stats.get("fast_kills", 0) >= 10 and not self.achievements.get("fast_hunter", False):
-            self.achievements["fast_hunter"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Охотник на быстрых!")
-        if self.stats.get("zigzag_kills", 0) >= 10 and not self.achievements.get("zigzag_master", False):
-            self.achievements["zigzag_master"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Мастер зигзага!")
-        if self.stats.get("combo_counter", 0) >= 3 and not self.achievements.get("combo_killer", False):
-            self.achievements["combo_killer"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Комбо-киллер!")
-        if self.stats.get("shield_collected", 0) >= 5 and not self.achievements.get("shield_master", False):
-            self.achievements["shield_master"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Мастер щита!")
-        if self.stats.get("heal_collected", 0) >= 5 and not self.achievements.get("heal_master", False):
-            self.achievements["heal_master"] = True
-            if achievement_sound: achievement_sound.play()
-            self.show_popup("Достижение: Мастер лечения!")
-        # Моды могут добавить свои условия
+        # Моды могут заменить этот метод или расширить его через наследование.
+        # Свой же метод в game_api (его кладёт __init__) — не замена; связанные методы сравниваются через ==
+        if game_api and dispatch.check_achievements not in (None, self.check):
+            return dispatch.check_achievements(score, game_time, player, surface, achievement_sound, game_api)
+        rules = self.rules
+        achievements = self.achievements
+        # Таблицу достижений поменяли снаружи (сброс, мод) — правила заново подписываются на ключи
+        if achievements.version != rules.version:
+            rules.reindex(achievements)
+        rules.feed("score", score)
+        rules.feed("game_time", game_time)
+        if not rules.dirty:
+            return
+        inputs = rules.inputs
+        stats = self.stats
+        value = lambda key: inputs[key] if key in inputs else stats.get(key, 0)
+        for rule in rules.due():
+            rules.evaluated += 1
+            if rule.met(value):
+                achievements[rule.name] = True
+                rules.retire(rule)
+                if achievement_sound: achievement_sound.play()
+                self.show_popup(rule.text)
+        rules.version = achievements.version
+
+    def add_rule(self, name, text, conditions, title=None, **kwargs):
+        """Register an achievement unlocked when all conditions [(stat key, operator, value), ...] hold."""
+        if name not in self.achievements:
+            self.achievements[name] = False
+        return self.rules.add(name, text, conditions, title, **kwargs)
 
     def show_popup(self, text, surface=None, game_api=None):
         # Моды могут заменить этот метод для кастомных popup'ов
-        if game_api and "show_popup" in game_api and game_api["show_popup"] is not self.show_popup:
-            return game_api["show_popup"](text, surface, game_api)
+        if game_api and dispatch.show_popup not in (None, self.show_popup):
+            return dispatch.show_popup(text, surface, game_api)
         self.popup_queue.append(text)
 
     def update_popups(self, game_api=None):
-        if game_api and "update_popups" in game_api and game_api["update_popups"] is not self.update_popups:
-            return game_api["update_popups"](game_api)
+        if game_api and dispatch.update_popups not in (None, self.update_popups):
+            return dispatch.update_popups(game_api)
         while self.popup_queue and len(self.active_popups) < 3:
             text = self.popup_queue.pop(0)
             self.active_popups.append([text, self.POPUP_TIME])
@@ -144,21 +306,20 @@ class Achievements:
         self.active_popups = [p for p in self.active_popups if p[1] > 0]
 
     def draw_popups(self, surface, game_api=None):
-        if game_api and "draw_popups" in game_api and game_api["draw_popups"] is not self.draw_popups:
-            return game_api["draw_popups"](surface, game_api)
-        font = pygame.font.SysFont("consolas", 36)
+        if game_api and dispatch.draw_popups not in (None, self.draw_popups):
+            return dispatch.draw_popups(surface, game_api)
         base_y = self.config.height // 2 - 200
         for i, (text, timer) in enumerate(self.active_popups):
             alpha = min(255, int(255 * min(1, timer / 15))) if timer < 20 else 255
-            surf = font.render(text, True, (255, 255, 0))
+            surf = text_cache.render(text, (255, 255, 0), "consolas", 36)
+            # Поверхность из кеша общая, поэтому прозрачность выставляется при каждом выводе
             surf.set_alpha(alpha)
             rect = surf.get_rect(center=(self.config.width // 2, base_y + i * 60))
             surface.blit(surf, rect)
 
-    def draw_achievements(self, surface, game_api=None):
-        if game_api and "draw_achievements" in game_api and game_api["draw_achievements"] is not self.draw_achievements:
-            return game_api["draw_achievements"](surface, game_api)
-        font = pygame.font.SysFont("consolas", 24)
+    def draw_achievements(self, surface, game_api=None, origin=(0, 0)):
+        if game_api and dispatch.draw_achievements not in (None, self.draw_achievements):
+            return dispatch.draw_achievements(surface, game_api)
         achv_names = {
             "first_blood": "Первый фраг",
             "survivor": "Выживший (60с)",
@@ -176,22 +337,21 @@ class Achievements:
             "shield_master": "Мастер щита",
             "heal_master": "Мастер лечения",
         }
-        x = self.config.width - 320
-        y = 220
-        header = font.render("Достижения:", True, (255, 255, 0))
+        x = self.config.width - 320 - origin[0]
+        y = 220 - origin[1]
+        header = text_cache.render("Достижения:", (255, 255, 0), "consolas", 24)
         surface.blit(header, (x, y))
         y += 30
         for key in self.achievements:
             unlocked = self.achievements[key]
             color = (100, 255, 100) if unlocked else (100, 100, 100)
-            surf = font.render(achv_names.get(key, key), True, color)
+            surf = text_cache.render(achv_names.get(key) or self.rules.title(key, key), color, "consolas", 24)
             surface.blit(surf, (x, y))
             y += 28
 
-    def draw_stats(self, surface, game_api=None):
-        if game_api and "draw_stats" in game_api and game_api["draw_stats"] is not self.draw_stats:
-            return game_api["draw_stats"](surface, game_api)
-        font = pygame.font.SysFont("consolas", 24)
+    def draw_stats(self, surface, game_api=None, origin=(0, 0)):
+        if game_api and dispatch.draw_stats not in (None, self.draw_stats):
+            return dispatch.draw_stats(surface, game_api)
         stats = [
             f"Врагов убито: {self.stats.get('enemies_killed', 0)}",
             f"Выстрелов: {self.stats.get('shots_fired', 0)}",
@@ -200,28 +360,38 @@ class Achievements:
             f"Уровень: {self.stats.get('levels_completed', 1)}",
             f"Точность: {self.stats['shots_hit'] / self.stats['shots_fired'] * 100:.1f}%" if self.stats.get('shots_fired', 0) > 0 else "Точность: 0.0%"
         ]
-        x = self.config.width - 320
-        y = 30
-        header = font.render("Статистика:", True, (180, 180, 255))
+        x = self.config.width - 320 - origin[0]
+        y = 30 - origin[1]
+        header = text_cache.render("Статистика:", (180, 180, 255), "consolas", 24)
         surface.blit(header, (x, y))
         y += 30
         for line in stats:
-            surf = font.render(line, True, (180, 180, 255))
+            surf = text_cache.render(line, (180, 180, 255), "consolas", 24)
             surface.blit(surf, (x, y))
             y += 28
 
+    def _version(self):
+        return (self.stats.version, self.achievements.version)
+
     def save(self):
+        # Снимок делается сразу, а сериализация и запись идут в фоновом потоке (см. saves.py)
         data = {
-            "achievements": self.achievements,
-            "stats": self.stats,
+            "achievements": dict(self.achievements),
+            "stats": dict(self.stats),
         }
-        try:
-            with open(SAVE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"Progress saved to {SAVE_FILE}")
-            pygame.time.delay(500)
-        except IOError as e:
-            print(f"Failed to save progress to {SAVE_FILE}: {e}")
+        self.saved_version = self._version()
+        save_writer.request(data)
+
+    def autosave(self, now=None):
+        """Save if AUTOSAVE_INTERVAL has passed and progress changed; cheap enough for every frame."""
+        now = time.monotonic() if now is None else now
+        if now < self.autosave_at:
+            return False
+        self.autosave_at = now + AUTOSAVE_INTERVAL
+        if self._version() == self.saved_version:
+            return False
+        self.save()
+        return True
 
     def load(self):
         try:
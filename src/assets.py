@@ -0,0 +1,154 @@
+import pygame
+import os
+import weakref
+from collections import OrderedDict
+from settings import *
+
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
+
+class AssetManager:
+    def __init__(self, path=ASSETS_PATH, max_scaled=ASSET_CACHE_SIZE, **kwargs):
+        self.path = path
+        self.max_scaled = max_scaled
+        self.surfaces = {}  # имя файла -> декодированная поверхность (None, если файла нет)
+        self.raw = {}  # имя файла -> поверхность, прочитанная заранее, но ещё не приведённая к формату экрана
+        self.scaled = OrderedDict()  # (имя файла, размер) -> масштабированная копия, LRU
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def exists(self, name):
+        return self._load(name) is not None
+
+    def _load(self, name):
+        if name in self.surfaces:
+            return self.surfaces[name]
+        surf = None
+        path = os.path.join(self.path, name)
+        raw = self.raw.pop(name, None)
+        if raw is not None:
+            surf = raw.convert_alpha()
+        elif os.path.exists(path):
+            try:
+                surf = pygame.image.load(path).convert_alpha()
+            except Exception as e:
+                # print("Не удалось загрузить спрайт:", name, e)
+                surf = None
+        # Отсутствующие файлы тоже кешируются, чтобы не дёргать диск каждый кадр
+        self.surfaces[name] = surf
+        return surf
+
+    def preload(self, name):
+        # Чтение и распаковка файла без convert_alpha: можно звать из фонового потока
+        if name in self.surfaces or name in self.raw:
+            return
+        try:
+            self.raw[name] = pygame.image.load(os.path.join(self.path, name))
+        except Exception:
+            pass
+
+    def get(self, name):
+        """Decoded surface for an asset file, loaded from disk only once."""
+        if name in self.surfaces:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return self._load(name)
+
+    def get_scaled(self, name, size, fallback=None):
+        """Scaled copy of an asset; falls back to another file if the first is missing."""
+        if fallback and not self.exists(name):
+            name = fallback
+        size = (int(size[0]), int(size[1]))
+        key = (name, size)
+        if key in self.scaled:
+            self.hits += 1
+            self.scaled.move_to_end(key)
+            return self.scaled[key]
+        self.misses += 1
+        surf = self._load(name)
+        if surf is None:
+            return None
+        scaled = pygame.transform.smoothscale(surf, size)
+        self.scaled[key] = scaled
+        if len(self.scaled) > self.max_scaled:
+            self.scaled.popitem(last=False)
+            self.evictions += 1
+        return scaled
+
+    def register(self, name, surface):
+        # Моды могут подложить свою поверхность под любым именем
+        self.surfaces[name] = surface
+        for key in [k for k in self.scaled if k[0] == name]:
+            del self.scaled[key]
+
+    def clear(self):
+        self.surfaces.clear()
+        self.raw.clear()
+        self.scaled.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "surfaces": len(self.surfaces),
+            "scaled": len(self.scaled),
+        }
+
+class RotationAtlas:
+    def __init__(self, steps=ROTATION_STEPS, **kwargs):
+        self.steps = steps
+        # Кадры живут ровно столько, сколько исходный спрайт
+        self.frames = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def index(self, angle):
+        return int(round(angle * self.steps / 360.0)) % self.steps
+
+    def get(self, surface, angle):
+        """Nearest pre-rotated frame of surface; frames are rendered lazily."""
+        frames = self.frames.get(surface)
+        if frames is None:
+            frames = [None] * self.steps
+            self.frames[surface] = frames
+        i = self.index(angle)
+        frame = frames[i]
+        if frame is None:
+            self.misses += 1
+            frame = pygame.transform.rotate(surface, i * 360.0 / self.steps)
+            frames[i] = frame
+        else:
+            self.hits += 1
+        return frame
+
+    def build(self, surface):
+        # Отрендерить все углы сразу (например, при загрузке уровня)
+        for i in range(self.steps):
+            self.get(surface, i * 360.0 / self.steps)
+
+    def invalidate(self, surface):
+        # Вызывать после рисования в исходный спрайт
+        self.frames.pop(surface, None)
+
+    def set_steps(self, steps):
+        self.steps = steps
+        self.frames = weakref.WeakKeyDictionary()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sprites": len(self.frames),
+            "steps": self.steps,
+        }
+
+assets = AssetManager()
+rotations = RotationAtlas()
@@ -0,0 +1,135 @@
+import time
+import pygame
+from settings import *
+
+class SoundRule:
+    def __init__(self, priority=1, voices=4, interval=0, **kwargs):
+        self.priority = priority  # чем выше, тем важнее: может занять резерв и вытеснить тихие звуки
+        self.voices = voices  # сколько копий звука может звучать одновременно
+        self.interval = interval  # мс между запусками; чаще — запуск пропускается
+        self.channels = []  # каналы, на которых сейчас может звучать этот звук
+        self.last = -1e9
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+class Cue:
+    def __init__(self, audio, name):
+        self.audio = audio
+        self.name = name
+
+    def play(self, *args, **kwargs):
+        return self.audio.play(self.name)
+
+class AudioManager:
+    """Plays sounds by name on a managed channel pool.
+
+    Each sound has a priority, a voice limit and a minimum re-trigger interval (see AUDIO_RULES).
+    The first AUDIO_RESERVED channels are kept for sounds with priority >= AUDIO_RESERVED_PRIORITY,
+    and when every channel is busy a new sound replaces the oldest lower-priority one.
+    Sounds with a world position are panned by their offset from the camera.
+    """
+    def __init__(self, **kwargs):
+        self.sounds = {}  # словарь звуков по умолчанию (game_api["sounds"])
+        self.rules = {name: SoundRule(**rule) for name, rule in AUDIO_RULES.items()}
+        self.default = dict(priority=1, voices=4, interval=0)  # правило для звуков без записи в rules
+        self.owners = {}  # канал -> (приоритет, время запуска)
+        self.channels = []
+        self.half_width = 960
+        self.played = 0
+        self.throttled = 0
+        self.dropped = 0
+        self.stolen = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def setup(self, sounds, config=None):
+        self.sounds = sounds
+        if config is not None:
+            self.half_width = config.width / 2
+        if pygame.mixer.get_init() is None:
+            return
+        pygame.mixer.set_num_channels(AUDIO_CHANNELS)
+        pygame.mixer.set_reserved(AUDIO_RESERVED)
+        self.channels = [pygame.mixer.Channel(i) for i in range(AUDIO_CHANNELS)]
+        self.owners = {}
+
+    def rule(self, name, priority=None, voices=None, interval=None):
+        """Rule of a sound, created on first use; mods may pass new limits for their own sounds."""
+        rule = self.rules.get(name)
+        if rule is None:
+            rule = self.rules[name] = SoundRule(**self.default)
+        if priority is not None:
+            rule.priority = priority
+        if voices is not None:
+            rule.voices = voices
+        if interval is not None:
+            rule.interval = interval
+        return rule
+
+    def play(self, name, pos=None, camera_pos=None, sounds=None):
+        """Play sounds[name]; pos and camera_pos (world) pan it left/right. Returns the channel or None."""
+        sound = (self.sounds if sounds is None else sounds).get(name)
+        if sound is None:
+            return None
+        rule = self.rules.get(name) or self.rule(name)
+        now = time.perf_counter() * 1000
+        if now - rule.last < rule.interval:
+            self.throttled += 1
+            return None
+        rule.last = now
+        sound = sound.resolve() if hasattr(sound, "resolve") else sound
+        if not self.channels or not isinstance(sound, pygame.mixer.Sound):
+            # Без микшера (безголовый режим) или свой объект мода — как раньше
+            self.played += 1
+            return sound.play()
+        channel = self._channel(rule, sound, now)
+        if channel is None:
+            self.dropped += 1
+            return None
+        channel.play(sound)
+        # Панорама остаётся у канала от прошлого звука, поэтому задаётся при каждом запуске
+        if pos is not None and camera_pos is not None:
+            pan = max(-1.0, min(1.0, (pos[0] - camera_pos[0]) / self.half_width))
+            channel.set_volume(min(1.0, 1.0 - pan), min(1.0, 1.0 + pan))
+        else:
+            channel.set_volume(1.0)
+        self.owners[channel] = (rule.priority, now)
+        rule.channels.append(channel)
+        self.played += 1
+        return channel
+
+    def _channel(self, rule, sound, now):
+        # Свои голоса, которые уже отзвучали (или канал отдан другому звуку), забываются
+        voices = rule.channels = [ch for ch in rule.channels if ch.get_busy() and ch.get_sound() is sound]
+        if len(voices) >= rule.voices:
+            # Лимит голосов: самый старый голос этого звука начинается заново
+            oldest = min(voices, key=lambda ch: self.owners.get(ch, (0, 0))[1])
+            voices.remove(oldest)
+            return oldest
+        # Свободный канал: сначала из общих, резерв — только важным звукам.
+        # Каналы берутся из своего списка: pygame.mixer.Channel(i) каждый раз создаёт новый объект
+        reserved = AUDIO_RESERVED if rule.priority >= AUDIO_RESERVED_PRIORITY else 0
+        for channel in self.channels[AUDIO_RESERVED:] + self.channels[:reserved]:
+            if not channel.get_busy():
+                return channel
+        # Все каналы заняты: вытесняется самый старый звук с меньшим приоритетом
+        victim = None
+        for channel, (priority, started) in self.owners.items():
+            if priority < rule.priority and channel.get_busy() and (victim is None or (priority, started) < self.owners[victim]):
+                victim = channel
+        if victim is not None:
+            victim.stop()
+            self.stolen += 1
+        return victim
+
+    def cue(self, name):
+        # Объект с play() для кода, который ждёт звук, а не имя (например, Achievements.check)
+        return Cue(self, name)
+
+    def stats(self):
+        busy = sum(1 for ch in self.channels if ch.get_busy())
+        return {"played": self.played, "throttled": self.throttled, "dropped": self.dropped, "stolen": self.stolen, "busy": busy}
+
+audio = AudioManager()
@@ -1,9 +1,10 @@
 import pygame
 import math
-import os
 from settings import *
-
-ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
+from assets import assets
+from effects import effects
+from timestep import game_clock
+from dispatch import dispatch
 
 class BlackHole:
     def __init__(self, pos, config, game_api=None, **kwargs):
@@ -18,12 +19,7 @@ class BlackHole:
         for k, v in kwargs.items():
             setattr(self, k, v)
         if USE_SPRITES and self.sprite is None:
-            try:
-                self.sprite = pygame.image.load(os.path.join(ASSETS_PATH, "blackhole.png")).convert_alpha()
-                self.sprite = pygame.transform.smoothscale(self.sprite, (self.radius*2, self.radius*2))
-            except Exception as e:
-                # print("Не удалось загрузить спрайт черной дыры:", e)
-                self.sprite = None
+            self.sprite = assets.get_scaled("blackhole.png", (self.radius*2, self.radius*2))
 
     def update(self, game_api=None):
         self.age += 1
@@ -33,8 +29,8 @@ class BlackHole:
 
     def attract(self, obj, game_api=None):
         # Позволяет модам полностью заменить поведение притяжения
-        if game_api and "blackhole_attract" in game_api:
-            return game_api["blackhole_attract"](self, obj, game_api)
+        if game_api and dispatch.blackhole_attract is not None:
+            return dispatch.blackhole_attract(self, obj, game_api)
         direction = self.pos - obj.pos
         dist = direction.length()
         if dist < self.radius * 6:
@@ -43,19 +39,16 @@ class BlackHole:
 
     def draw(self, surface, camera_pos, game_api=None):
         # Позволяет модам полностью заменить отрисовку чёрной дыры
-        if game_api and "draw_blackhole" in game_api:
-            return game_api["draw_blackhole"](self, surface, camera_pos, game_api)
+        if game_api and dispatch.draw_blackhole is not None:
+            return dispatch.draw_blackhole(self, surface, camera_pos, game_api)
         draw_pos = self.pos - camera_pos + pygame.Vector2(self.config.width // 2, self.config.height // 2)
         if USE_SPRITES and self.sprite:
             rect = self.sprite.get_rect(center=draw_pos)
             surface.blit(self.sprite, rect)
         else:
-            t = pygame.time.get_ticks() * 0.002
+            t = game_clock.get_ticks() * 0.002
             accretion_radius = int(self.radius * 0.95 + 6 * math.sin(t*2))
-            accretion_surf = pygame.Surface((accretion_radius*2, accretion_radius*2), pygame.SRCALPHA)
-            for j in range(8):
-                color = (80+20*j, 80+10*j, 255, 30+j*18)
-                pygame.draw.circle(accretion_surf, color, (accretion_radius, accretion_radius), accretion_radius-j, width=2)
+            accretion_surf = effects.accretion(accretion_radius)
             surface.blit(accretion_surf, (draw_pos.x-accretion_radius, draw_pos.y-accretion_radius), special_flags=pygame.BLEND_ADD)
             pygame.draw.circle(surface, (0, 0, 0), (int(draw_pos.x), int(draw_pos.y)), int(self.radius * 0.6))
             for i in range(8):
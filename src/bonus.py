@@ -1,17 +1,24 @@
 import pygame
-import random
+from rng import rng
 import math
-import os
 from settings import *
+from assets import assets
+from dispatch import dispatch
+from pool import clear_fields
 
-ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
 BONUS_TYPES = ["heal", "shield"]
 
 class Bonus:
     def __init__(self, pos, config, bonus_type=None, game_api=None, **kwargs):
         self.pos = pygame.Vector2(pos)
+        self.reset(pos, config, bonus_type, game_api, **kwargs)
+
+    def reset(self, pos, config, bonus_type=None, game_api=None, **kwargs):
+        # Повторная инициализация объекта из пула (см. pool.py) без новых Vector2
+        clear_fields(self, "pos")
+        self.pos.update(pos)
         self.radius = kwargs.get("radius", 18)
-        self.type = bonus_type if bonus_type else kwargs.get("type", random.choice(BONUS_TYPES))
+        self.type = bonus_type if bonus_type else kwargs.get("type", rng.choice(BONUS_TYPES))
         self.config = config
         self.lifetime = kwargs.get("lifetime", 600)
         self.sprite = kwargs.get("sprite", None)
@@ -20,16 +27,7 @@ class Bonus:
         for k, v in kwargs.items():
             setattr(self, k, v)
         if USE_SPRITES and self.sprite is None:
-            try:
-                fname = f"bonus_{self.type}.png"
-                path = os.path.join(ASSETS_PATH, fname)
-                if not os.path.exists(path):
-                    path = os.path.join(ASSETS_PATH, "bonus.png")
-                self.sprite = pygame.image.load(path).convert_alpha()
-                self.sprite = pygame.transform.smoothscale(self.sprite, (self.radius*2, self.radius*2))
-            except Exception as e:
-                # print("Не удалось загрузить спрайт бонуса:", e)
-                self.sprite = None
+            self.sprite = assets.get_scaled(f"bonus_{self.type}.png", (self.radius*2, self.radius*2), fallback="bonus.png")
 
     def update(self, player=None, game_api=None):
         self.lifetime -= 1
@@ -49,8 +47,8 @@ class Bonus:
 
     def draw(self, surface, camera_pos, player=None, game_api=None):
         # Позволяет модам полностью заменить отрисовку бонуса
-        if game_api and "draw_bonus" in game_api:
-            return game_api["draw_bonus"](self, surface, camera_pos, player, game_api)
+        if game_api and dispatch.draw_bonus is not None:
+            return dispatch.draw_bonus(self, surface, camera_pos, player, game_api)
         draw_pos = self.pos - camera_pos + pygame.Vector2(self.config.width // 2, self.config.height // 2)
         pulse = 1.0
         if player:
@@ -1,13 +1,21 @@
 import pygame
-import os
 from settings import *
-
-ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
+from assets import assets, rotations
+from dispatch import dispatch
+from pool import clear_fields
 
 class Bullet:
     def __init__(self, pos, velocity, speed, color, lifetime, config, is_enemy=False, game_api=None, **kwargs):
         self.pos = pygame.Vector2(pos)
-        self.dir = velocity.normalize()
+        self.dir = pygame.Vector2(velocity)
+        self.reset(pos, velocity, speed, color, lifetime, config, is_enemy, game_api, **kwargs)
+
+    def reset(self, pos, velocity, speed, color, lifetime, config, is_enemy=False, game_api=None, **kwargs):
+        # Повторная инициализация объекта из пула (см. pool.py) без новых Vector2
+        clear_fields(self, "pos", "dir")
+        self.pos.update(pos)
+        self.dir.update(velocity)
+        self.dir.normalize_ip()
         self.speed = speed
         self.color = color
         self.lifetime = lifetime
@@ -20,13 +28,8 @@ class Bullet:
         for k, v in kwargs.items():
             setattr(self, k, v)
         if USE_SPRITES and self.sprite is None:
-            try:
-                fname = "enemy_bullet.png" if self.is_enemy else "bullet.png"
-                self.sprite = pygame.image.load(os.path.join(ASSETS_PATH, fname)).convert_alpha()
-                self.sprite = pygame.transform.smoothscale(self.sprite, (18, 18))
-            except Exception as e:
-                # print("Не удалось загрузить спрайт пули:", e)
-                self.sprite = None
+            fname = "enemy_bullet.png" if self.is_enemy else "bullet.png"
+            self.sprite = assets.get_scaled(fname, (18, 18))
 
     def update(self, game_api=None):
         self.pos += self.dir * self.speed
@@ -34,12 +37,12 @@ class Bullet:
 
     def draw(self, surface, camera_pos, game_api=None):
         # Позволяет модам полностью заменить отрисовку пули
-        if game_api and "draw_bullet" in game_api:
-            return game_api["draw_bullet"](self, surface, camera_pos, game_api)
+        if game_api and dispatch.draw_bullet is not None:
+            return dispatch.draw_bullet(self, surface, camera_pos, game_api)
         draw_pos = self.pos - camera_pos + pygame.Vector2(self.config.width // 2, self.config.height // 2)
         if USE_SPRITES and self.sprite:
             angle = -self.dir.angle_to(pygame.Vector2(0, -1))
-            rotated = pygame.transform.rotate(self.sprite, angle)
+            rotated = rotations.get(self.sprite, angle)
             rect = rotated.get_rect(center=(int(draw_pos.x), int(draw_pos.y)))
             surface.blit(rotated, rect)
         else:
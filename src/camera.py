@@ -1,6 +1,7 @@
 import pygame
-import random
+from rng import rng
 import math
+from dispatch import dispatch
 
 class Camera:
     def __init__(self, start_pos, game_api=None, **kwargs):
@@ -17,13 +18,13 @@ class Camera:
 
     def update(self, player_pos, game_api=None):
         # Позволяет модам полностью заменить поведение камеры
-        if game_api and "update_camera" in game_api:
-            return game_api["update_camera"](self, player_pos, game_api)
+        if game_api and dispatch.update_camera is not None:
+            return dispatch.update_camera(self, player_pos, game_api)
         self.target = pygame.Vector2(player_pos)
         self.pos += (self.target - self.pos) * 0.12 + self.kick
         self.kick *= self.kick_decay
         if self.shake_timer > 0:
-            angle = random.uniform(0, 2 * math.pi)
+            angle = rng.uniform(0, 2 * math.pi)
             strength = self.shake_strength * (self.shake_timer / 20)
             self.shake_offset = pygame.Vector2(math.cos(angle), math.sin(angle)) * strength
             self.shake_timer -= 1
@@ -0,0 +1,96 @@
+_MISSING = object()
+
+class GameAPI(dict):
+    """game_api dict that tells its listeners which key changed (None — many keys at once)."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.listeners = []
+
+    def _changed(self, key):
+        for listener in self.listeners:
+            listener(key)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._changed(key)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed(key)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._changed(None)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *args):
+        value = dict.pop(self, key, *args)
+        self._changed(key)
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._changed(item[0])
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self._changed(None)
+
+class Dispatch:
+    """Resolved overrides: dispatch.<name> is game_api[name] if present, else the core default (or None).
+
+    Core code reads these attributes instead of looking names up in game_api on every call;
+    a GameAPI bound with bind() re-resolves a name whenever a mod assigns or deletes it.
+    """
+    def __init__(self, **kwargs):
+        self.api = None
+        self.defaults = {}  # имя -> реализация ядра
+        self.names = set()  # имена, за которыми следит таблица
+        self.rebuilds = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def register(self, *names, **defaults):
+        """Track names: hooks without a core version (*names) and core implementations (**defaults)."""
+        self.defaults.update(defaults)
+        for name in names + tuple(defaults):
+            self.names.add(name)
+            self._resolve(name)
+
+    def bind(self, game_api):
+        if self.api is not None and self.on_change in getattr(self.api, "listeners", ()):
+            self.api.listeners.remove(self.on_change)
+        self.api = game_api
+        # Обычный dict тоже принимается, но тогда изменения нужно применять через rebuild()
+        if hasattr(game_api, "listeners"):
+            game_api.listeners.append(self.on_change)
+        self.rebuild()
+
+    def rebuild(self):
+        for name in self.names:
+            self._resolve(name)
+        self.rebuilds += 1
+
+    def on_change(self, key):
+        if key is None:
+            self.rebuild()
+        elif key in self.names:
+            self._resolve(key)
+
+    def _resolve(self, name):
+        value = self.api.get(name, _MISSING) if self.api is not None else _MISSING
+        setattr(self, name, self.defaults.get(name) if value is _MISSING else value)
+
+dispatch = Dispatch()
+# Хуки объектов: у них нет версии ядра, метод объекта работает сам, пока хук не задан
+dispatch.register(
+    "blackhole_attract", "draw_blackhole", "draw_bonus", "draw_bullet", "update_camera",
+    "update_enemy", "enemy_is_hit", "draw_enemy", "draw_explosion", "draw_meteor", "draw_player",
+    "check_achievements", "show_popup", "update_popups", "draw_popups", "draw_achievements", "draw_stats",
+)
@@ -0,0 +1,89 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+class EffectBaker:
+    def __init__(self, max_bytes=EFFECT_CACHE_BYTES, **kwargs):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()  # ключ параметров кадра -> поверхность, LRU
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def frame(self, key, build):
+        """Cached frame for key; build() renders it on the first request."""
+        surf = self.frames.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.frames.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = build()
+        self.frames[key] = surf
+        self.bytes += surf.get_width() * surf.get_height() * surf.get_bytesize()
+        # Память ограничена в байтах: кадры сильно различаются по размеру
+        while self.bytes > self.max_bytes and len(self.frames) > 1:
+            _, old = self.frames.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+        return surf
+
+    def circle(self, color, alpha, radius, width=0, size=None):
+        """Circle (filled when width is 0) centred on a transparent square of side 2 * size."""
+        size = radius if size is None else size
+        key = ("circle", tuple(color[:3]), alpha, radius, width, size)
+
+        def build():
+            surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*color[:3], alpha), (size, size), radius, width)
+            return surf
+
+        return self.frame(key, build)
+
+    def accretion(self, radius):
+        # Кольца аккреционного диска чёрной дыры зависят только от радиуса
+        def build():
+            surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            for j in range(8):
+                color = (80+20*j, 80+10*j, 255, 30+j*18)
+                pygame.draw.circle(surf, color, (radius, radius), radius-j, width=2)
+            return surf
+
+        return self.frame(("accretion", radius), build)
+
+    def explosion(self, explosion):
+        """Frame of a core Explosion at its current age."""
+        progress = explosion.age / explosion.frames
+        if explosion.type == "hollow":
+            radius = int(explosion.radius - (explosion.radius - explosion.min_radius) * progress)
+            alpha = max(0, 180 - int(180 * progress))
+            return self.circle(explosion.color, alpha, radius, 5, size=explosion.radius)
+        radius = int(explosion.radius + (explosion.max_radius - explosion.radius) * progress)
+        alpha = max(0, 255 - int(255 * progress))
+        return self.circle(explosion.color, alpha, radius)
+
+    def bake_explosion(self, explosion):
+        # Отрендерить всю последовательность заранее (например, для часто повторяющихся взрывов)
+        age = explosion.age
+        for explosion.age in range(explosion.frames):
+            self.explosion(explosion)
+        explosion.age = age
+
+    def clear(self):
+        self.frames.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "frames": len(self.frames),
+            "bytes": self.bytes,
+        }
+
+effects = EffectBaker()
@@ -1,12 +1,13 @@
 import pygame
-import random
+from rng import rng
 import math
-import os
 from bullet import Bullet
+from assets import assets
+from pool import pools
+from timestep import game_clock
+from dispatch import dispatch
 from settings import *
 
-ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
-
 ENEMY_TYPES = {
     "default": {"radius": 24, "speed": ENEMY_SPEED, "hp": 1, "cooldown": (60, 120)},
     "fast":    {"radius": 16, "speed": ENEMY_SPEED + 2, "hp": 1, "cooldown": (15, 40)},
@@ -25,34 +26,30 @@ class Enemy:
         self.speed = kwargs.get("speed", params["speed"])
         self.max_speed = kwargs.get("max_speed", self.speed + (2 if enemy_type == "fast" else 1))
         self.hp = kwargs.get("hp", params["hp"])
-        self.cooldown = random.randint(*params["cooldown"])
+        self.cooldown = rng.randint(*params["cooldown"])
         self.invuln_timer = 0
         self.sprite = kwargs.get("sprite", None)
         if USE_SPRITES and self.sprite is None:
-            try:
-                fname = f"enemy_{self.type}.png" if os.path.exists(os.path.join(ASSETS_PATH, f"enemy_{self.type}.png")) else "enemy.png"
-                self.sprite = pygame.image.load(os.path.join(ASSETS_PATH, fname)).convert_alpha()
-                self.sprite = pygame.transform.smoothscale(self.sprite, (self.radius*2, self.radius*2))
-            except Exception as e:
-                # print("Не удалось загрузить спрайт врага:", e)
-                self.sprite = None
+            self.sprite = assets.get_scaled(f"enemy_{self.type}.png", (self.radius*2, self.radius*2), fallback="enemy.png")
         # Спец. параметры
         if self.type == "zigzag":
-            self.zigzag_phase = random.uniform(0, 2 * math.pi)
-            self.zigzag_ampl = random.randint(40, 80)
-        self.wobble_angle = random.uniform(0, 2 * math.pi)
-        self.wobble_speed = random.uniform(0.03, 0.07)
-        self.orbit_phase = random.uniform(0, 2 * math.pi)
-        self.orbit_radius = random.randint(0, 40)
-        self.accel = kwargs.get("accel", 0.15 + random.uniform(0, 0.1))
+            self.zigzag_phase = rng.uniform(0, 2 * math.pi)
+            self.zigzag_ampl = rng.randint(40, 80)
+        self.wobble_angle = rng.uniform(0, 2 * math.pi)
+        self.wobble_speed = rng.uniform(0.03, 0.07)
+        self.orbit_phase = rng.uniform(0, 2 * math.pi)
+        self.orbit_radius = rng.randint(0, 40)
+        self.accel = kwargs.get("accel", 0.15 + rng.uniform(0, 0.1))
+        self.lod_slot = -1  # сдвиг расписания дальних обновлений (swarm.py); -1 — ещё не назначен
+        self.lod_tick = -1  # тик последнего обновления, пока враг пропускает тики (swarm.py); -1 — досчитан
         # Моды могут добавить любые новые поля через kwargs
         for k, v in kwargs.items():
             setattr(self, k, v)
 
     def update(self, player_pos, enemy_bullets, camera_pos, game_api=None):
         # Позволяет модам полностью заменить поведение врага
-        if game_api and "update_enemy" in game_api:
-            return game_api["update_enemy"](self, player_pos, enemy_bullets, camera_pos, game_api)
+        if game_api and dispatch.update_enemy is not None:
+            return dispatch.update_enemy(self, player_pos, enemy_bullets, camera_pos, game_api)
         to_player = player_pos - self.pos
         distance = to_player.length()
         if distance > 1:
@@ -62,7 +59,7 @@ class Enemy:
                 zigzag_offset = perp * math.sin(self.zigzag_phase) * self.zigzag_ampl
                 target = player_pos + zigzag_offset
             else:
-                orbit_offset = pygame.Vector2(-to_player.y, to_player.x).normalize() * math.sin(pygame.time.get_ticks() / 400 + self.orbit_phase) * self.orbit_radius
+                orbit_offset = pygame.Vector2(-to_player.y, to_player.x).normalize() * math.sin(game_clock.get_ticks() / 400 + self.orbit_phase) * self.orbit_radius
                 wobble = pygame.Vector2(math.cos(self.wobble_angle), math.sin(self.wobble_angle)) * 2
                 target = player_pos + orbit_offset + wobble
             desired = (target - self.pos).normalize() * self.max_speed
@@ -78,18 +75,25 @@ class Enemy:
 
         self.cooldown -= 1
         if self.cooldown <= 0:
-            direction = (player_pos - self.pos)
-            if direction.length() > 0:
-                direction = direction.normalize()
-                enemy_bullets.append(Bullet(self.pos, direction, ENEMY_BULLET_SPEED, RED, ENEMY_BULLET_LIFETIME, self.config, is_enemy=True))
-                self.cooldown = random.randint(*ENEMY_TYPES[self.type]["cooldown"])
+            self.shoot(player_pos, enemy_bullets)
         if self.invuln_timer > 0:
             self.invuln_timer -= 1
 
+    def shoot(self, player_pos, enemy_bullets):
+        # Выстрел по игроку, когда кулдаун истёк (общий для update и пакетного swarm.py)
+        direction = (player_pos - self.pos)
+        if direction.length() > 0:
+            direction = direction.normalize()
+            if hasattr(enemy_bullets, "spawn"):
+                enemy_bullets.spawn(self.pos, direction, ENEMY_BULLET_SPEED, RED, ENEMY_BULLET_LIFETIME, self.config)
+            else:
+                enemy_bullets.append(pools.acquire(Bullet, self.pos, direction, ENEMY_BULLET_SPEED, RED, ENEMY_BULLET_LIFETIME, self.config, is_enemy=True))
+            self.cooldown = rng.randint(*ENEMY_TYPES[self.type]["cooldown"])
+
     def is_hit(self, bullet, game_api=None):
         # Позволяет модам полностью заменить обработку попадания
-        if game_api and "enemy_is_hit" in game_api:
-            return game_api["enemy_is_hit"](self, bullet, game_api)
+        if game_api and dispatch.enemy_is_hit is not None:
+            return dispatch.enemy_is_hit(self, bullet, game_api)
         hit = self.pos.distance_to(bullet.pos) < (self.radius + 5)
         if not hit:
             return False
@@ -105,8 +109,8 @@ class Enemy:
 
     def draw(self, surface, camera_pos, game_api=None):
         # Позволяет модам полностью заменить отрисовку врага
-        if game_api and "draw_enemy" in game_api:
-            return game_api["draw_enemy"](self, surface, camera_pos, game_api)
+        if game_api and dispatch.draw_enemy is not None:
+            return dispatch.draw_enemy(self, surface, camera_pos, game_api)
         draw_pos = self.pos - camera_pos + pygame.Vector2(self.config.width // 2, self.config.height // 2)
         alpha = 255
         if self.invuln_timer > 0:
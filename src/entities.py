@@ -0,0 +1,206 @@
+from pool import pools
+from spatial import SpatialHash
+from dispatch import dispatch
+from timestep import game_clock
+from profiler import profiler
+from settings import *
+
+# Методы, которые считаются компонентами объекта: системы вызывают только те, что есть у класса
+COMPONENTS = ("update", "draw", "is_alive", "attract", "is_hit", "take_damage")
+
+# Слои отрисовки; игрок и векторные снаряды рисуются между ними
+PLAYER_LAYER = 30
+PROJECTILE_LAYER = 65
+
+class ComponentTable(dict):
+    """class -> frozenset of its component names, filled on first lookup of each class."""
+    def __missing__(self, cls):
+        components = self[cls] = frozenset(name for name in COMPONENTS if callable(getattr(cls, name, None)))
+        return components
+
+class EntityKind:
+    def __init__(self, key, layer, draw_args=(), managed=False, cull_pad=None, hook=None, **kwargs):
+        self.key = key  # список в state, где лежат объекты этого вида
+        self.layer = layer
+        self.draw_args = draw_args  # что передаётся в draw между camera_pos и game_api: "player", "config"
+        self.managed = managed  # update/удаление мёртвых делает общая система, а не обработчик ядра
+        # Отсечение за экраном: объект рисуется, если круг pos ± (radius + cull_pad) задевает экран.
+        # None — вид не отсекается (у объектов модов может не быть pos и radius)
+        self.cull_pad = cull_pad
+        self.hook = hook  # хук отрисовки в game_api: если мод его задал, вид рисуется без отсечения
+        # Сетка для отсечения: пересобирается в конце каждого тика (EntityRegistry.reindex)
+        self.index = SpatialHash() if cull_pad is not None else None
+        self.indexed = None  # список, по которому собрана сетка
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+class EntityRegistry:
+    """Entity kinds stored as state lists, with per-class components and systems over them.
+
+    Components are looked up per class, so a method attached to a single instance
+    is only seen if its class defines one as well.
+    """
+    def __init__(self, **kwargs):
+        self.kinds = {}  # ключ state -> EntityKind
+        self.components = ComponentTable()
+        self.ordered = []  # виды по слою отрисовки
+        self.cull = True
+        self.drawn = 0  # счётчики последнего кадра
+        self.culled = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def register(self, key, layer=75, draw_args=(), managed=True, cull_pad=None, hook=None, **kwargs):
+        """Add an entity kind; kinds from mods are updated and drawn by the core loop."""
+        kind = self.kinds[key] = EntityKind(key, layer, tuple(draw_args), managed, cull_pad, hook, **kwargs)
+        self.ordered = sorted(self.kinds.values(), key=lambda k: k.layer)
+        return kind
+
+    def ensure(self, state):
+        # Пустые списки для видов, которых ещё нет в state (например, добавленных модом после старта)
+        for key in self.kinds:
+            if key not in state:
+                state[key] = []
+        return state
+
+    def has(self, obj, component):
+        return component in self.components[obj.__class__]
+
+    def add(self, state, key, obj):
+        if key not in state:
+            self.ensure(state)
+        state[key].append(obj)
+        return obj
+
+    def remove(self, state, key, obj):
+        objs = state.get(key)
+        if objs is not None and obj in objs:
+            objs.remove(obj)
+
+    def query(self, state, *components):
+        """Objects of every kind whose class has all the given components."""
+        table = self.components
+        wanted = frozenset(components)
+        for kind in self.ordered:
+            for obj in state.get(kind.key, ()):
+                if wanted <= table[obj.__class__]:
+                    yield obj
+
+    def update(self, state, game_api=None):
+        # Общая система для видов модов: update и удаление мёртвых, как у взрывов
+        table = self.components
+        for kind in self.ordered:
+            if not kind.managed:
+                continue
+            objs = state.get(kind.key)
+            if not objs:
+                continue
+            alive = []
+            for obj in objs:
+                components = table[obj.__class__]
+                if "update" in components:
+                    obj.update(game_api=game_api)
+                if "is_alive" not in components or obj.is_alive(game_api=game_api):
+                    alive.append(obj)
+                else:
+                    pools.release(obj)
+            objs[:] = alive
+
+    def begin_frame(self):
+        self.drawn = 0
+        self.culled = 0
+
+    def note(self, drawn, culled):
+        # Отрисованное и отсечённое другими системами (например, векторными снарядами)
+        self.drawn += drawn
+        self.culled += culled
+
+    def counts(self):
+        return {"drawn": self.drawn, "culled": self.culled}
+
+    def reindex(self, state):
+        """Rebuild the cull grid of every large culled kind from its current list; called at the end of a tick."""
+        if not self.cull:
+            return
+        ticks = game_clock.ticks
+        for kind in self.ordered:
+            index = kind.index
+            if index is None:
+                continue
+            objs = state.get(kind.key)
+            index.clear()
+            index.stamp = None
+            if not objs or len(objs) <= CULL_INDEX_MIN:
+                continue
+            pad = kind.cull_pad
+            for obj in objs:
+                pos = getattr(obj, "pos", None)
+                if pos is None:
+                    # Объект без позиции (мод) нельзя положить в сетку — вид отсекается перебором
+                    index.clear()
+                    break
+                index.insert(obj, pos, getattr(obj, "radius", 0) + pad)
+            else:
+                index.stamp = ticks
+                kind.indexed = objs
+
+    def visible(self, kind, objs, view):
+        """Objects of kind whose bounding circle touches view (left, top, right, bottom), in list order."""
+        left, top, right, bottom = view
+        pad = kind.cull_pad
+        candidates = objs
+        index = kind.index
+        # Сетка годится, если собрана в этом тике по этому же списку и с тех пор в нём ничего не менялось;
+        # в ней объекты уже расширены на pad, а query_rect возвращает их в порядке списка
+        if index is not None and index.stamp == game_clock.ticks and kind.indexed is objs and index.count == len(objs):
+            candidates = index.query_rect(left, top, right, bottom)
+        found = []
+        for obj in candidates:
+            pos = getattr(obj, "pos", None)
+            if pos is None:
+                found.append(obj)
+                continue
+            r = getattr(obj, "radius", 0) + pad
+            x, y = pos[0], pos[1]
+            if x + r >= left and x - r <= right and y + r >= top and y - r <= bottom:
+                found.append(obj)
+        return found
+
+    def draw(self, surface, camera_pos, state, config, game_api, layers=(None, None)):
+        """Draw every kind whose layer is in [low, high), skipping objects outside the view."""
+        low, high = layers
+        table = self.components
+        context = {"player": state["player"], "config": config}
+        half_w, half_h = config.width / 2 + CULL_MARGIN, config.height / 2 + CULL_MARGIN
+        view = (camera_pos[0] - half_w, camera_pos[1] - half_h, camera_pos[0] + half_w, camera_pos[1] + half_h)
+        for kind in self.ordered:
+            if low is not None and kind.layer < low:
+                continue
+            if high is not None and kind.layer >= high:
+                break
+            objs = state.get(kind.key)
+            if not objs:
+                continue
+            if self.cull and kind.cull_pad is not None and (kind.hook is None or getattr(dispatch, kind.hook, None) is None):
+                shown = self.visible(kind, objs, view)
+                self.culled += len(objs) - len(shown)
+                objs = shown
+            self.drawn += len(objs)
+            args = (surface, camera_pos) + tuple(context[name] for name in kind.draw_args) + (game_api,)
+            for obj in objs:
+                if "draw" in table[obj.__class__]:
+                    obj.draw(*args)
+
+entities = EntityRegistry()
+# Виды ядра: их update и коллизии делают обработчики из utils.py
+# cull_pad — насколько рисунок выходит за radius (пульсация бонуса, рост взрыва, диск чёрной дыры)
+entities.register("bonuses", 10, ("player",), managed=False, cull_pad=16, hook="draw_bonus")
+entities.register("explosions", 20, ("config",), managed=False, cull_pad=64, hook="draw_explosion")
+entities.register("enemies", 40, managed=False, cull_pad=8, hook="draw_enemy")
+entities.register("bullets", 50, managed=False, cull_pad=8, hook="draw_bullet")
+entities.register("enemy_bullets", 60, managed=False, cull_pad=8, hook="draw_bullet")
+entities.register("meteors", 70, managed=False, cull_pad=8, hook="draw_meteor")
+entities.register("blackholes", 80, managed=False, cull_pad=16, hook="draw_blackhole")
+profiler.sources.append(entities.counts)
@@ -0,0 +1,47 @@
+import pygame
+from settings import *
+
+class HudLayer:
+    def __init__(self, **kwargs):
+        self.surface = None
+        self.rect = None
+        self.key = None
+        self.rebuilds = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def invalidate(self):
+        # Моды с анимированной панелью могут сбрасывать кеш сами
+        self.key = None
+
+    def build(self, achievements, lives, config, draw_lives, game_api=None):
+        """Compose lives, stats and achievements panels into one surface the size of the right column."""
+        size = (HUD_PANEL_WIDTH, config.height)
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        # Панели рисуются в экранных координатах, origin сдвигает их в левый верхний угол колонки
+        origin = (config.width - HUD_PANEL_WIDTH, 0)
+        self.rect = pygame.Rect(origin, size)
+        self.surface.fill((0, 0, 0, 0))
+        if draw_lives is not None:
+            draw_lives(self.surface, lives, config, game_api, origin=origin)
+        achievements.draw_stats(self.surface, origin=origin)
+        achievements.draw_achievements(self.surface, origin=origin)
+        self.rebuilds += 1
+
+    def draw(self, surface, achievements, lives, config, draw_lives=None, game_api=None):
+        key = (
+            getattr(achievements.stats, "version", None),
+            getattr(achievements.achievements, "version", None),
+            lives,
+            config.width,
+            config.height,
+        )
+        # Без счётчиков версий изменения не отследить — перерисовываем каждый кадр
+        if key != self.key or None in key[:2]:
+            self.build(achievements, lives, config, draw_lives, game_api)
+            self.key = key
+        surface.blit(self.surface, self.rect.topleft)
+
+hud = HudLayer()
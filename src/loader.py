@@ -0,0 +1,144 @@
+import time
+import threading
+
+_MISSING = object()
+
+class Loader:
+    """Startup jobs run in order on a background thread; get(key) waits for a job or runs it right away.
+
+    A job that nobody asked for yet is done by the worker; if the game needs it first,
+    it runs on the calling thread instead, so no job is ever done twice.
+    Jobs added after start() (sounds from mods) restart the worker if it has already finished.
+    """
+    def __init__(self, **kwargs):
+        self.jobs = []  # ключи в порядке добавления
+        self.pending = {}  # ключ -> функция, которую ещё никто не начал
+        self.results = {}
+        self.errors = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False  # поток ещё может взять новую задачу
+        self.started = None
+        self.finished = None  # perf_counter окончания всех задач
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def add(self, key, func):
+        with self.condition:
+            if key in self.pending or key in self.results or key in self.errors:
+                return
+            self.jobs.append(key)
+            self.pending[key] = func
+            self.finished = None
+            # Проверка под тем же замком, под которым поток решает завершиться:
+            # задача либо попадёт к работающему потоку, либо запустит новый
+            if self.started is not None and not self.running:
+                self._spawn()
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.started = time.perf_counter()
+            self._spawn()
+
+    def _spawn(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="loader", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        index = 0
+        while True:
+            with self.condition:
+                if index >= len(self.jobs):
+                    self.running = False
+                    self.finished = time.perf_counter()
+                    self.condition.notify_all()
+                    return
+                key = self.jobs[index]
+            index += 1
+            self._do(key)
+
+    def _do(self, key):
+        with self.condition:
+            func = self.pending.pop(key, None)
+            if func is None:
+                return False
+        try:
+            result = func()
+        except Exception as e:
+            with self.condition:
+                self.errors[key] = e
+                self.condition.notify_all()
+            return True
+        with self.condition:
+            self.results[key] = result
+            self.condition.notify_all()
+        return True
+
+    def get(self, key, default=_MISSING):
+        """Result of a job; raises the job's exception if it failed."""
+        self._do(key)
+        with self.condition:
+            # Задачу сейчас выполняет другой поток — ждём её
+            while key not in self.results and key not in self.errors:
+                if key not in self.jobs:
+                    if default is _MISSING:
+                        raise KeyError(key)
+                    return default
+                self.condition.wait()
+            if key in self.errors:
+                raise self.errors[key]
+            return self.results[key]
+
+    def ready(self, key):
+        return key in self.results or key in self.errors
+
+    def progress(self):
+        """(finished jobs, all jobs)."""
+        return len(self.results) + len(self.errors), len(self.jobs)
+
+    def wait(self, timeout=None):
+        # Дождаться всех задач (например, перед замером или записью)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self.condition:
+            while len(self.results) + len(self.errors) < len(self.jobs):
+                left = None if deadline is None else deadline - time.perf_counter()
+                if left is not None and left <= 0:
+                    return False
+                self.condition.wait(left)
+        return True
+
+class LazySound:
+    """Stand-in for pygame.mixer.Sound that is decoded by the loader, or on first use if still pending."""
+    def __init__(self, loader, key):
+        self.loader = loader
+        self.key = key
+        self.sound = None
+
+    def resolve(self):
+        if self.sound is None:
+            self.sound = self.loader.get(self.key)
+        return self.sound
+
+    def play(self, *args, **kwargs):
+        return self.resolve().play(*args, **kwargs)
+
+    def stop(self):
+        return self.resolve().stop()
+
+    def set_volume(self, volume):
+        return self.resolve().set_volume(volume)
+
+    def get_volume(self):
+        return self.resolve().get_volume()
+
+    def __getattr__(self, name):
+        # Остальные методы pygame.mixer.Sound (fadeout, get_length, ...) — у настоящего звука
+        if name in ("loader", "key", "sound"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+loader = Loader()
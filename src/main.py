@@ -1,54 +1,127 @@
+import time
+STARTUP_START = time.perf_counter()  # отсчёт времени запуска (первый кадр, меню)
 import sys
 import os
 import pygame
-import random
 import math
+import atexit
+import argparse
 
 from player import Player
 from bullet import Bullet
 from enemy import Enemy
 from achievements import Achievements
+from loader import loader, LazySound
+from soundcache import sound_cache
+from audio import audio
+from modloader import mod_manager
+from saves import save_writer
 from bonus import Bonus
 from explosion import Explosion
 from meteor import Meteor
 from blackhole import BlackHole
 from camera import Camera
+from assets import assets, rotations
+from starfield import starfield
+from text import text_cache
+from hud import hud
+from spatial import SpatialHash
+from projectiles import ProjectileSystem, ProjectileList, PLAYER, ENEMY
+from pool import pools
+from effects import effects
+from timestep import interpolator, game_clock
+from rng import rng, new_seed, derive_seed
+from replay import controls, Playback
+from profiler import profiler
+from dispatch import dispatch, GameAPI
+from entities import entities
+from swarm import swarm
 import utils
 import settings
 from settings import *
 
-import importlib.util
-
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
 MODS_PATH = os.path.join(os.path.dirname(__file__), "..", "mods")
 loaded_mods = []
 
 def load_mods():
-    if not os.path.exists(MODS_PATH):
-        os.makedirs(MODS_PATH)
-    for fname in os.listdir(MODS_PATH):
-        if fname.endswith(".py"):
-            mod_path = os.path.join(MODS_PATH, fname)
-            mod_name = os.path.splitext(fname)[0]
-            spec = importlib.util.spec_from_file_location(mod_name, mod_path)
-            if spec and spec.loader:
-                mod = importlib.util.module_from_spec(spec)
-                try:
-                    spec.loader.exec_module(mod)
-                    loaded_mods.append(mod)
-                    print(f"Мод '{mod_name}' загружен.")
-                except Exception as e:
-                    print(f"Ошибка загрузки мода '{mod_name}': {e}")
-
-load_mods()
-
+    # Порядок, зависимости, замеры и кеш байткода — в modloader.py
+    mod_manager.path = MODS_PATH
+    loaded_mods[:] = mod_manager.load()
+
+# Безголовый режим: без окна и звука, логика крутится без ограничения FPS (прогоны на CI)
+HEADLESS = "--headless" in sys.argv[1:] or os.environ.get("SPACE_MOUSE_HEADLESS") == "1"
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Запуск по стадиям: сначала окно с заставкой, потом в фоне звуки, спрайты и шрифты,
+# а моды и состояние игры готовятся в это время в основном потоке
 pygame.init()
-pygame.mixer.init()
+if HEADLESS:
+    WIDTH, HEIGHT = HEADLESS_SIZE
+    config = GameConfig(WIDTH, HEIGHT)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+else:
+    info = pygame.display.Info()
+    WIDTH, HEIGHT = info.current_w, info.current_h
+    config = GameConfig(WIDTH, HEIGHT)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+pygame.display.set_caption("Space Mouse Flyer")
+clock = pygame.time.Clock()
+pygame.mouse.set_visible(False)
+startup_times = {}  # стадия запуска -> секунды от STARTUP_START
+
+def draw_splash(text="Загрузка..."):
+    if HEADLESS:
+        return
+    done, total = loader.progress()
+    screen.fill((0, 0, 0))
+    # Шрифт по умолчанию: поиск системных шрифтов (SysFont) слишком долгий для первого кадра
+    title = pygame.font.Font(None, 72).render("Space Mouse Flyer", True, (255, 255, 255))
+    screen.blit(title, title.get_rect(center=(config.width // 2, config.height // 2 - 40)))
+    label = pygame.font.Font(None, 32).render(text, True, (160, 160, 160))
+    screen.blit(label, label.get_rect(center=(config.width // 2, config.height // 2 + 20)))
+    bar = pygame.Rect(0, 0, config.width // 3, 8)
+    bar.center = (config.width // 2, config.height // 2 + 60)
+    pygame.draw.rect(screen, (60, 60, 60), bar)
+    if total:
+        pygame.draw.rect(screen, (90, 170, 255), (bar.x, bar.y, bar.width * done // total, bar.height))
+    pygame.display.flip()
+    pygame.event.pump()
+
+draw_splash()
+startup_times["first_frame"] = time.perf_counter() - STARTUP_START
+if not HEADLESS:
+    # Звук включается в основном потоке: моды могут создавать свои pygame.mixer.Sound в apply_mod
+    pygame.mixer.init()
+
+class SilentSound:
+    """Stand-in for pygame.mixer.Sound when audio is disabled."""
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_volume(self):
+        return 0.0
 
 def load_sound(name, volume=0.5):
-    s = pygame.mixer.Sound(os.path.join(ASSETS_PATH, "sounds", name))
-    s.set_volume(volume)
-    return s
+    """Sound decoded in the background; the returned object waits for it only if played before that.
+
+    name is a file in assets/sounds or a path (mods); decoded PCM is cached on disk by sound_cache.
+    """
+    if HEADLESS:
+        return SilentSound()
+    path = os.path.abspath(name if os.path.dirname(name) else os.path.join(ASSETS_PATH, "sounds", name))
+    key = f"sound:{path}:{volume}"
+    # Если фоновая загрузка уже закончилась (звук из мода), add() запустит поток снова
+    loader.add(key, lambda: sound_cache.load(path, volume))
+    return LazySound(loader, key)
 
 sounds = {
     "shoot": load_sound("shoot.mp3"),
@@ -59,25 +132,39 @@ sounds = {
     "death": load_sound("death.mp3"),
     "bonus": load_sound("bonus.mp3"),
 }
+audio.setup(sounds, config)
 
-info = pygame.display.Info()
-WIDTH, HEIGHT = info.current_w, info.current_h
-config = GameConfig(WIDTH, HEIGHT)
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
-pygame.display.set_caption("Space Mouse Flyer")
-clock = pygame.time.Clock()
-pygame.mouse.set_visible(False)
+if not HEADLESS:
+    # Список системных шрифтов для меню и HUD и файлы спрайтов читаются заранее
+    loader.add("fonts", pygame.font.get_fonts)
+    if USE_SPRITES and os.path.isdir(ASSETS_PATH):
+        for fname in sorted(os.listdir(ASSETS_PATH)):
+            if fname.endswith(".png"):
+                loader.add(f"sprite:{fname}", lambda fname=fname: assets.preload(fname))
+    loader.start()
+
+load_mods()
+draw_splash()
 
 def reset_game_state(difficulty=1, game_api=None):
     player_cls = Player if not game_api else game_api.get("Player", Player)
     camera_cls = Camera if not game_api else game_api.get("Camera", Camera)
     player = player_cls(config)
     camera = camera_cls(player.pos)
-    return {
+    projectiles = ProjectileSystem()
+    if game_api:
+        # Векторный путь работает только со стандартными пулями и обработчиками,
+        # иначе выстрелы идут в списки объектов, как раньше
+        core_bullets = game_api.get("Bullet", Bullet) is Bullet and "draw_bullet" not in game_api
+        projectiles.enabled[PLAYER] = core_bullets and game_api.get("handle_bullet_enemy_collisions") is utils.handle_bullet_enemy_collisions
+        projectiles.enabled[ENEMY] = core_bullets and game_api.get("handle_enemy_bullet_player_collisions") is utils.handle_enemy_bullet_player_collisions
+    # Списки видов, добавленных модами через entities.register, создаются там же
+    return entities.ensure({
         "player": player,
         "camera": camera,
-        "bullets": [],
-        "enemy_bullets": [],
+        "bullets": ProjectileList(projectiles, PLAYER),
+        "enemy_bullets": ProjectileList(projectiles, ENEMY),
+        "projectiles": projectiles,
         "enemies": [],
         "bonuses": [],
         "explosions": [],
@@ -92,54 +179,76 @@ def reset_game_state(difficulty=1, game_api=None):
         "ENEMY_SPEED": DIFFICULTY_LEVELS[difficulty - 1]["enemy_speed"],
         "game_time": 0,
         "shield_timer": 0,
-        "event_timer": random.randint(1200, 2000),
+        "event_timer": rng.randint(1200, 2000),
         "event_active": None,
         "event_duration": 0,
         "blackhole_damage_timer": 0,
         "current_difficulty": difficulty,
-    }
+    })
 
-def main():
-    achievements = Achievements(config)
-    achievements.load()
-    current_difficulty = 2  # по умолчанию "Средне"
-    state = reset_game_state(current_difficulty)
-    game_state = "menu"
+dispatch.register(reset_game_state=reset_game_state)
 
-    # --- API для модов ---
+def build_game_api(state, achievements):
+    """The game dict handed to mods (see MODIFICATION_API.md); main() adds the menu state hooks."""
     fps = [60]  # изменяемый контейнер для FPS
     on_tick = []
-    game_api = {
+    game_api = GameAPI({
         "player": state["player"],
         "state": state,
         "config": config,
         "camera": state["camera"],
         "sounds": sounds,
+        "assets": assets,
+        "rotations": rotations,
+        "starfield": starfield,
+        "text": text_cache,
+        "hud": hud,
+        "effects": effects,
+        "pools": pools,
+        "acquire": pools.acquire,
+        "release": pools.release,
+        "register_pool": pools.register,
         "achievements": achievements,
+        "add_achievement": achievements.add_rule,
         "screen": screen,
         "on_tick": on_tick,
         "fps": fps,
         "set_fps": lambda val: fps.__setitem__(0, val),
+        "sim_rate": SIM_RATE,
+        "interpolator": interpolator,
+        "rng": rng,
+        "game_clock": game_clock,
+        "controls": controls,
+        "profiler": profiler,
         "settings": {k: getattr(settings, k) for k in dir(settings) if not k.startswith("__")},
-        "add_enemy": lambda obj: state["enemies"].append(obj),
-        "add_bonus": lambda obj: state["bonuses"].append(obj),
-        "add_bullet": lambda obj: state["bullets"].append(obj),
-        "add_enemy_bullet": lambda obj: state["enemy_bullets"].append(obj),
-        "remove_enemy": lambda obj: state["enemies"].remove(obj) if obj in state["enemies"] else None,
-        "remove_bullet": lambda obj: state["bullets"].remove(obj) if obj in state["bullets"] else None,
-        "remove_enemy_bullet": lambda obj: state["enemy_bullets"].remove(obj) if obj in state["enemy_bullets"] else None,
-        "remove_bonus": lambda obj: state["bonuses"].remove(obj) if obj in state["bonuses"] else None,
-        "spawn_enemy": lambda pos, etype="default": state["enemies"].append(game_api["Enemy"](pos, config, etype)),
-        "spawn_bonus": lambda pos, btype=None: state["bonuses"].append(game_api["Bonus"](pos, config)) if btype is None else state["bonuses"].append(game_api["Bonus"](pos, config, btype)),
-        "spawn_explosion": lambda pos, color=(255,200,50), type="big": state["explosions"].append(game_api["Explosion"](pos, color, type)),
-        "give_damage": lambda amount=1: state["player"].take_damage(amount=amount),
-        "heal_player": lambda: state["player"].heal(),
-        "set_game_state": lambda s: globals().__setitem__('game_state', s),
-        "get_game_state": lambda: game_state,
-        "set_score": lambda val: state.update({"score": val}),
-        "get_score": lambda: state["score"],
-        "set_level": lambda val: state.update({"level": val}),
-        "get_level": lambda: state["level"],
+        "entities": entities,
+        "swarm": swarm,
+        "save_writer": save_writer,
+        "loader": loader,
+        "load_sound": load_sound,
+        "sound_cache": sound_cache,
+        "audio": audio,
+        "play_sound": audio.play,
+        "mods": mod_manager,
+        "add_entity": lambda kind, obj: entities.add(game_api["state"], kind, obj),
+        "remove_entity": lambda kind, obj: entities.remove(game_api["state"], kind, obj),
+        "add_enemy": lambda obj: entities.add(game_api["state"], "enemies", obj),
+        "add_bonus": lambda obj: entities.add(game_api["state"], "bonuses", obj),
+        "add_bullet": lambda obj: entities.add(game_api["state"], "bullets", obj),
+        "add_enemy_bullet": lambda obj: entities.add(game_api["state"], "enemy_bullets", obj),
+        "remove_enemy": lambda obj: entities.remove(game_api["state"], "enemies", obj),
+        "remove_bullet": lambda obj: entities.remove(game_api["state"], "bullets", obj),
+        "remove_enemy_bullet": lambda obj: entities.remove(game_api["state"], "enemy_bullets", obj),
+        "remove_bonus": lambda obj: entities.remove(game_api["state"], "bonuses", obj),
+        "spawn_enemy": lambda pos, etype="default": game_api["state"]["enemies"].append(game_api["Enemy"](pos, config, etype)),
+        "spawn_bonus": lambda pos, btype=None: game_api["state"]["bonuses"].append(game_api["Bonus"](pos, config)) if btype is None else game_api["state"]["bonuses"].append(game_api["Bonus"](pos, config, btype)),
+        "spawn_explosion": lambda pos, color=(255,200,50), type="big": game_api["state"]["explosions"].append(pools.acquire(game_api["Explosion"], pos, color, type)),
+        "give_damage": lambda amount=1: game_api["state"]["player"].take_damage(amount=amount),
+        "heal_player": lambda: game_api["state"]["player"].heal(),
+        "set_score": lambda val: game_api["state"].update({"score": val}),
+        "get_score": lambda: game_api["state"]["score"],
+        "set_level": lambda val: game_api["state"].update({"level": val}),
+        "get_level": lambda: game_api["state"]["level"],
         # Функции, которые могут быть заменены модами:
         "draw_game": utils.draw_game,
         "handle_events": utils.handle_events,
@@ -166,29 +275,378 @@ def main():
         "BlackHole": BlackHole,
         "Bullet": Bullet,
         "Camera": Camera,
-    }
+        "SpatialHash": SpatialHash,
+    })
+    # Ядро вызывает заменяемые функции через dispatch; присваивания модов в game_api обновляют его сразу
+    dispatch.bind(game_api)
+    return game_api
+
+def run_tick(state, achievements, game_api):
+    """One simulation tick of the standard game logic; returns "dead" when the player dies."""
+    sim_dt = 1.0 / game_api["sim_rate"]
+    # --- on_tick от модов ---
+    if profiler.enabled:
+        # Каждый обработчик мода — отдельная фаза
+        for func in game_api["on_tick"]:
+            func()
+            profiler.lap(profiler.hook(func))
+    else:
+        for func in game_api["on_tick"]:
+            func()
 
-    # --- Применение модов ---
-    for mod in loaded_mods:
-        if hasattr(mod, "apply_mod"):
-            try:
-                mod.apply_mod(game_api)
-            except Exception as e:
-                print(f"Ошибка применения мода {mod}: {e}")
+    # --- Стандартная логика (если не заменена модом) ---
+    if dispatch.handle_events is utils.handle_events:
+        state["player"].update()
+        state["camera"].update(state["player"].pos)
+        state["game_time"] += sim_dt
+        achievements.stats["time_survived"] = int(state["game_time"])
+
+        # Уровень и сложность
+        if achievements.stats["enemies_killed"] >= state["kills_for_next_level"]:
+            state["level"] += 1
+            state["kills_for_next_level"] += LEVEL_UP_KILLS
+            achievements.stats["levels_completed"] = state["level"]
+            state["ENEMY_SPAWN_TIME"] = max(30, state["ENEMY_SPAWN_TIME"] - 10)
+            state["MAX_ENEMIES"] += 2
+            audio.play("levelup", sounds=sounds)
+            achievements.show_popup(f"Уровень {state['level']}!")
+            if not achievements.achievements.get("no_damage", False):
+                achievements.stats["damage_taken"] = 0
+
+        # Спавн врагов
+        state["enemy_spawn_timer"] -= 1
+        if state["enemy_spawn_timer"] <= 0 and len(state["enemies"]) < state["MAX_ENEMIES"]:
+            dispatch.spawn_enemy_func(state, config)
+            state["enemy_spawn_timer"] = state["ENEMY_SPAWN_TIME"]
+
+        if state["event_timer"] > 0:
+            state["event_timer"] -= 1
+
+        # Обновление врагов
+        swarm.update(state, game_api)
+        profiler.lap("update")
+
+        # Коллизии и обработка объектов
+        dispatch.handle_bullet_enemy_collisions(state, achievements, config, sounds)
+        profiler.lap("bullet_enemy")
+        result = dispatch.handle_enemy_bullet_player_collisions(state, achievements, sounds)
+        profiler.lap("enemy_bullet_player")
+        if result == "dead":
+            return "dead"
+        dispatch.handle_bonuses(state, achievements, sounds)
+        profiler.lap("bonuses")
+        dispatch.handle_explosions(state)
+        profiler.lap("explosions")
+        # Виды объектов из модов
+        entities.update(state, game_api)
+        profiler.lap("entities")
+        result = dispatch.handle_events(state, achievements, game_api)
+        profiler.lap("events")
+        if result == "dead":
+            return "dead"
+
+        achievements.check(state["score"], state["game_time"], state["player"], screen, audio.cue("achievement"))
+        profiler.lap("achievements")
+
+    else:
+        # Если мод полностью заменил handle_events, просто вызываем её
+        result = dispatch.handle_events(state, achievements, game_api)
+        profiler.lap("events")
+        if result == "dead":
+            return "dead"
+    # Сетки отсечения собираются после спавна и удалений, по спискам, которые увидит отрисовка
+    entities.reindex(state)
+    profiler.lap("cull_index")
+    return None
+
+def seed_arg(text):
+    # Зерно пишется в заголовок записи как u64; new_seed и derive_seed дают числа меньше 2**63
+    seed = int(text)
+    if not 0 <= seed < 1 << 63:
+        raise argparse.ArgumentTypeError(f"зерно должно быть в диапазоне [0, 2**63): {text}")
+    return seed
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Space Mouse Flyer")
+    parser.add_argument("--headless", action="store_true", help="run the game logic without a window, audio or frame cap")
+    parser.add_argument("--minutes", type=float, default=HEADLESS_MINUTES, help="simulated minutes to run in headless mode")
+    parser.add_argument("--difficulty", type=int, choices=(1, 2, 3), default=2)
+    parser.add_argument("--no-draw", dest="draw", action="store_false", help="skip drawing in headless mode")
+    parser.add_argument("--seed", type=seed_arg, default=None, help="seed of the first game (random by default)")
+    parser.add_argument("--record", default=None, metavar="PATH", help="record the inputs of the latest game to PATH")
+    parser.add_argument("--replay", default=None, metavar="PATH", help="play back a recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    parser.add_argument("--seek", type=float, default=0.0, metavar="SECONDS", help="start playback at this game time")
+    parser.add_argument("--profile", default=None, metavar="PATH", help="write per-phase frame timings to PATH (.csv or .jsonl)")
+    return parser.parse_args(argv)
+
+def main(headless=False, minutes=HEADLESS_MINUTES, difficulty=2, draw=True, seed=None, record=None, replay=None, speed=1.0, seek=0.0, profile=None):
+    if headless and not HEADLESS:
+        # Окно и звук открываются при импорте модуля, поэтому безголовый режим выбирается до него
+        raise RuntimeError("headless=True требует запуска с --headless или SPACE_MOUSE_HEADLESS=1 до импорта main")
+    achievements = Achievements(config)
+    achievements.load()
+    current_difficulty = difficulty  # по умолчанию "Средне"
+    state = reset_game_state(current_difficulty)
+    game_state = "menu"
 
-    def get_func(name):
-        return game_api.get(name)
+    game_api = build_game_api(state, achievements)
+    game_api["set_game_state"] = lambda s: globals().__setitem__('game_state', s)
+    game_api["get_game_state"] = lambda: game_state
+
+    # --- Применение модов ---
+    mod_manager.apply(game_api)
 
     state["current_event_name"] = ""
     state["current_event_timer"] = 0
 
-    gameplay_time = 0.0
-    gameplay_time_start = None
+    # Логика идёт фиксированными тиками SIM_RATE, отрисовка — с частотой fps.
+    # Все таймеры в кадрах (спавн, кулдауны, события, щит) теперь считаются в тиках.
+    sim_dt = 1.0 / game_api["sim_rate"]
+    accumulator = 0.0
+    frame_time = 0.0
+
+    def simulate():
+        # Ввод берётся на тик целиком: живой или из записи, и сразу пишется в запись
+        shots = controls.sample()
+        game_clock.tick()
+        center = pygame.Vector2(config.width // 2, config.height // 2)
+        for dx, dy in shots:
+            if state["player"].lives > 0:
+                dispatch.handle_player_shoot(state, center + (dx, dy), config, sounds)
+                achievements.stats["shots_fired"] += 1
+        profiler.lap("input")
+        result = run_tick(state, achievements, game_api)
+        controls.end_tick(state, achievements)
+        return result
+
+    next_seed = [seed]
+
+    def new_game(game_seed=None):
+        nonlocal state
+        # Первая игра — с заданным зерном, следующие получают зерно из генератора предыдущей,
+        # так что вся серия забегов тоже воспроизводима
+        if game_seed is None:
+            game_seed = next_seed[0] if next_seed[0] is not None else new_seed()
+        # Зерно из main(seed=...) может быть любым целым — приводится к диапазону new_seed
+        game_seed %= 1 << 63
+        next_seed[0] = None if seed is None else derive_seed(game_seed)
+        rng.seed(game_seed)
+        game_clock.rate = game_api["sim_rate"]
+        game_clock.reset()
+        state = dispatch.reset_game_state(current_difficulty, game_api)
+        state["current_event_name"] = ""
+        state["current_event_timer"] = 0
+        state["seed"] = game_seed
+        game_api["state"] = state
+        game_api["player"] = state["player"]
+        game_api["camera"] = state["camera"]
+        if record and controls.source is None:
+            controls.start_recording(record, game_seed, current_difficulty, game_api["sim_rate"], (config.width, config.height), {
+                "stats": dict(achievements.stats),
+                "achievements": dict(achievements.achievements),
+                "mods": [mod.__name__ for mod in loaded_mods],
+            })
+
+    def autofire():
+        # Простой автопилот: стрелять по ближайшему врагу, чтобы коллизии и убийства тоже нагружались
+        player = state["player"]
+        if not state["enemies"] or player.lives <= 0:
+            return
+        target = min(state["enemies"], key=lambda enemy: enemy.pos.distance_squared_to(player.pos))
+        aim = target.pos - player.pos + pygame.Vector2(config.width // 2, config.height // 2)
+        controls.shoot(aim, config)
+
+    def run_headless(minutes, draw):
+        """Run ticks back to back without menus or frame cap; return a summary dict."""
+        total = int(minutes * 60 * game_api["sim_rate"])
+        report_every = HEADLESS_REPORT_MINUTES * game_api["sim_rate"] * 60
+        # Без отрисовки отсекать нечего — и сетки для отсечения не собираются
+        entities.cull = draw
+        new_game()
+        ticks = deaths = frames = 0
+        start = time.perf_counter()
+        while ticks < total:
+            # Очередь событий SDL нужно разбирать, иначе она переполняется
+            pygame.event.pump()
+            profiler.start()
+            if ticks % HEADLESS_FIRE_INTERVAL == 0:
+                autofire()
+            result = simulate()
+            ticks += 1
+            if result == "dead":
+                deaths += 1
+                controls.stop_recording()
+                new_game()
+            if draw:
+                dispatch.draw_game(state, achievements, screen, config, game_api)
+                frames += 1
+                profiler.lap("draw")
+            profiler.count(state)
+            profiler.end()
+            if ticks % report_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"[headless] {ticks / (60 * game_api['sim_rate']):.0f} мин: {ticks / elapsed:.0f} тиков/с")
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        summary = {
+            "ticks": ticks,
+            "frames": frames,
+            "sim_minutes": ticks / (60 * game_api["sim_rate"]),
+            "wall_seconds": elapsed,
+            "ticks_per_second": ticks / elapsed,
+            "speedup": ticks / game_api["sim_rate"] / elapsed,
+            "deaths": deaths,
+            "score": state["score"],
+            "enemies_killed": achievements.stats["enemies_killed"],
+        }
+        print(f"[headless] {ticks} тиков за {elapsed:.1f} с: {summary['ticks_per_second']:.0f} тиков/с, "
+              f"x{summary['speedup']:.1f} к реальному времени, смертей: {deaths}")
+        return summary
+
+    def apply_snapshot(data):
+        nonlocal state
+        state = data["state"]
+        game_api["state"] = state
+        game_api["player"] = state["player"]
+        game_api["camera"] = state["camera"]
+        achievements.stats = data["stats"]
+        achievements.achievements = data["achievements"]
+        achievements.popup_queue = []
+        achievements.active_popups = []
+        interpolator.snapshot(state)
+
+    def run_replay(path, speed, seek, headless, draw):
+        """Play back a recording: N× speed, seeking with LEFT/RIGHT, UP/DOWN for speed, SPACE to pause."""
+        nonlocal current_difficulty
+        playback = Playback(path)
+        header = playback.header
+        mods = [mod.__name__ for mod in loaded_mods]
+        if header["meta"].get("mods", mods) != mods:
+            print(f"Внимание: запись сделана с модами {header['meta'].get('mods')}, загружены {mods}")
+        if header["sim_rate"] != game_api["sim_rate"]:
+            print(f"Внимание: запись сделана при sim_rate={header['sim_rate']}, сейчас {game_api['sim_rate']}")
+        current_difficulty = header["difficulty"]
+
+        def restart():
+            achievements.stats = dict(header["meta"].get("stats", achievements.stats))
+            achievements.achievements = dict(header["meta"].get("achievements", achievements.achievements))
+            playback.tick = 0
+            controls.play(playback)
+            new_game(header["seed"])
+            interpolator.snapshot(state)
+            playback.remember(state, achievements)
+
+        ended = [False]
+
+        def step():
+            interpolator.snapshot(state)
+            if simulate() == "dead" or playback.finished:
+                ended[0] = True
+
+        def seek_to(target):
+            target = max(0, min(int(target), playback.length))
+            if target < playback.tick:
+                data = playback.restore(target)
+                if data is None:
+                    restart()
+                else:
+                    apply_snapshot(data)
+                    controls.play(playback)
+                ended[0] = False
+            # Вперёд — просто быстрая симуляция без отрисовки
+            while playback.tick < target and not ended[0]:
+                step()
+
+        restart()
+        seek_to(seek * game_api["sim_rate"])
+        start = time.perf_counter()
+        first_tick = playback.tick
+        if headless:
+            while not ended[0]:
+                pygame.event.pump()
+                step()
+                if draw:
+                    dispatch.draw_game(state, achievements, screen, config, game_api)
+        else:
+            sim_dt = 1.0 / game_api["sim_rate"]
+            accumulator = 0.0
+            frame_time = 0.0
+            paused = False
+            clock.tick()
+            running = True
+            while running:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    if event.type == pygame.KEYDOWN:
+                        if event.key in (pygame.K_ESCAPE, pygame.K_m):
+                            running = False
+                        if event.key == pygame.K_SPACE:
+                            paused = not paused
+                        if event.key == pygame.K_RIGHT:
+                            seek_to(playback.tick + REPLAY_SEEK_SECONDS * game_api["sim_rate"])
+                        if event.key == pygame.K_LEFT:
+                            seek_to(playback.tick - REPLAY_SEEK_SECONDS * game_api["sim_rate"])
+                        if event.key == pygame.K_UP:
+                            speed = min(speed * 2, 64)
+                        if event.key == pygame.K_DOWN:
+                            speed = max(speed / 2, 0.25)
+                if paused or ended[0]:
+                    accumulator = 0.0
+                else:
+                    accumulator += min(frame_time, MAX_FRAME_TIME) * speed
+                    steps = 0
+                    while accumulator >= sim_dt and steps < MAX_CATCHUP_STEPS * max(1, speed) and not ended[0]:
+                        step()
+                        accumulator -= sim_dt
+                        steps += 1
+                    if accumulator >= sim_dt:
+                        accumulator = 0.0
+                interpolator.apply(state, accumulator / sim_dt)
+                try:
+                    dispatch.draw_game(state, achievements, screen, config, game_api)
+                finally:
+                    interpolator.restore()
+                frame_time = clock.tick(game_api["fps"][0]) / 1000
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        controls.source = None
+        summary = {
+            "ticks": playback.tick,
+            "length": playback.length,
+            "ticks_per_second": (playback.tick - first_tick) / elapsed,
+            "desyncs": playback.desyncs,
+            "score": state["score"],
+        }
+        print(f"[replay] {playback.tick}/{playback.length} тиков, {summary['ticks_per_second']:.0f} тиков/с, "
+              f"рассинхронизаций: {len(playback.desyncs)}")
+        return summary
+
+    atexit.register(controls.stop_recording)
+    # Дописать отложенное сохранение при любом выходе, в том числе через sys.exit()
+    atexit.register(save_writer.flush)
+    if profile:
+        profiler.start_export(profile)
+        atexit.register(profiler.stop_export)
+
+    if replay:
+        return run_replay(replay, speed, seek, headless, draw)
+    if headless:
+        return run_headless(minutes, draw)
+
+    # Меню доступно сразу; звуки, которые ещё грузятся, догрузятся при первом проигрывании
+    startup_times["interactive"] = time.perf_counter() - STARTUP_START
+    done, total = loader.progress()
+    background = f"{done}/{total}"
+    if loader.finished is not None:
+        startup_times["loaded"] = loader.finished - STARTUP_START
+        background += f", готово за {startup_times['loaded'] * 1000:.0f} мс"
+    print(f"[startup] первый кадр: {startup_times['first_frame'] * 1000:.0f} мс, "
+          f"меню: {startup_times['interactive'] * 1000:.0f} мс, фоновая загрузка: {background}")
 
     while True:
         # --- Меню ---
         if game_state == "menu":
-            menu_result = get_func("menu_loop")(screen, [
+            menu_result = dispatch.menu_loop(screen, [
                 "Space Mouse Flyer",
                 "",
                 "Начать игру",
@@ -199,13 +657,12 @@ def main():
                 "Навигация: стрелки/W/S  |  Выбор: ENTER/SPACE"
             ], config, achievements)
             if menu_result == "start":
-                current_difficulty = get_func("select_difficulty")(screen, config, current_difficulty)
-                state = get_func("reset_game_state")(current_difficulty, game_api)
-                game_api["state"] = state
-                game_api["player"] = state["player"]
-                game_api["camera"] = state["camera"]
+                current_difficulty = dispatch.select_difficulty(screen, config, current_difficulty)
+                new_game()
                 game_state = "game"
-                gameplay_time_start = pygame.time.get_ticks()
+                interpolator.snapshot(state)
+                frame_time = 0.0
+                clock.tick()
                 continue
             elif menu_result == "exit":
                 pygame.quit()
@@ -214,7 +671,7 @@ def main():
 
         # --- Пауза ---
         if game_state == "pause":
-            get_func("menu_loop")(screen, [
+            dispatch.menu_loop(screen, [
                 "Пауза",
                 f"Счет: {state['score']}",
                 f"Уровень: {state['level']}",
@@ -227,13 +684,17 @@ def main():
                 "Навигация: стрелки/W/S  |  Выбор: ENTER/SPACE"
             ], config, achievements)
             game_state = "game"
+            # Время, проведённое в меню, не догоняем
+            frame_time = 0.0
+            clock.tick()
             continue
 
         # --- После смерти ---
         if game_state == "dead":
+            controls.stop_recording()
             achievements.save()
-            sounds["death"].play()
-            get_func("menu_loop")(screen, [
+            audio.play("death", sounds=sounds)
+            dispatch.menu_loop(screen, [
                 "Игра окончена",
                 f"Ваш счет: {state['score']}",
                 f"Врагов уничтожено: {achievements.stats['enemies_killed']}",
@@ -247,8 +708,9 @@ def main():
             game_state = "menu"
             continue
 
+        profiler.start()
         # --- Обработка событий pygame (если мод не заменил handle_events полностью) ---
-        if get_func("handle_events") == utils.handle_events:
+        if dispatch.handle_events is utils.handle_events:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
@@ -259,81 +721,48 @@ def main():
                     if event.key == pygame.K_m:
                         pygame.quit()
                         sys.exit()
+                    if event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
                 if event.type == pygame.MOUSEBUTTONDOWN and state["player"].lives > 0:
-                    get_func("handle_player_shoot")(state, pygame.mouse.get_pos(), config, sounds)
-                    achievements.stats["shots_fired"] += 1
+                    # Выстрел выполняется в ближайшем тике логики, чтобы попасть в запись
+                    controls.shoot(pygame.mouse.get_pos(), config)
 
         pygame.mouse.set_visible(True)
 
-        # --- on_tick от модов ---
-        for func in game_api["on_tick"]:
-            func()
-
-        # --- Стандартная логика (если не заменена модом) ---
-        if get_func("handle_events") == utils.handle_events:
-            if game_state == "game":
-                if gameplay_time_start is None:
-                    gameplay_time_start = pygame.time.get_ticks()
-                state["player"].update()
-                state["camera"].update(state["player"].pos)
-                state["game_time"] = gameplay_time + (pygame.time.get_ticks() - gameplay_time_start) / 1000
-                achievements.stats["time_survived"] = int(state["game_time"])
-            else:
-                if gameplay_time_start is not None:
-                    gameplay_time += (pygame.time.get_ticks() - gameplay_time_start) / 1000
-                    gameplay_time_start = None
-
-            # Уровень и сложность
-            if achievements.stats["enemies_killed"] >= state["kills_for_next_level"]:
-                state["level"] += 1
-                state["kills_for_next_level"] += LEVEL_UP_KILLS
-                achievements.stats["levels_completed"] = state["level"]
-                state["ENEMY_SPAWN_TIME"] = max(30, state["ENEMY_SPAWN_TIME"] - 10)
-                state["MAX_ENEMIES"] += 2
-                sounds["levelup"].play()
-                achievements.show_popup(f"Уровень {state['level']}!")
-                if not achievements.achievements.get("no_damage", False):
-                    achievements.stats["damage_taken"] = 0
-
-            # Спавн врагов
-            state["enemy_spawn_timer"] -= 1
-            if state["enemy_spawn_timer"] <= 0 and len(state["enemies"]) < state["MAX_ENEMIES"]:
-                get_func("spawn_enemy_func")(state, config)
-                state["enemy_spawn_timer"] = state["ENEMY_SPAWN_TIME"]
-
-            if state["event_timer"] > 0:
-                state["event_timer"] -= 1
-
-            # Обновление врагов
-            state["enemies"] = [enemy for enemy in state["enemies"] if enemy.pos.distance_to(state["player"].pos) < 2500]
-            for enemy in state["enemies"]:
-                enemy.update(state["player"].pos, state["enemy_bullets"], state["camera"].get())
-
-            # Коллизии и обработка объектов
-            get_func("handle_bullet_enemy_collisions")(state, achievements, config, sounds)
-            result = get_func("handle_enemy_bullet_player_collisions")(state, achievements, sounds)
+        # --- Фиксированные тики логики ---
+        accumulator += min(frame_time, MAX_FRAME_TIME)
+        steps = 0
+        while game_state == "game" and accumulator >= sim_dt and steps < MAX_CATCHUP_STEPS:
+            interpolator.snapshot(state)
+            result = simulate()
+            accumulator -= sim_dt
+            steps += 1
             if result == "dead":
                 game_state = "dead"
-                continue
-            get_func("handle_bonuses")(state, achievements, sounds)
-            get_func("handle_explosions")(state)
-            result = get_func("handle_events")(state, achievements, game_api)
-            if result == "dead":
-                game_state = "dead"
-                continue
-
-            achievements.check(state["score"], state["game_time"], state["player"], screen, sounds["achievement"])
-
-        else:
-            # Если мод полностью заменил handle_events, просто вызываем её
-            result = get_func("handle_events")(state, achievements, game_api)
-            if result == "dead":
-                game_state = "dead"
-                continue
+                break
+        if game_state != "game":
+            accumulator = 0.0
+            continue
+        if accumulator >= sim_dt:
+            # Машина не успевает: теряем кадры, а не скорость игры
+            accumulator = 0.0
 
         # --- Рисование (может быть заменено модом) ---
-        get_func("draw_game")(state, achievements, screen, config, game_api)
-        clock.tick(game_api["fps"][0])
+        # Объекты рисуются между двумя последними состояниями логики
+        interpolator.apply(state, accumulator / sim_dt)
+        try:
+            dispatch.draw_game(state, achievements, screen, config, game_api)
+        finally:
+            interpolator.restore()
+        profiler.lap("draw")
+        profiler.count(state)
+        if profiler.overlay:
+            # Оверлей рисуется поверх уже показанного кадра, обновляется только его прямоугольник
+            pygame.display.update(profiler.draw_overlay(screen))
+            profiler.lap("overlay")
+        profiler.end()
+        achievements.autosave()
+        frame_time = clock.tick(game_api["fps"][0]) / 1000
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(**vars(parse_args()))
\ No newline at end of file
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import marshal
+import hashlib
+import importlib.util
+from settings import *
+
+MODS_PATH = os.path.join(os.path.dirname(__file__), "..", "mods")
+
+class ModInfo:
+    def __init__(self, name, path, manifest=None, **kwargs):
+        manifest = manifest or {}
+        self.name = name
+        self.path = path
+        self.priority = manifest.get("priority", 0)  # больше — раньше среди модов без зависимостей между собой
+        self.requires = list(manifest.get("requires", []))  # без них мод не загружается
+        self.after = list(manifest.get("after", []))  # загрузиться после них, если они есть
+        self.enabled = manifest.get("enabled", True)
+        self.module = None
+        self.status = "pending"  # loaded, applied, failed, disabled, skipped
+        self.reason = ""
+        self.import_ms = 0.0
+        self.apply_ms = 0.0
+        self.cached = False  # байткод взят из кеша
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+class ModManager:
+    """Loads mods/*.py in dependency order and times their import and apply_mod.
+
+    An optional manifest next to the mod (my_mod.json) sets "priority", "requires",
+    "after" and "enabled". Compiled bytecode is kept in MOD_CACHE_DIR, so mods in
+    read-only folders are not recompiled on every start. A mod that raises is
+    reported and its changes to game_api are rolled back; mods that need it are skipped.
+    """
+    def __init__(self, path=MODS_PATH, cache_dir=MOD_CACHE_DIR, budget_ms=MOD_LOAD_BUDGET_MS, **kwargs):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.budget_ms = budget_ms  # общий бюджет на импорт и apply_mod; 0 — без ограничения
+        self.mods = {}  # имя -> ModInfo, в порядке загрузки
+        self.history = None  # имя -> мс за прошлый запуск (импорт + apply_mod)
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def discover(self):
+        found = {}
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        for fname in sorted(os.listdir(self.path)):
+            if not fname.endswith(".py"):
+                continue
+            name = os.path.splitext(fname)[0]
+            manifest = None
+            manifest_path = os.path.join(self.path, name + ".json")
+            if os.path.exists(manifest_path):
+                try:
+                    with open(manifest_path, "r", encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Ошибка чтения манифеста мода '{name}': {e}")
+            found[name] = ModInfo(name, os.path.join(self.path, fname), manifest)
+        return found
+
+    def order(self, mods):
+        """Mods sorted so that every mod comes after what it requires (and after "after", if present)."""
+        ordered = []
+        state = {}  # имя -> "visiting" / "done"
+        def visit(info, chain):
+            if state.get(info.name) == "done":
+                return info.status != "skipped"
+            if state.get(info.name) == "visiting":
+                info.status, info.reason = "skipped", "циклическая зависимость: " + " -> ".join(chain + [info.name])
+                return False
+            state[info.name] = "visiting"
+            ok = True
+            for dep in info.requires:
+                if dep not in mods:
+                    ok, reason = False, f"нет мода '{dep}'"
+                elif not mods[dep].enabled:
+                    ok, reason = False, f"мод '{dep}' выключен"
+                elif not visit(mods[dep], chain + [info.name]):
+                    ok, reason = False, f"не загружен '{dep}'"
+                if not ok:
+                    break
+            for dep in info.after:
+                # Мягкий порядок: незагруженный или уже обходимый мод (цикл) просто пропускается
+                if ok and dep in mods and mods[dep].enabled and dep not in state:
+                    visit(mods[dep], chain + [info.name])
+            state[info.name] = "done"
+            if not ok:
+                if info.status != "skipped":
+                    info.status, info.reason = "skipped", reason
+                return False
+            if info.status == "skipped":
+                return False
+            ordered.append(info)
+            return True
+        for info in sorted(mods.values(), key=lambda m: (-m.priority, m.name)):
+            if info.enabled:
+                visit(info, [])
+        return ordered
+
+    def load(self):
+        """Import every enabled mod; returns the loaded modules in order."""
+        self.mods = self.discover()
+        for info in self.mods.values():
+            if not info.enabled:
+                info.status, info.reason = "disabled", "выключен в манифесте"
+        history = self._history()
+        spent = 0.0
+        modules = []
+        ordered = self.order(self.mods)
+        # Дальше (apply, отчёт) моды идут в порядке загрузки, пропущенные — в конце
+        self.mods = dict([(info.name, info) for info in ordered] + [(name, info) for name, info in self.mods.items() if info not in ordered])
+        for info in ordered:
+            failed = [dep for dep in info.requires if self.mods[dep].status not in ("loaded", "applied")]
+            if failed:
+                info.status, info.reason = "skipped", f"не загружен '{failed[0]}'"
+                continue
+            expected = history.get(info.name, 0.0)
+            if self.budget_ms and spent + expected > self.budget_ms:
+                info.status, info.reason = "skipped", f"не укладывается в бюджет {self.budget_ms} мс (в прошлый раз {expected:.0f} мс)"
+                print(f"Мод '{info.name}' пропущен: {info.reason}")
+                continue
+            start = time.perf_counter()
+            try:
+                info.module = self._import(info)
+            except Exception as e:
+                info.status, info.reason = "failed", f"{type(e).__name__}: {e}"
+                print(f"Ошибка загрузки мода '{info.name}': {e}")
+            else:
+                info.status = "loaded"
+                modules.append(info.module)
+                print(f"Мод '{info.name}' загружен.")
+            info.import_ms = (time.perf_counter() - start) * 1000
+            # В бюджет идёт то же, с чем он сравнивается: импорт + apply_mod прошлого запуска
+            # (apply_mod ещё впереди); без истории или при медленном импорте — не меньше измеренного
+            spent += max(expected, info.import_ms)
+        return modules
+
+    def _import(self, info):
+        spec = importlib.util.spec_from_file_location(info.name, info.path)
+        module = importlib.util.module_from_spec(spec)
+        exec(self._code(info), module.__dict__)
+        return module
+
+    def _code(self, info):
+        # Свой кеш байткода: папка мода может быть недоступна для записи (__pycache__ там не создать)
+        st = os.stat(info.path)
+        key = hashlib.sha1(os.path.abspath(info.path).encode("utf-8")).hexdigest()[:8]
+        cached = os.path.join(self.cache_dir, f"{info.name}-{key}.{sys.implementation.cache_tag}.pyc")
+        header = importlib.util.MAGIC_NUMBER + st.st_mtime_ns.to_bytes(8, "little") + st.st_size.to_bytes(8, "little")
+        try:
+            with open(cached, "rb") as f:
+                data = f.read()
+            if data[:len(header)] == header:
+                info.cached = True
+                return marshal.loads(data[len(header):])
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+        with open(info.path, "rb") as f:
+            code = compile(f.read(), info.path, "exec", dont_inherit=True)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{cached}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(header + marshal.dumps(code))
+            os.replace(tmp, cached)
+        except OSError:
+            pass
+        return code
+
+    def apply(self, game_api):
+        """Call apply_mod of every loaded mod; a failing mod's game_api changes are undone."""
+        for info in self.mods.values():
+            if info.status != "loaded":
+                continue
+            failed = [dep for dep in info.requires if self.mods[dep].status != "applied"]
+            if failed:
+                info.status, info.reason = "skipped", f"не применён '{failed[0]}'"
+                print(f"Мод '{info.name}' не применён: {info.reason}")
+                continue
+            apply_mod = getattr(info.module, "apply_mod", None)
+            if apply_mod is None:
+                info.status = "applied"
+                continue
+            before = dict(game_api)
+            start = time.perf_counter()
+            try:
+                apply_mod(game_api)
+                info.status = "applied"
+            except Exception as e:
+                info.status, info.reason = "failed", f"{type(e).__name__}: {e}"
+                print(f"Ошибка применения мода {info.name}: {e}")
+                self._rollback(game_api, before)
+            info.apply_ms = (time.perf_counter() - start) * 1000
+        self._save_history()
+        print(self.summary())
+
+    def _rollback(self, game_api, before):
+        # Откатываются только ключи game_api; изменения внутри объектов мод должен убирать сам
+        for key in [key for key in game_api if key not in before]:
+            del game_api[key]
+        for key, value in before.items():
+            if game_api.get(key, before) is not value:
+                game_api[key] = value
+
+    def report(self):
+        return [{
+            "name": info.name,
+            "status": info.status,
+            "reason": info.reason,
+            "import_ms": round(info.import_ms, 2),
+            "apply_ms": round(info.apply_ms, 2),
+            "cached": info.cached,
+        } for info in self.mods.values()]
+
+    def summary(self):
+        lines = [f"[mods] {sum(1 for info in self.mods.values() if info.status == 'applied')}/{len(self.mods)} модов, "
+                 f"{sum(info.import_ms + info.apply_ms for info in self.mods.values()):.1f} мс"]
+        for info in sorted(self.mods.values(), key=lambda m: -(m.import_ms + m.apply_ms)):
+            line = f"  {info.name:<24} импорт {info.import_ms:7.1f} мс  apply_mod {info.apply_ms:7.1f} мс  {info.status}"
+            lines.append(line + (f" ({info.reason})" if info.reason else ""))
+        return "\n".join(lines)
+
+    def _history_path(self):
+        return os.path.join(self.cache_dir, "timings.json")
+
+    def _history(self):
+        if self.history is None:
+            try:
+                with open(self._history_path(), "r", encoding="utf-8") as f:
+                    self.history = json.load(f)
+            except (OSError, ValueError):
+                self.history = {}
+        return self.history
+
+    def _save_history(self):
+        history = self._history()
+        for info in self.mods.values():
+            if info.status in ("applied", "failed"):
+                history[info.name] = info.import_ms + info.apply_ms
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._history_path(), "w", encoding="utf-8") as f:
+                json.dump(history, f)
+        except OSError:
+            pass
+
+mod_manager = ModManager()
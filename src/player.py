@@ -1,9 +1,11 @@
 import pygame
 import math
-import os
 from settings import *
-
-ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets")
+from assets import assets, rotations
+from effects import effects
+from timestep import game_clock
+from replay import controls
+from dispatch import dispatch
 
 class Player:
     def __init__(self, config, **kwargs):
@@ -17,6 +19,8 @@ class Player:
         self.image_orig = pygame.Surface((40, 40), pygame.SRCALPHA)
         pygame.draw.polygon(self.image_orig, self.color, self.shapes_points[self.shape])
         self.image = self.image_orig.copy()
+        self.fallback_image = pygame.Surface((40, 40), pygame.SRCALPHA)
+        self.fallback_color = None
         self.pos = pygame.Vector2(kwargs.get("pos", (0, 0)))
         self.vel = pygame.Vector2(0, 0)
         self.max_speed = kwargs.get("max_speed", 9)
@@ -24,19 +28,15 @@ class Player:
         self.radius = kwargs.get("radius", 20)
         self.sprite = kwargs.get("sprite", None)
         if USE_SPRITES and self.sprite is None:
-            try:
-                self.sprite = pygame.image.load(os.path.join(ASSETS_PATH, "player.png")).convert_alpha()
-                self.sprite = pygame.transform.smoothscale(self.sprite, (40, 40))
-            except Exception as e:
-                # print("Не удалось загрузить спрайт игрока:", e)
-                self.sprite = None
+            self.sprite = assets.get_scaled("player.png", (40, 40))
         self.effects = kwargs.get("effects", {})  # {"shield": ticks_left, ...}
         # Моды могут добавить любые новые поля через kwargs
         for k, v in kwargs.items():
             setattr(self, k, v)
 
     def update(self):
-        keys = pygame.key.get_pressed()
+        # Клавиши текущего тика: живой ввод или запись (см. replay.py)
+        keys = controls.get_pressed()
         accel = pygame.Vector2(0, 0)
         if keys[pygame.K_UP] or keys[pygame.K_w]:
             accel.y -= self.max_accel
@@ -97,8 +97,8 @@ class Player:
 
     def draw(self, surface, camera_pos, mouse_pos, game_api=None):
         # Используем функцию ядра для кастомной отрисовки, если она есть
-        if game_api and "draw_player" in game_api:
-            return game_api["draw_player"](self, surface, camera_pos, mouse_pos)
+        if game_api and dispatch.draw_player is not None:
+            return dispatch.draw_player(self, surface, camera_pos, mouse_pos)
         draw_pos = self.pos - camera_pos + pygame.Vector2(self.config.width // 2, self.config.height // 2)
         mouse_world = camera_pos + pygame.Vector2(mouse_pos) - pygame.Vector2(self.config.width // 2, self.config.height // 2)
         offset = mouse_world - self.pos
@@ -106,19 +106,22 @@ class Player:
 
         # --- Визуализация щита ---
         if self.has_effect("shield"):
-            shield_alpha = 120 + int(80 * math.sin(pygame.time.get_ticks() * 0.008))
-            shield_radius = int(self.radius * 1.5 + 2 * math.sin(pygame.time.get_ticks() * 0.012))
-            shield_surf = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(shield_surf, (100, 200, 255, shield_alpha), (shield_radius, shield_radius), shield_radius, 4)
+            shield_alpha = 120 + int(80 * math.sin(game_clock.get_ticks() * 0.008))
+            shield_radius = int(self.radius * 1.5 + 2 * math.sin(game_clock.get_ticks() * 0.012))
+            shield_surf = effects.circle((100, 200, 255), shield_alpha, shield_radius, 4)
             surface.blit(shield_surf, (draw_pos.x - shield_radius, draw_pos.y - shield_radius))
 
         if USE_SPRITES and self.sprite:
-            rotated_image = pygame.transform.rotate(self.sprite, angle)
+            rotated_image = rotations.get(self.sprite, angle)
             rect = rotated_image.get_rect(center=draw_pos)
             surface.blit(rotated_image, rect)
         else:
-            temp_image = pygame.Surface((40, 40), pygame.SRCALPHA)
-            pygame.draw.polygon(temp_image, self.color, self.shapes_points["triangle"])
-            rotated_image = pygame.transform.rotate(temp_image, angle)
+            # Перерисовываем фигуру только при смене цвета (моды могут менять его каждый кадр)
+            if self.fallback_color != self.color:
+                self.fallback_image.fill((0, 0, 0, 0))
+                pygame.draw.polygon(self.fallback_image, self.color, self.shapes_points["triangle"])
+                self.fallback_color = self.color
+                rotations.invalidate(self.fallback_image)
+            rotated_image = rotations.get(self.fallback_image, angle)
             rect = rotated_image.get_rect(center=draw_pos)
             surface.blit(rotated_image, rect)
\ No newline at end of file
@@ -0,0 +1,105 @@
+from settings import *
+
+def clear_fields(obj, *keep):
+    """Drop every instance field of obj except keep (for reset() of pooled classes)."""
+    kept = [getattr(obj, name) for name in keep]
+    obj.__dict__.clear()
+    for name, value in zip(keep, kept):
+        setattr(obj, name, value)
+
+def _defined_in(cls, name):
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return klass
+    return None
+
+class Pool:
+    def __init__(self, cls, max_size=POOL_MAX_SIZE):
+        self.cls = cls
+        self.max_size = max_size
+        self.free = []
+        self.live = 0  # выдано и ещё не возвращено
+        self.high_water = 0
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+        self.ignored = 0  # release() объекта, которого пул не выдавал или который уже вернули
+        # reset() подходит, только если он из того же класса, что и __init__:
+        # наследник со своим __init__ должен инициализироваться полностью
+        self.use_reset = _defined_in(cls, "reset") is not None and _defined_in(cls, "reset") is _defined_in(cls, "__init__")
+
+    def acquire(self, *args, **kwargs):
+        """Reuse a released object (re-initialised via reset/__init__) or create a new one.
+
+        reset() must leave the object as __init__ would: fields from the previous acquisition,
+        including ones a mod added through kwargs, are dropped with clear_fields() first,
+        keeping only the preallocated vectors.
+        """
+        if self.free:
+            obj = self.free.pop()
+            if self.use_reset:
+                obj.reset(*args, **kwargs)
+            else:
+                obj.__init__(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        # Метка выдачи: вернуть в пул можно только то, что из него взято, и только один раз
+        obj._pooled = True
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def release(self, obj):
+        # Пулю, созданную модом напрямую (game_api["Bullet"](...)), мод может ещё держать у себя,
+        # а повторный release отдал бы один объект двум владельцам — такие вызовы пропускаются
+        if not getattr(obj, "_pooled", False):
+            self.ignored += 1
+            return
+        obj._pooled = False
+        self.live -= 1
+        if len(self.free) < self.max_size:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "free": len(self.free),
+            "high_water": self.high_water,
+            "created": self.created,
+            "reused": self.reused,
+            "dropped": self.dropped,
+            "ignored": self.ignored,
+        }
+
+class PoolRegistry:
+    def __init__(self, **kwargs):
+        self.pools = {}  # класс -> Pool
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def register(self, cls, max_size=POOL_MAX_SIZE):
+        pool = self.pools.get(cls)
+        if pool is None:
+            pool = self.pools[cls] = Pool(cls, max_size)
+        return pool
+
+    def acquire(self, cls, *args, **kwargs):
+        return self.register(cls).acquire(*args, **kwargs)
+
+    def release(self, obj):
+        # В пул возвращаются только объекты ровно того класса, для которого он создан:
+        # наследники из модов могут хранить своё состояние и просто уходят в сборщик мусора
+        pool = self.pools.get(type(obj))
+        if pool is not None:
+            pool.release(obj)
+
+    def stats(self):
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}
+
+pools = PoolRegistry()
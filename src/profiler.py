@@ -0,0 +1,227 @@
+import pygame
+import csv
+import json
+import time
+from collections import deque
+from text import text_cache
+from settings import *
+
+# Цвета фаз на графике оверлея; фазы модов и новые фазы получают цвета по кругу
+PHASE_COLORS = [
+    (90, 170, 255), (255, 170, 60), (120, 220, 120), (240, 90, 90), (200, 120, 255),
+    (255, 230, 90), (90, 220, 210), (255, 130, 200), (170, 170, 170), (150, 110, 60),
+]
+
+class Profiler:
+    """Per-phase timing of frames: start(), then lap(name) after each phase, then end()."""
+    def __init__(self, history=PROFILE_HISTORY, **kwargs):
+        self.enabled = False
+        self.history = deque(maxlen=history)  # по кадру: {фаза: секунды}
+        self.count_history = deque(maxlen=history)  # по кадру: {список state: длина}
+        self.current = {}
+        self.counts = {}
+        self.last = 0.0
+        self.frame = 0
+        self.hook_names = {}  # функция on_tick -> имя фазы
+        self.sources = []  # функции, возвращающие дополнительные счётчики кадра {имя: число}
+        self.overlay = False
+        self.overlay_surface = None
+        self.overlay_graph = None
+        self.overlay_frame = -1
+        self.overlay_text = []
+        self.colors = {}
+        self.export_file = None
+        self.export_writer = None
+        self.export_columns = None
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.counts = {}
+        self.last = time.perf_counter()
+
+    def lap(self, name):
+        # Время с предыдущей отметки записывается в фазу name (фазы за несколько тиков складываются)
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def hook(self, func):
+        """Phase name of an on_tick callback, e.g. "on_tick:my_mod.boost"."""
+        name = self.hook_names.get(func)
+        if name is None:
+            name = self.hook_names[func] = f"on_tick:{getattr(func, '__module__', None) or '?'}.{getattr(func, '__qualname__', type(func).__name__)}"
+        return name
+
+    def count(self, state):
+        # Размеры всех списков состояния, включая добавленные модами
+        if not self.enabled:
+            return
+        counts = {key: len(value) for key, value in state.items() if isinstance(value, list)}
+        projectiles = state.get("projectiles")
+        if projectiles is not None:
+            counts["projectiles"] = projectiles.count
+        for source in self.sources:
+            counts.update(source())
+        self.counts = counts
+
+    def end(self):
+        if not self.enabled:
+            return
+        self.history.append(self.current)
+        self.count_history.append(self.counts)
+        if self.export_file is not None:
+            self._export(self.current, self.counts)
+        self.frame += 1
+        self.current = {}
+        self.counts = {}
+
+    def phases(self):
+        names = {}
+        for frame in self.history:
+            for name in frame:
+                names[name] = None
+        return list(names)
+
+    def summary(self, phases=None):
+        """{phase: {mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} over the kept history, plus "total"."""
+        frames = list(self.history)
+        if not frames:
+            return {}
+        result = {}
+        columns = [(name, [frame.get(name, 0.0) * 1000 for frame in frames]) for name in phases or self.phases()]
+        columns.append(("total", [sum(frame.values()) * 1000 for frame in frames]))
+        for name, samples in columns:
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            result[name] = {
+                "mean_ms": sum(samples) / len(samples),
+                "p50_ms": ordered[int(round(0.50 * last))],
+                "p95_ms": ordered[int(round(0.95 * last))],
+                "p99_ms": ordered[int(round(0.99 * last))],
+                "max_ms": ordered[last],
+            }
+        return result
+
+    def clear(self):
+        self.history.clear()
+        self.count_history.clear()
+        self.current = {}
+        self.counts = {}
+
+    # --- Экспорт ---
+    def start_export(self, path):
+        """Stream every finished frame to path: CSV for *.csv, JSON lines otherwise."""
+        self.stop_export()
+        self.export_file = open(path, "w", encoding="utf-8", newline="")
+        self.export_writer = csv.writer(self.export_file) if path.lower().endswith(".csv") else None
+        self.export_columns = None
+        self.enabled = True
+
+    def _export(self, phases, counts):
+        if self.export_writer is None:
+            self.export_file.write(json.dumps({
+                "frame": self.frame,
+                "phases_ms": {name: round(value * 1000, 4) for name, value in phases.items()},
+                "counts": counts,
+            }) + "\n")
+            return
+        if self.export_columns is None:
+            # Набор столбцов фиксируется по первому кадру; новые фазы модов пойдут в следующий файл
+            self.export_columns = (list(phases), list(counts))
+            self.export_writer.writerow(["frame"] + [f"{name}_ms" for name in self.export_columns[0]] + self.export_columns[1])
+        names, keys = self.export_columns
+        self.export_writer.writerow([self.frame] + [round(phases.get(name, 0.0) * 1000, 4) for name in names] + [counts.get(key, 0) for key in keys])
+
+    def stop_export(self):
+        if self.export_file is not None:
+            self.export_file.close()
+            self.export_file = None
+            self.export_writer = None
+            self.enabled = self.overlay
+
+    def dump(self, path):
+        # Разовая выгрузка накопленной истории
+        exporting = self.export_file, self.export_writer, self.export_columns, self.frame
+        self.export_file = open(path, "w", encoding="utf-8", newline="")
+        self.export_writer = csv.writer(self.export_file) if path.lower().endswith(".csv") else None
+        self.export_columns = None
+        self.frame = 0
+        for phases, counts in zip(self.history, self.count_history):
+            self._export(phases, counts)
+            self.frame += 1
+        self.export_file.close()
+        self.export_file, self.export_writer, self.export_columns, self.frame = exporting
+
+    # --- Оверлей ---
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        # Оверлею нужны данные, поэтому он включает и сам замер
+        self.enabled = self.overlay or self.export_file is not None
+        if not self.enabled:
+            self.clear()
+
+    def color(self, name):
+        color = self.colors.get(name)
+        if color is None:
+            color = self.colors[name] = PHASE_COLORS[len(self.colors) % len(PHASE_COLORS)]
+        return color
+
+    def draw_overlay(self, surface):
+        """Scrolling stacked per-phase frame time graph with percentiles; returns the drawn rect."""
+        w, h = PROFILE_OVERLAY_SIZE
+        graph_h = h // 2
+        budget = 1000.0 / SIM_RATE  # мс на кадр при 60 Гц — линия бюджета
+        scale = graph_h / (budget * 2)
+        if self.overlay_surface is None:
+            self.overlay_surface = pygame.Surface((w, h), pygame.SRCALPHA)
+            self.overlay_graph = pygame.Surface((w, graph_h), pygame.SRCALPHA)
+        # График сдвигается на пиксель за кадр, рисуется только новый столбец
+        if self.history and self.overlay_frame != self.frame:
+            self.overlay_frame = self.frame
+            graph = self.overlay_graph
+            graph.scroll(-1, 0)
+            graph.fill((0, 0, 0, 0), (w - 1, 0, 1, graph_h))
+            y = graph_h
+            for name, value in self.history[-1].items():
+                bar = int(value * 1000 * scale)
+                if bar:
+                    pygame.draw.line(graph, self.color(name), (w - 1, y - 1), (w - 1, max(0, y - bar)))
+                y -= bar
+                if y <= 0:
+                    break
+        panel = self.overlay_surface
+        panel.fill((0, 0, 0, 170))
+        panel.blit(self.overlay_graph, (0, 0))
+        budget_y = graph_h - int(budget * scale)
+        pygame.draw.line(panel, (255, 255, 255), (0, budget_y), (w, budget_y))
+        # Текст меняется каждый кадр, поэтому обновляем его реже, чтобы не засорять кеш строк
+        if self.frame % PROFILE_OVERLAY_TEXT_FRAMES == 0 or not self.overlay_text:
+            phases = self.phases()
+            summary = self.summary(phases)
+            lines = []
+            if summary:
+                total = summary["total"]
+                lines.append((f"кадр  p50 {total['p50_ms']:.1f}  p95 {total['p95_ms']:.1f}  p99 {total['p99_ms']:.1f} мс", (255, 255, 255)))
+                for name in sorted(phases, key=lambda name: -summary[name]["p95_ms"])[:6]:
+                    stats = summary[name]
+                    lines.append((f"{name[:24]:<24} {stats['p50_ms']:5.2f} {stats['p95_ms']:5.2f} {stats['p99_ms']:5.2f}", self.color(name)))
+            counts = self.count_history[-1] if self.count_history else {}
+            lines.append((" ".join(f"{key}:{value}" for key, value in counts.items() if value), (200, 200, 200)))
+            self.overlay_text = lines
+        y = graph_h + 4
+        for line, color in self.overlay_text:
+            if line:
+                panel.blit(text_cache.render(line, color, "consolas", 14), (6, y))
+            y += 16
+        rect = pygame.Rect(8, surface.get_height() - h - 8, w, h)
+        surface.blit(panel, rect)
+        return rect
+
+profiler = Profiler()
@@ -0,0 +1,225 @@
+import pygame
+import math
+import numpy as np
+from bullet import Bullet
+from assets import assets, rotations
+from pool import pools
+from settings import *
+
+PLAYER = 0
+ENEMY = 1
+
+# Ключ ячейки сетки в одном int64: смещение делает координаты неотрицательными
+_CELL_BIAS = 1 << 20
+_CELL_SPAN = 1 << 21
+
+def _cell_key(cx, cy):
+    return (cx + _CELL_BIAS) * _CELL_SPAN + (cy + _CELL_BIAS)
+
+class ProjectileView:
+    """Bullet-like snapshot of one projectile, handed to is_hit and other per-object code."""
+    def __init__(self, system, i):
+        self.index = i
+        self.pos = pygame.Vector2(system.pos[i].tolist())
+        self.dir = pygame.Vector2(system.dir[i].tolist())
+        self.speed = float(system.speed[i])
+        self.age = int(system.age[i])
+        self.lifetime = int(system.lifetime[i])
+        self.radius = float(system.radius[i])
+        self.color = tuple(system.color[i].tolist())
+        self.is_enemy = system.owner[i] == ENEMY
+
+    def is_alive(self, game_api=None):
+        return self.age < self.lifetime
+
+class ProjectileSystem:
+    FIELDS = ("pos", "prev", "dir", "speed", "age", "lifetime", "owner", "radius", "color")
+
+    def __init__(self, capacity=PROJECTILE_CAPACITY, **kwargs):
+        self.count = 0
+        # Полосы, которые обрабатываются векторно; остальные пули живут в обычных списках
+        self.enabled = {PLAYER: True, ENEMY: True}
+        self.sprite_names = {PLAYER: "bullet.png", ENEMY: "enemy_bullet.png"}
+        self.alpha = 1.0  # доля пути от prev к pos при отрисовке (см. timestep.py)
+        self.drawn = 0  # сколько пуль попало в экран при последней отрисовке
+        self._allocate(capacity)
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.prev = np.zeros((capacity, 2))  # позиция до последнего тика
+        self.dir = np.zeros((capacity, 2))
+        self.speed = np.zeros(capacity)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.radius = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in self.FIELDS}
+        self._allocate(capacity)
+        for name, arr in old.items():
+            getattr(self, name)[:self.count] = arr[:self.count]
+
+    def spawn(self, pos, velocity, speed, color, lifetime, owner=PLAYER, radius=5):
+        vx, vy = velocity[0], velocity[1]
+        length = math.hypot(vx, vy)
+        if length == 0:
+            return None
+        self._reserve(1)
+        i = self.count
+        self.pos[i] = (pos[0], pos[1])
+        self.prev[i] = self.pos[i]
+        self.dir[i] = (vx / length, vy / length)
+        self.speed[i] = speed
+        self.age[i] = 0
+        self.lifetime[i] = lifetime
+        self.owner[i] = owner
+        self.radius[i] = radius
+        self.color[i] = tuple(color)[:3]
+        self.count += 1
+        return i
+
+    def spawn_many(self, positions, directions, speed, color, lifetime, owner=PLAYER, radius=5):
+        """Bulk spawn for bullet-hell patterns: positions and directions are (N, 2) arrays."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        keep = lengths > 0
+        positions, directions, lengths = positions[keep], directions[keep], lengths[keep]
+        k = len(positions)
+        if not k:
+            return
+        self._reserve(k)
+        s = slice(self.count, self.count + k)
+        self.pos[s] = positions
+        self.prev[s] = positions
+        self.dir[s] = directions / lengths[:, None]
+        self.speed[s] = speed
+        self.age[s] = 0
+        self.lifetime[s] = lifetime
+        self.owner[s] = owner
+        self.radius[s] = radius
+        self.color[s] = tuple(color)[:3]
+        self.count += k
+
+    def indices(self, owner):
+        return np.flatnonzero(self.owner[:self.count] == owner)
+
+    def step(self, owner):
+        """Move one owner's projectiles by a tick; return indices of those that expired."""
+        idx = self.indices(owner)
+        if not len(idx):
+            return idx
+        self.prev[idx] = self.pos[idx]
+        self.pos[idx] += self.dir[idx] * self.speed[idx, None]
+        self.age[idx] += 1
+        return idx[self.age[idx] >= self.lifetime[idx]]
+
+    def remove(self, indices):
+        # Удаление с сохранением порядка: порядок пуль влияет на порядок попаданий
+        n = self.count
+        keep = np.ones(n, dtype=bool)
+        keep[np.asarray(indices, dtype=np.intp)] = False
+        m = int(keep.sum())
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[:n][keep]
+        self.count = m
+
+    def clear(self):
+        self.count = 0
+
+    def hits(self, owner, pos, radius):
+        """Indices of owner's projectiles closer to pos than radius + projectile radius."""
+        idx = self.indices(owner)
+        if not len(idx):
+            return idx
+        d = self.pos[idx] - (pos[0], pos[1])
+        r = radius + self.radius[idx]
+        return idx[(d * d).sum(axis=1) < r * r]
+
+    def candidates(self, owner, grid):
+        """Indices of owner's projectiles that lie in an occupied cell of a SpatialHash."""
+        idx = self.indices(owner)
+        if not len(idx) or not grid.cells:
+            return []
+        cells = np.floor(self.pos[idx] / grid.cell_size).astype(np.int64)
+        keys = _cell_key(cells[:, 0], cells[:, 1])
+        occupied = np.fromiter((_cell_key(cx, cy) for cx, cy in grid.cells), dtype=np.int64, count=len(grid.cells))
+        return idx[np.isin(keys, occupied)].tolist()
+
+    def view(self, i):
+        return ProjectileView(self, i)
+
+    def draw(self, surface, camera_pos, config):
+        n = self.count
+        self.drawn = 0
+        if not n:
+            return
+        half_w, half_h = config.width // 2, config.height // 2
+        pos = self.pos[:n]
+        if self.alpha < 1.0:
+            pos = self.prev[:n] + (pos - self.prev[:n]) * self.alpha
+        screen = pos - (camera_pos.x - half_w, camera_pos.y - half_h)
+        margin = 20 + float(self.radius[:n].max())
+        visible = np.flatnonzero(
+            (screen[:, 0] > -margin) & (screen[:, 0] < config.width + margin) &
+            (screen[:, 1] > -margin) & (screen[:, 1] < config.height + margin)
+        )
+        self.drawn = len(visible)
+        if not self.drawn:
+            return
+        for owner in (PLAYER, ENEMY):
+            idx = visible[self.owner[visible] == owner]
+            if not len(idx):
+                continue
+            sprite = assets.get_scaled(self.sprite_names[owner], (18, 18)) if USE_SPRITES else None
+            xs = screen[idx, 0].astype(int).tolist()
+            ys = screen[idx, 1].astype(int).tolist()
+            if sprite:
+                d = self.dir[idx]
+                # Тот же угол, что в Bullet.draw: -dir.angle_to((0, -1))
+                angles = 90 + np.degrees(np.arctan2(d[:, 1], d[:, 0]))
+                steps = rotations.steps
+                frames_idx = (np.rint(angles * steps / 360.0).astype(int) % steps).tolist()
+                frames = {}
+                blits = []
+                for x, y, f in zip(xs, ys, frames_idx):
+                    frame = frames.get(f)
+                    if frame is None:
+                        image = rotations.get(sprite, f * 360.0 / steps)
+                        frame = frames[f] = (image, image.get_width() // 2, image.get_height() // 2)
+                    blits.append((frame[0], (x - frame[1], y - frame[2])))
+                surface.blits(blits, doreturn=False)
+            else:
+                colors = self.color[idx].tolist()
+                radii = self.radius[idx].astype(int).tolist()
+                for x, y, color, r in zip(xs, ys, colors, radii):
+                    pygame.draw.circle(surface, color, (x, y), r)
+
+class ProjectileList(list):
+    """List of Bullet objects (compatibility lane) that routes core shots into a ProjectileSystem."""
+    def __init__(self, system=None, owner=PLAYER, iterable=()):
+        super().__init__(iterable)
+        self.system = system
+        self.owner = owner
+
+    def spawn(self, pos, velocity, speed, color, lifetime, config, bullet_cls=Bullet, **kwargs):
+        system = self.system
+        # Пули с дополнительными полями или своим классом остаются объектами
+        if system is not None and system.enabled.get(self.owner) and bullet_cls is Bullet and not kwargs:
+            return system.spawn(pos, velocity, speed, color, lifetime, self.owner)
+        bullet = pools.acquire(bullet_cls, pos, velocity, speed, color, lifetime, config, is_enemy=self.owner == ENEMY, **kwargs)
+        self.append(bullet)
+        return bullet
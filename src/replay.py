@@ -0,0 +1,301 @@
+import pygame
+import io
+import json
+import pickle
+import struct
+import zlib
+from rng import rng
+from timestep import game_clock
+from settings import *
+
+# Файл записи: заголовок, затем поток записей по тикам.
+#   T <клавиши u8> <тиков u16>  — серия тиков с одинаковыми клавишами и без выстрелов
+#   S <dx i16> <dy i16>         — выстрел в следующем тике (прицел относительно центра экрана)
+#   K <тик u32> <контрольная u32> — ключевой кадр для проверки рассинхронизации
+MAGIC = b"SMFR"
+VERSION = 1
+HEADER = struct.Struct("<4sBQBHHHI")  # magic, версия, зерно, сложность, sim_rate, ширина, высота, длина meta
+RUN = struct.Struct("<BH")
+SHOT = struct.Struct("<hh")
+KEYFRAME = struct.Struct("<II")
+
+# Клавиши движения -> бит маски
+KEY_BITS = {
+    pygame.K_UP: 1, pygame.K_w: 1,
+    pygame.K_DOWN: 2, pygame.K_s: 2,
+    pygame.K_LEFT: 4, pygame.K_a: 4,
+    pygame.K_RIGHT: 8, pygame.K_d: 8,
+}
+
+class KeyState:
+    """Indexable like pygame.key.get_pressed(); movement keys come from a bit mask."""
+    def __init__(self, bits, live=None):
+        self.bits = bits
+        self.live = live
+
+    def __getitem__(self, key):
+        bit = KEY_BITS.get(key)
+        if bit is not None:
+            return bool(self.bits & bit)
+        # Остальные клавиши в запись не попадают: при воспроизведении они не нажаты
+        return bool(self.live[key]) if self.live is not None else False
+
+def key_bits(pressed):
+    bits = 0
+    for key, bit in KEY_BITS.items():
+        if pressed[key]:
+            bits |= bit
+    return bits
+
+def state_digest(state, achievements):
+    """Checksum of the simulation state, compared at keyframes to detect desyncs."""
+    player = state["player"]
+    parts = [
+        state["score"], state["level"], player.lives,
+        round(player.pos.x, 3), round(player.pos.y, 3),
+        achievements.stats.get("enemies_killed", 0),
+        game_clock.ticks, hash(rng.getstate()[1]),
+    ]
+    for enemy in state["enemies"]:
+        parts.append((round(enemy.pos.x, 2), round(enemy.pos.y, 2)))
+    projectiles = state.get("projectiles")
+    if projectiles is not None:
+        parts.append((projectiles.count, round(float(projectiles.pos[:projectiles.count].sum()), 2)))
+    parts.append(len(state["bullets"]) + len(state["enemy_bullets"]))
+    return zlib.crc32(repr(parts).encode())
+
+class Recorder:
+    def __init__(self, path, seed, difficulty, sim_rate, size, meta=None, **kwargs):
+        self.path = path
+        self.file = open(path, "wb")
+        meta = json.dumps(meta or {}, default=str).encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, difficulty, sim_rate, size[0], size[1], len(meta)))
+        self.file.write(meta)
+        self.buffer = bytearray()
+        self.bits = 0
+        self.run = 0  # тиков в текущей серии
+        self.ticks = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def _end_run(self):
+        if self.run:
+            self.buffer += b"T" + RUN.pack(self.bits, self.run)
+            self.run = 0
+
+    def tick(self, bits, shots=()):
+        if bits != self.bits or shots or self.run == 0xFFFF:
+            self._end_run()
+            self.bits = bits
+        for dx, dy in shots:
+            self.buffer += b"S" + SHOT.pack(dx, dy)
+        self.run += 1
+        self.ticks += 1
+
+    def keyframe(self, tick, digest):
+        self._end_run()
+        self.buffer += b"K" + KEYFRAME.pack(tick, digest)
+        # Сбрасываем на диск на каждом ключевом кадре: после падения запись остаётся пригодной
+        self.flush()
+
+    def flush(self):
+        if self.file is None:
+            return
+        self._end_run()
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+class _SnapshotPickler(pickle.Pickler):
+    # Поверхности и конфиг не копируются: снимок ссылается на те же объекты
+    def __init__(self, file, shared):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (pygame.Surface, GameConfig)):
+            self.shared[id(obj)] = obj
+            return id(obj)
+        return None
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid):
+        return self.shared[pid]
+
+class Playback:
+    """Decoded recording: per-tick inputs, keyframe checksums and in-memory snapshots for seeking."""
+    def __init__(self, path, **kwargs):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, difficulty, sim_rate, width, height, meta_len = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: не файл записи или неподдерживаемая версия")
+        offset = HEADER.size
+        self.header = {
+            "seed": seed,
+            "difficulty": difficulty,
+            "sim_rate": sim_rate,
+            "size": (width, height),
+            "meta": json.loads(data[offset:offset + meta_len].decode("utf-8") or "{}"),
+        }
+        offset += meta_len
+        self.keys = bytearray()  # маска клавиш на каждый тик
+        self.shots = {}  # тик -> [(dx, dy), ...]
+        self.keyframes = {}  # тик -> контрольная сумма
+        end = len(data)
+        while offset < end:
+            kind = data[offset:offset + 1]
+            offset += 1
+            # Оборванная последняя запись (игра упала) просто отбрасывается
+            if kind == b"T" and offset + RUN.size <= end:
+                bits, count = RUN.unpack_from(data, offset)
+                offset += RUN.size
+                self.keys += bytes((bits,)) * count
+            elif kind == b"S" and offset + SHOT.size <= end:
+                self.shots.setdefault(len(self.keys), []).append(SHOT.unpack_from(data, offset))
+                offset += SHOT.size
+            elif kind == b"K" and offset + KEYFRAME.size <= end:
+                tick, digest = KEYFRAME.unpack_from(data, offset)
+                offset += KEYFRAME.size
+                self.keyframes[tick] = digest
+            else:
+                break
+        self.length = len(self.keys)
+        self.tick = 0
+        self.desyncs = []  # тики, где контрольная сумма не совпала
+        self.snapshots = {}  # тик -> снимок состояния (bytes)
+        self.shared = {}
+        self.can_snapshot = True
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    @property
+    def finished(self):
+        return self.tick >= self.length
+
+    def next_tick(self):
+        if self.finished:
+            return 0, []
+        tick = self.tick
+        self.tick += 1
+        return self.keys[tick], self.shots.get(tick, [])
+
+    def verify(self, tick, digest):
+        expected = self.keyframes.get(tick)
+        if expected is not None and expected != digest:
+            if not self.desyncs:
+                print(f"Рассинхронизация записи на тике {tick}")
+            self.desyncs.append(tick)
+
+    def remember(self, state, achievements):
+        """Keep an in-memory snapshot of the current tick for seeking back."""
+        if not self.can_snapshot or self.tick in self.snapshots:
+            return
+        data = {
+            "state": state,
+            "stats": dict(achievements.stats),
+            "achievements": dict(achievements.achievements),
+            "rng": rng.getstate(),
+            "clock": game_clock.ticks,
+        }
+        buffer = io.BytesIO()
+        try:
+            _SnapshotPickler(buffer, self.shared).dump(data)
+        except Exception as e:
+            # Объекты модов могут не сериализоваться — тогда перемотка назад идёт с начала записи
+            print(f"Снимки состояния отключены: {e}")
+            self.can_snapshot = False
+            return
+        self.snapshots[self.tick] = buffer.getvalue()
+
+    def restore(self, target):
+        """Load the latest snapshot at or before target; returns its data dict or None."""
+        ticks = [t for t in self.snapshots if t <= target]
+        if not ticks:
+            return None
+        tick = max(ticks)
+        data = _SnapshotUnpickler(io.BytesIO(self.snapshots[tick]), self.shared).load()
+        rng.setstate(data["rng"])
+        game_clock.reset(data["clock"])
+        self.tick = tick
+        return data
+
+class Controls:
+    """Player input for each simulation tick: live from pygame or fed from a Playback."""
+    def __init__(self, **kwargs):
+        self.bits = 0  # клавиши движения текущего тика
+        self.live = None
+        self.pending = []  # выстрелы, ждущие ближайшего тика
+        self.recorder = None
+        self.source = None  # Playback при воспроизведении
+        self.ticks = 0
+        self.keyframe_interval = REPLAY_KEYFRAME_TICKS
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def shoot(self, mouse_pos, config):
+        # Выстрел запоминается целым смещением прицела от центра экрана — ровно так, как он попадёт в запись
+        dx = max(-32768, min(32767, int(round(mouse_pos[0])) - config.width // 2))
+        dy = max(-32768, min(32767, int(round(mouse_pos[1])) - config.height // 2))
+        self.pending.append((dx, dy))
+
+    def sample(self):
+        """Take the input for the next tick; returns the shots to fire in it."""
+        if self.source is not None:
+            self.bits, shots = self.source.next_tick()
+            self.live = None
+        else:
+            self.live = pygame.key.get_pressed()
+            self.bits = key_bits(self.live)
+            shots, self.pending = self.pending, []
+        if self.recorder is not None:
+            self.recorder.tick(self.bits, shots)
+        self.ticks += 1
+        return shots
+
+    def get_pressed(self):
+        return KeyState(self.bits, self.live)
+
+    def end_tick(self, state, achievements):
+        if self.ticks % self.keyframe_interval:
+            return
+        if self.recorder is None and self.source is None:
+            return
+        digest = state_digest(state, achievements)
+        if self.recorder is not None:
+            self.recorder.keyframe(self.ticks, digest)
+        if self.source is not None:
+            self.source.verify(self.ticks, digest)
+            self.source.remember(state, achievements)
+
+    def start_recording(self, path, seed, difficulty, sim_rate, size, meta=None):
+        self.stop_recording()
+        self.recorder = Recorder(path, seed, difficulty, sim_rate, size, meta)
+        self.ticks = 0
+        self.pending = []
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def play(self, playback):
+        self.source = playback
+        self.ticks = playback.tick
+        self.pending = []
+
+controls = Controls()
@@ -0,0 +1,12 @@
+import random
+
+# Вся случайность игрового процесса идёт через один генератор:
+# с тем же зерном и тем же вводом забег повторяется тик в тик (см. replay.py)
+rng = random.Random()
+
+def new_seed():
+    return random.SystemRandom().getrandbits(63)
+
+def derive_seed(seed):
+    # Зерно следующей игры из зерна предыдущей, не трогая сам генератор
+    return (seed * 6364136223846793005 + 1442695040888963407) % (1 << 63)
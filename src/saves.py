@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import threading
+from settings import *
+
+class SaveWriter:
+    """Writes save data on a background thread: latest request wins, the file is replaced atomically.
+
+    request() only stores a snapshot and returns; the thread waits SAVE_DEBOUNCE seconds for
+    newer requests, serializes the last one and swaps it in through a temp file.
+    flush() writes whatever is pending right away and waits for it.
+    """
+    def __init__(self, path=SAVE_FILE, debounce=SAVE_DEBOUNCE, **kwargs):
+        self.path = path
+        self.debounce = debounce
+        self.pending = None  # снимок, который ещё не записан
+        self.requested = 0.0  # когда пришёл последний запрос
+        self.writing = False
+        self.urgent = False  # flush(): писать без ожидания
+        self.writes = 0
+        self.requests = 0
+        self.last_error = None
+        self.condition = threading.Condition()
+        self.thread = None
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def request(self, data):
+        # data должен быть снимком: поток прочитает его позже, когда игра уже изменит свои таблицы
+        with self.condition:
+            self.pending = data
+            self.requested = time.monotonic()
+            self.requests += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def flush(self, timeout=5.0):
+        """Write the pending snapshot now; True if nothing is left unwritten."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self.urgent = True
+            self.condition.notify()
+            while self.pending is not None or self.writing:
+                left = deadline - time.monotonic()
+                if left <= 0 or self.thread is None or not self.thread.is_alive():
+                    break
+                self.condition.wait(left)
+            self.urgent = False
+            return self.pending is None and not self.writing
+
+    def busy(self):
+        return self.pending is not None or self.writing
+
+    def _run(self):
+        condition = self.condition
+        while True:
+            with condition:
+                while self.pending is None:
+                    condition.wait()
+                # Повторные запросы в пределах debounce сливаются в одну запись
+                while not self.urgent:
+                    left = self.requested + self.debounce - time.monotonic()
+                    if left <= 0:
+                        break
+                    condition.wait(left)
+                data, self.pending = self.pending, None
+                self.writing = True
+            try:
+                self.write(data)
+            finally:
+                with condition:
+                    self.writing = False
+                    condition.notify_all()
+
+    def write(self, data):
+        # Временный файл рядом с сохранением: os.replace атомарен только в пределах одного диска
+        tmp = f"{self.path}.tmp"
+        try:
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.writes += 1
+            self.last_error = None
+            print(f"Progress saved to {self.path}")
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = e
+            print(f"Failed to save progress to {self.path}: {e}")
+
+save_writer = SaveWriter()
@@ -22,6 +22,13 @@ STAR_COLORS = [
     (255, 200, 200), 
     (180, 255, 220), 
 ]
+STAR_LAYERS = [  # (параллакс, звёзд на экран) — слои рисуются один раз, плотность можно поднимать
+    (0.2, 80),
+    (0.4, 60),
+    (0.6, 40),
+    (0.8, 30),
+    (0.95, 20),
+]
 
 MAX_ENEMIES = 10 
 PLAYER_LIVES = 4 
@@ -33,6 +40,51 @@ PLAYER_COLORS = [
     (40, 40, 40), 
 ]
 SAVE_FILE = os.path.join(os.path.dirname(__file__), "..", "savegame.json")
+SAVE_DEBOUNCE = 0.5  # секунд ждать новых запросов сохранения, прежде чем писать файл
+AUTOSAVE_INTERVAL = 30  # секунд между автосохранениями во время игры (только если прогресс изменился)
+SOUND_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "sounds")  # декодированные звуки (PCM) между запусками
+MOD_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "mods")  # байткод модов и время их загрузки
+MOD_LOAD_BUDGET_MS = 0  # общий бюджет на загрузку модов по времени прошлого запуска; 0 — без ограничения
+AUDIO_CHANNELS = 16  # каналов микшера
+AUDIO_RESERVED = 4  # из них только для важных звуков (приоритет не ниже AUDIO_RESERVED_PRIORITY)
+AUDIO_RESERVED_PRIORITY = 5
+# Звуки: приоритет, сколько копий звучит одновременно, минимум мс между запусками
+AUDIO_RULES = {
+    "shoot": {"priority": 1, "voices": 3, "interval": 60},
+    "hit": {"priority": 2, "voices": 4, "interval": 40},
+    "bonus": {"priority": 3, "voices": 2, "interval": 0},
+    "player_hit": {"priority": 5, "voices": 2, "interval": 0},
+    "levelup": {"priority": 6, "voices": 1, "interval": 0},
+    "achievement": {"priority": 6, "voices": 1, "interval": 0},
+    "death": {"priority": 7, "voices": 1, "interval": 0},
+}
+ASSET_CACHE_SIZE = 256  # максимум масштабированных копий спрайтов в кеше
+TEXT_CACHE_SIZE = 512  # максимум закешированных отрендеренных строк
+HUD_PANEL_WIDTH = 340  # ширина правой колонки HUD, которая копируется из кеша на экран
+SPATIAL_CELL_SIZE = 128  # размер ячейки сетки для поиска столкновений
+PROJECTILE_CAPACITY = 1024  # начальный размер массивов пуль, растёт удвоением
+POOL_MAX_SIZE = 2048  # сколько свободных объектов одного класса держит пул
+EFFECT_CACHE_BYTES = 64 * 1024 * 1024  # бюджет памяти на запечённые кадры эффектов
+SIM_RATE = 60  # тиков логики в секунду, не зависит от FPS отрисовки
+MAX_CATCHUP_STEPS = 5  # сколько тиков можно догнать за один кадр, остальное время отбрасывается
+MAX_FRAME_TIME = 0.25  # кадр дольше этого (сек) считается паузой
+TELEPORT_DISTANCE = 256  # смещение за тик, после которого объект не интерполируется
+ROTATION_STEPS = 64  # количество заранее повёрнутых кадров на спрайт (64 или 128)
+REPLAY_KEYFRAME_TICKS = 600  # период ключевых кадров записи в тиках (проверка и перемотка)
+REPLAY_SEEK_SECONDS = 10  # шаг перемотки записи стрелками влево/вправо
+PROFILE_HISTORY = 600  # сколько последних кадров хранит профайлер фаз
+PROFILE_OVERLAY_SIZE = (420, 260)  # размер оверлея профайлера (F3)
+PROFILE_OVERLAY_TEXT_FRAMES = 30  # раз в сколько кадров обновлять цифры на оверлее
+HEADLESS_SIZE = (1920, 1080)  # размер виртуального экрана в безголовом режиме
+HEADLESS_MINUTES = 10  # сколько игровых минут прогоняет --headless по умолчанию
+HEADLESS_REPORT_MINUTES = 1  # раз в сколько игровых минут печатать скорость (тиков/с)
+HEADLESS_FIRE_INTERVAL = 15  # тиков между выстрелами автопилота
+ENEMY_DESPAWN_DISTANCE = 2500  # враги дальше этого расстояния от игрока исчезают
+ENEMY_BATCH_MIN = 32  # с какого числа врагов их движение считается пакетом (swarm.py); при враге в полосе LOD — при любом числе
+ENEMY_LOD_BANDS = [(1200, 2), (1700, 4), (2100, 8)]  # (расстояние до игрока, раз в сколько тиков): дальние враги вне экрана обновляются реже
+ENEMY_LOD_VIEW_MARGIN = 150  # запас вокруг экрана: враги в нём всегда обновляются каждый тик
+CULL_MARGIN = 48  # запас вокруг экрана при отсечении: сглаживание движения, тени, подсветка
+CULL_INDEX_MIN = 64  # с какого числа объектов отсечение идёт через пространственную сетку
 
 ENEMY_SPAWN_TIME = 120 
 BULLET_SPEED = 18 
@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import mmap
+import hashlib
+import threading
+import pygame
+from settings import *
+
+class SoundCache:
+    """Decoded PCM of sound files on disk, so later starts skip MP3/OGG decoding.
+
+    A cache file is named after the source's content hash and the mixer format
+    (frequency, size, channels); the hash is recomputed only when the file's
+    mtime or size changes. Files for other formats or old versions of a source are removed.
+    """
+    def __init__(self, path=SOUND_CACHE_DIR, **kwargs):
+        self.path = path
+        self.enabled = True
+        self.index = None  # путь к источнику -> [mtime_ns, размер, sha1]
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def _index_path(self):
+        return os.path.join(self.path, "index.json")
+
+    def _load_index(self):
+        if self.index is None:
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+        return self.index
+
+    def _save_index(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self._index_path())
+
+    def digest(self, source):
+        # Хеш содержимого файла; по mtime и размеру видно, что пересчитывать его не нужно
+        st = os.stat(source)
+        with self.lock:
+            entry = self._load_index().get(source)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        with open(source, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with self.lock:
+            self._load_index()[source] = [st.st_mtime_ns, st.st_size, digest]
+            self._save_index()
+        return digest
+
+    def prefix(self, source):
+        # Имя файла плюс хеш пути: одноимённые звуки из разных папок (ядро, моды) не путаются
+        name = os.path.splitext(os.path.basename(source))[0]
+        return f"{name}-{hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]}-"
+
+    def file(self, source, fmt=None):
+        """Cache file for source in the current (or given) mixer format."""
+        frequency, size, channels = fmt or pygame.mixer.get_init()
+        return os.path.join(self.path, f"{self.prefix(source)}{self.digest(source)[:16]}-{frequency}x{size}x{channels}.pcm")
+
+    def load(self, source, volume=None):
+        """pygame.mixer.Sound for source, from cached PCM if possible."""
+        if not self.enabled or pygame.mixer.get_init() is None:
+            sound = pygame.mixer.Sound(source)
+        else:
+            source = os.path.abspath(source)
+            try:
+                cached = self.file(source)
+                sound = self._read(cached)
+                if sound is None:
+                    sound = pygame.mixer.Sound(source)
+                    self._write(source, cached, sound)
+            except OSError:
+                # Кеш недоступен (нет прав, диск только для чтения) — просто декодируем
+                self.errors += 1
+                sound = pygame.mixer.Sound(source)
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound
+
+    def _read(self, cached):
+        try:
+            with open(cached, "rb") as f:
+                # Отображённый в память файл копируется прямо в звук, без промежуточного bytes
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    sound = pygame.mixer.Sound(buffer=data)
+        except (OSError, ValueError):
+            # Нет файла или он пустой (mmap не отображает файлы нулевой длины)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return sound
+
+    def _write(self, source, cached, sound):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = f"{cached}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(tmp, cached)
+        # Старые версии этого звука и копии под другой формат микшера больше не нужны
+        stale = re.compile(re.escape(self.prefix(source)) + r"[0-9a-f]{16}-\d+x-?\d+x\d+\.pcm")
+        keep = os.path.basename(cached)
+        for fname in os.listdir(self.path):
+            if fname != keep and stale.fullmatch(fname):
+                try:
+                    os.remove(os.path.join(self.path, fname))
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self.lock:
+            self.index = {}
+            if os.path.isdir(self.path):
+                for fname in os.listdir(self.path):
+                    os.remove(os.path.join(self.path, fname))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+sound_cache = SoundCache()
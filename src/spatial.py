@@ -0,0 +1,69 @@
+import math
+from settings import *
+
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE, **kwargs):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> [(порядковый номер, объект), ...]
+        self.count = 0
+        self.stamp = None  # метка актуальности (тик сборки), её ставит тот, кто строит сетку
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, obj, pos, radius=0):
+        """Add obj to every cell its bounding square (pos ± radius) touches."""
+        cs = self.cell_size
+        x0, y0 = math.floor((pos.x - radius) / cs), math.floor((pos.y - radius) / cs)
+        x1, y1 = math.floor((pos.x + radius) / cs), math.floor((pos.y + radius) / cs)
+        entry = (self.count, obj)
+        self.count += 1
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [entry]
+                else:
+                    bucket.append(entry)
+
+    def build(self, objects, margin=0):
+        self.clear()
+        for obj in objects:
+            self.insert(obj, obj.pos, getattr(obj, "radius", 0) + margin)
+
+    def query_point(self, pos):
+        # Объекты в ячейке уже идут в порядке вставки
+        return [obj for _, obj in self.cells.get(self.cell(pos.x, pos.y), ())]
+
+    def query(self, pos, radius=0):
+        """Objects whose cells overlap pos ± radius, deduplicated, in insertion order."""
+        if radius <= 0:
+            return self.query_point(pos)
+        return self.query_rect(pos.x - radius, pos.y - radius, pos.x + radius, pos.y + radius)
+
+    def query_rect(self, left, top, right, bottom):
+        cs = self.cell_size
+        x0, y0 = math.floor(left / cs), math.floor(top / cs)
+        x1, y1 = math.floor(right / cs), math.floor(bottom / cs)
+        found = {}
+        cells = self.cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Область больше заполненной части сетки — дешевле пройти по самим ячейкам
+            for (cx, cy), bucket in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    for index, obj in bucket:
+                        found[index] = obj
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    for index, obj in cells.get((cx, cy), ()):
+                        found[index] = obj
+        return [found[i] for i in sorted(found)]
@@ -0,0 +1,60 @@
+import pygame
+import random
+from settings import *
+
+class Starfield:
+    def __init__(self, layers=None, **kwargs):
+        # (коэффициент параллакса, количество звёзд на экран)
+        self.layers = list(layers if layers is not None else STAR_LAYERS)
+        self.surfaces = []
+        self.size = None
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def invalidate(self):
+        # Вызывать после изменения self.layers — слои пересоберутся при следующей отрисовке
+        self.size = None
+
+    def build(self, width, height):
+        """Render every parallax layer once into a tileable, screen-sized surface."""
+        self.surfaces = []
+        for layer, num_stars in self.layers:
+            surf = pygame.Surface((width, height))
+            surf.fill((0, 0, 0))
+            rng = random.Random(int(layer * 10000))
+            max_radius = 2 if layer < 0.7 else 3
+            for i in range(num_stars):
+                x = rng.uniform(0, width)
+                y = rng.uniform(0, height)
+                color = rng.choice(STAR_COLORS)
+                radius = rng.randint(1, max_radius)
+                # Звёзды у края дублируются с другой стороны, чтобы тайл был бесшовным
+                for dx in (-width, 0, width):
+                    for dy in (-height, 0, height):
+                        px, py = x + dx, y + dy
+                        if -radius <= px < width + radius and -radius <= py < height + radius:
+                            pygame.draw.circle(surf, color, (int(px), int(py)), radius)
+            if pygame.display.get_surface():
+                surf = surf.convert()
+            # Звёзд мало относительно площади — RLE делает прозрачные пиксели почти бесплатными
+            surf.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self.surfaces.append((layer, surf))
+        self.size = (width, height)
+
+    def draw(self, surface, camera_pos, config):
+        if self.size != (config.width, config.height):
+            self.build(config.width, config.height)
+        w, h = self.size
+        for layer, layer_surf in self.surfaces:
+            ox = int((camera_pos.x * (1 - layer)) % w)
+            oy = int((camera_pos.y * (1 - layer)) % h)
+            surface.blit(layer_surf, (-ox, -oy))
+            if ox:
+                surface.blit(layer_surf, (w - ox, -oy))
+            if oy:
+                surface.blit(layer_surf, (-ox, h - oy))
+            if ox and oy:
+                surface.blit(layer_surf, (w - ox, h - oy))
+
+starfield = Starfield()
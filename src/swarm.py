@@ -0,0 +1,332 @@
+import pygame
+import numpy as np
+from collections import deque
+from itertools import chain, compress, repeat
+from operator import attrgetter
+from enemy import Enemy, ENEMY_TYPES
+from timestep import game_clock
+from dispatch import dispatch
+from profiler import profiler
+from settings import *
+
+_pos = attrgetter("pos")
+_vel = attrgetter("vel")
+_type = attrgetter("type")
+_class = attrgetter("__class__")
+_set_vector = pygame.Vector2.update
+_UNSET = -1  # поле расписания LOD не задано (как в Enemy.__init__); настоящие тики не меньше 0
+
+def _consume(iterator):
+    deque(iterator, maxlen=0)
+
+def _vectors(vectors, n):
+    # Vector2 итерируется как (x, y): координаты читаются без цикла на Python
+    return np.fromiter(chain.from_iterable(vectors), float, 2 * n).reshape(n, 2)
+
+def _column(objs, name, n, dtype=float):
+    return np.fromiter(map(attrgetter(name), objs), dtype, n)
+
+def _write(objs, name, values):
+    _consume(map(setattr, objs, repeat(name), values))
+
+class BatchClasses(dict):
+    # Наследник Enemy со своим update считается поштучно
+    def __missing__(self, cls):
+        ok = self[cls] = getattr(cls, "update", None) is Enemy.update
+        return ok
+
+class EnemySwarm:
+    """Batched enemy steering: one NumPy pass per tick instead of Enemy.update per object.
+
+    Enemy objects remain the source of truth: positions, velocities and timers are read
+    from them at the start of the tick and written back at the end, so collisions,
+    drawing and mods see the usual attributes. Constants fixed at spawn (orbit, wobble,
+    zigzag amplitude) are cached until the list of enemies changes.
+    """
+    def __init__(self, **kwargs):
+        self.enabled = True
+        self.batch_classes = BatchClasses()  # класс -> его update можно считать пакетом
+        self.seen = []  # список врагов, для которого собраны кеши
+        self.members = []  # враги пакета (строки массивов)
+        self.rows = np.zeros(0, dtype=np.intp)  # их индексы в state["enemies"]
+        self.others = []  # враги со своим update: считаются поштучно
+        self.batched = 0
+        self.fallback = 0
+        self.lod = sorted(ENEMY_LOD_BANDS)  # [(расстояние, раз в сколько тиков)]; пустой список — без LOD
+        self.band_counts = {}  # lod0 — полный режим, lodN — N-я полоса
+        self.last = np.zeros(0, dtype=np.int64)  # тик, до которого досчитан каждый враг пакета
+        self.behind = np.zeros(0, dtype=bool)  # у врага записан lod_tick (он пропустил тик)
+        self.slot = np.zeros(0, dtype=np.int64)  # постоянный сдвиг расписания дальних обновлений
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def can_batch(self, enemy):
+        return self.batch_classes[enemy.__class__] and enemy.type in ENEMY_TYPES
+
+    def invalidate(self):
+        self.seen = []
+
+    def _rebuild(self, enemies):
+        # Все проверки — через map по списку: пересборка случается при каждом убийстве и спавне
+        n = len(enemies)
+        types = list(map(_type, enemies))
+        mask = np.fromiter(map(self.batch_classes.__getitem__, map(_class, enemies)), bool, n)
+        mask &= np.fromiter(map(ENEMY_TYPES.__contains__, types), bool, n)
+        mask_list = mask.tolist()
+        members = list(compress(enemies, mask_list))
+        k = len(members)
+        self.seen = list(enemies)
+        self.rows = np.flatnonzero(mask)
+        self.members = members
+        self.others = list(compress(enemies, (~mask).tolist()))
+        self.zigzag = np.fromiter(map("zigzag".__eq__, compress(types, mask_list)), bool, k)
+        self.zigzag_rows = np.flatnonzero(self.zigzag)
+        self.zigzag_members = list(compress(members, self.zigzag.tolist()))
+        self.zigzag_ampl = np.zeros(k)
+        self.zigzag_ampl[self.zigzag_rows] = _column(self.zigzag_members, "zigzag_ampl", len(self.zigzag_members))
+        self.orbit_phase = _column(members, "orbit_phase", k)
+        self.orbit_radius = _column(members, "orbit_radius", k)
+        wobble_angle = _column(members, "wobble_angle", k)
+        # Расписание LOD хранится у самих врагов: номер строки меняется при каждой смерти и спавне.
+        # lod_tick записан только у тех, кто пропустил тик; остальные (и новые) досчитаны до прошлого тика.
+        # Сдвиг зависит только от тика и строки появления, поэтому запись и перемотка реплея совпадают
+        ticks = game_clock.ticks
+        last = np.fromiter(map(getattr, members, repeat("lod_tick"), repeat(_UNSET)), np.int64, k)
+        slot = np.fromiter(map(getattr, members, repeat("lod_slot"), repeat(_UNSET)), np.int64, k)
+        self.behind = last != _UNSET
+        last[~self.behind] = ticks - 1
+        new = np.flatnonzero(slot == _UNSET)
+        if len(new):
+            slot[new] = ticks + new
+            _write([members[i] for i in new.tolist()], "lod_slot", slot[new].tolist())
+        self.last = last
+        self.slot = slot
+        # Покачивание у зигзагов не используется
+        self.wobble = np.where(self.zigzag[:, None], 0.0, np.stack([np.cos(wobble_angle), np.sin(wobble_angle)], axis=1) * 2)
+
+    def update(self, state, game_api=None):
+        """Despawn far enemies, then steer, move and fire all of them for one tick."""
+        enemies = state["enemies"]
+        n = len(enemies)
+        if not n:
+            return
+        player_pos = state["player"].pos
+        enemy_bullets = state["enemy_bullets"]
+        camera_pos = state["camera"].get()
+        pos_objs = list(map(_pos, enemies))
+        pos = _vectors(pos_objs, n)
+        offset = pos - (player_pos.x, player_pos.y)
+        dist2 = (offset * offset).sum(axis=1)
+        keep = dist2 < ENEMY_DESPAWN_DISTANCE * ENEMY_DESPAWN_DISTANCE
+        if not keep.all():
+            keep_list = keep.tolist()
+            enemies = state["enemies"] = list(compress(enemies, keep_list))
+            pos_objs = list(compress(pos_objs, keep_list))
+            pos = pos[keep]
+            dist2 = dist2[keep]
+            n = len(enemies)
+        # LOD не зависит от порога пакета: если хоть один враг дальше первой полосы, считается пакет
+        lod = bool(self.lod) and bool((dist2 >= self.lod[0][0] * self.lod[0][0]).any())
+        if not self.enabled or dispatch.update_enemy is not None or (n < ENEMY_BATCH_MIN and not lod):
+            # Мод заменил поведение врагов, либо их мало и все рядом, так что NumPy не окупается: поштучно.
+            # Пропустившие тики сначала досчитываются до прошлого тика
+            self.catch_up(enemies, player_pos)
+            for enemy in enemies:
+                enemy.update(player_pos, enemy_bullets, camera_pos, game_api)
+            self.batched, self.fallback = 0, n
+            self.band_counts = {"lod0": n}
+            self.invalidate()
+            return
+        if enemies != self.seen:
+            self._rebuild(enemies)
+        members = self.members
+        k = len(members)
+        if k:
+            if self.others:
+                pos_objs = [pos_objs[i] for i in self.rows.tolist()]
+                pos = pos[self.rows]
+            self.step(members, pos_objs, pos, player_pos, camera_pos, state["player"].config, enemy_bullets)
+        for enemy in self.others:
+            enemy.update(player_pos, enemy_bullets, camera_pos, game_api)
+        self.batched, self.fallback = k, n - k
+
+    def lod_bands(self, pos, dist, camera_pos, config):
+        """Band of every row: 0 — full rate (in view or near), i — beyond lod[i - 1][0]."""
+        band = np.zeros(len(pos), dtype=np.intp)
+        for i, (distance, _) in enumerate(self.lod, 1):
+            band[dist >= distance] = i
+        half_w = config.width / 2 + ENEMY_LOD_VIEW_MARGIN
+        half_h = config.height / 2 + ENEMY_LOD_VIEW_MARGIN
+        # Всё, что видно на экране, всегда обновляется полностью
+        band[(np.abs(pos[:, 0] - camera_pos.x) < half_w) & (np.abs(pos[:, 1] - camera_pos.y) < half_h)] = 0
+        return band
+
+    def counts(self):
+        return dict(self.band_counts)
+
+    def step(self, members, pos_objs, pos, player_pos, camera_pos, config, enemy_bullets):
+        # То же, что Enemy.update, но сразу для всех строк
+        k = len(members)
+        px, py = player_pos.x, player_pos.y
+        to_x = px - pos[:, 0]
+        to_y = py - pos[:, 1]
+        dist = np.hypot(to_x, to_y)
+        zigzag, ampl, orbit_phase, orbit_radius, wobble = self.zigzag, self.zigzag_ampl, self.orbit_phase, self.orbit_radius, self.wobble
+        ticks = game_clock.ticks
+        # Сколько тиков прошло с прошлого обновления каждого врага: столько и досчитывается
+        dt = ticks - self.last
+        band = None
+        if self.lod:
+            band = self.lod_bands(pos, dist, camera_pos, config)
+            self.band_counts = {f"lod{i}": int(c) for i, c in enumerate(np.bincount(band, minlength=len(self.lod) + 1))}
+            if band.any():
+                # Дальний враг обновляется раз в every тиков, со своим постоянным сдвигом, чтобы нагрузка не шла рывками
+                every = np.array([1] + [every for _, every in self.lod], dtype=np.int64)[band]
+                due_mask = (ticks + self.slot) % every == 0
+                self.mark(members, due_mask, ticks)
+                due = np.flatnonzero(due_mask)
+                if len(due) < k:
+                    rows = due.tolist()
+                    members = [members[i] for i in rows]
+                    pos_objs = [pos_objs[i] for i in rows]
+                    pos, to_x, to_y, dist, dt, band = pos[due], to_x[due], to_y[due], dist[due], dt[due], band[due]
+                    zigzag, ampl, orbit_phase, orbit_radius, wobble = zigzag[due], ampl[due], orbit_phase[due], orbit_radius[due], wobble[due]
+                    k = len(members)
+                    if not k:
+                        return
+            else:
+                self.mark(members, None, ticks)
+        else:
+            self.band_counts = {"lod0": k}
+            self.mark(members, None, ticks)
+        vel = _vectors(map(_vel, members), k)
+        max_speed = _column(members, "max_speed", k)
+        accel = _column(members, "accel", k)
+        cooldown = _column(members, "cooldown", k, np.int64)
+        invuln = _column(members, "invuln_timer", k, np.int64)
+        zigzag_rows = np.flatnonzero(zigzag)
+        zigzag_members = [members[i] for i in zigzag_rows.tolist()]
+        phase = np.zeros(k)
+        phase[zigzag_rows] = _column(zigzag_members, "zigzag_phase", len(zigzag_members))
+
+        moving = dist > 1
+        safe = np.where(moving, dist, 1.0)
+        perp = np.stack([-to_y / safe, to_x / safe], axis=1)
+        # Пропущенные тики (дальняя полоса или возвращение из неё) досчитываются упрощённо
+        far = np.flatnonzero(dt > 1)
+        phase[zigzag & moving] += 0.15 * dt[zigzag & moving]
+        swing = np.where(
+            zigzag,
+            np.sin(phase) * ampl,
+            np.sin(game_clock.get_ticks() / 400 + orbit_phase) * orbit_radius,
+        )
+        target = perp * swing[:, None] + wobble
+        target[:, 0] += px
+        target[:, 1] += py
+        desired = target - pos
+        length = np.hypot(desired[:, 0], desired[:, 1])
+        desired *= (max_speed / np.where(length > 0, length, np.inf))[:, None]
+        steer = desired - vel
+        length = np.hypot(steer[:, 0], steer[:, 1])
+        steer *= np.where(length > accel, accel / np.where(length > 0, length, 1.0), 1.0)[:, None]
+        new_vel = vel + steer
+        length = np.hypot(new_vel[:, 0], new_vel[:, 1])
+        new_vel *= np.where(length > max_speed, max_speed / np.where(length > 0, length, 1.0), 1.0)[:, None]
+        start_pos, start_vel = pos, vel
+        vel = np.where(moving[:, None], new_vel, vel * 0.8)
+        pos = np.where(moving[:, None], pos + new_vel, pos)
+        if len(far):
+            self.step_far(far, dt[far], to_x, to_y, dist, max_speed, accel, start_pos, start_vel, pos, vel)
+
+        _consume(map(_set_vector, pos_objs, pos[:, 0].tolist(), pos[:, 1].tolist()))
+        _consume(map(_set_vector, map(_vel, members), vel[:, 0].tolist(), vel[:, 1].tolist()))
+        if len(zigzag_rows):
+            _write(zigzag_members, "zigzag_phase", phase[zigzag_rows].tolist())
+        cooldown -= dt
+        if band is not None:
+            # Вне экрана враги не стреляют: кулдаун доходит до 1 и ждёт возвращения в полный режим
+            cooldown = np.where(band > 0, np.maximum(cooldown, 1), cooldown)
+        _write(members, "cooldown", cooldown.tolist())
+        # Стреляют по порядку списка, как при поштучном обновлении
+        for i in np.flatnonzero(cooldown <= 0).tolist():
+            members[i].shoot(player_pos, enemy_bullets)
+        if invuln.any():
+            _write(members, "invuln_timer", np.maximum(invuln - dt, 0).tolist())
+
+    def mark(self, members, due, ticks):
+        # due (None — все) обновляются в этом тике. lod_tick пишется только при смене состояния:
+        # пропустивший тик враг получает тик последнего обновления, догнавший — теряет его
+        behind = self.behind
+        if due is None:
+            fresh = behind
+            stale = ()
+        else:
+            fresh = due & behind
+            stale = np.flatnonzero(~due & ~behind)
+        fresh = np.flatnonzero(fresh)
+        if len(fresh):
+            _write([members[i] for i in fresh.tolist()], "lod_tick", repeat(_UNSET, len(fresh)))
+            behind[fresh] = False
+        if len(stale):
+            _write([members[i] for i in stale.tolist()], "lod_tick", self.last[stale].tolist())
+            behind[stale] = True
+        if due is None:
+            self.last[:] = ticks
+        else:
+            self.last[due] = ticks
+
+    def catch_up(self, enemies, player_pos):
+        """Advance enemies that skipped ticks to the previous tick, before they leave the batch."""
+        behind = [enemy for enemy in enemies if getattr(enemy, "lod_tick", _UNSET) != _UNSET]
+        if not behind:
+            return
+        k = len(behind)
+        dt = game_clock.ticks - 1 - _column(behind, "lod_tick", k, np.int64)
+        _write(behind, "lod_tick", repeat(_UNSET, k))
+        rows = np.flatnonzero(dt > 0)
+        if not len(rows):
+            return
+        if len(rows) < k:
+            behind = [behind[i] for i in rows.tolist()]
+            dt = dt[rows]
+            k = len(behind)
+        pos_objs = list(map(_pos, behind))
+        start_pos = _vectors(pos_objs, k)
+        start_vel = _vectors(map(_vel, behind), k)
+        to_x = player_pos.x - start_pos[:, 0]
+        to_y = player_pos.y - start_pos[:, 1]
+        dist = np.hypot(to_x, to_y)
+        pos, vel = start_pos.copy(), start_vel.copy()
+        self.step_far(np.arange(k), dt, to_x, to_y, dist, _column(behind, "max_speed", k), _column(behind, "accel", k), start_pos, start_vel, pos, vel)
+        _consume(map(_set_vector, pos_objs, pos[:, 0].tolist(), pos[:, 1].tolist()))
+        _consume(map(_set_vector, map(_vel, behind), vel[:, 0].tolist(), vel[:, 1].tolist()))
+        # Таймеры — как в step для дальней полосы: вне экрана враг не стреляет
+        _write(behind, "cooldown", np.maximum(_column(behind, "cooldown", k, np.int64) - dt, 1).tolist())
+        _write(behind, "invuln_timer", np.maximum(_column(behind, "invuln_timer", k, np.int64) - dt, 0).tolist())
+        zigzag = [i for i, enemy in enumerate(behind) if enemy.type == "zigzag" and dist[i] > 1]
+        if zigzag:
+            members = [behind[i] for i in zigzag]
+            phase = _column(members, "zigzag_phase", len(members)) + 0.15 * dt[zigzag]
+            _write(members, "zigzag_phase", phase.tolist())
+
+    def step_far(self, rows, dt, to_x, to_y, dist, max_speed, accel, start_pos, start_vel, pos, vel):
+        # Упрощённо для дальних: прямо на игрока, разгон и путь за dt тиков одним шагом
+        old_vel = start_vel[rows]
+        moving = dist[rows] > 1
+        safe = np.where(moving, dist[rows], 1.0)
+        speed = max_speed[rows]
+        desired = np.stack([to_x[rows] / safe, to_y[rows] / safe], axis=1) * speed[:, None]
+        steer = desired - old_vel
+        length = np.hypot(steer[:, 0], steer[:, 1])
+        limit = accel[rows] * dt
+        steer *= np.where(length > limit, limit / np.where(length > 0, length, 1.0), 1.0)[:, None]
+        new_vel = old_vel + steer
+        length = np.hypot(new_vel[:, 0], new_vel[:, 1])
+        new_vel *= np.where(length > speed, speed / np.where(length > 0, length, 1.0), 1.0)[:, None]
+        vel[rows] = np.where(moving[:, None], new_vel, old_vel * 0.8 ** dt[:, None])
+        pos[rows] = start_pos[rows] + np.where(moving[:, None], new_vel * dt[:, None], 0.0)
+
+swarm = EnemySwarm()
+# Число врагов в каждой полосе LOD попадает в счётчики профайлера (оверлей F3, выгрузка)
+profiler.sources.append(swarm.counts)
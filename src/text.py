@@ -0,0 +1,54 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+class TextCache:
+    def __init__(self, max_surfaces=TEXT_CACHE_SIZE, **kwargs):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}  # (имя, размер, жирный) -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (шрифт, текст, цвет, сглаживание) -> поверхность, LRU
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def font(self, name="consolas", size=24, bold=False):
+        """SysFont lookup is slow, so every (name, size, bold) is resolved only once."""
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, name="consolas", size=24, bold=False, antialias=True):
+        key = ((name, size, bold), text, tuple(color), antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.font(name, size, bold).render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def clear(self):
+        self.fonts.clear()
+        self.surfaces.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "fonts": len(self.fonts),
+            "surfaces": len(self.surfaces),
+        }
+
+text_cache = TextCache()
@@ -0,0 +1,117 @@
+import pygame
+from settings import *
+
+class Interpolator:
+    def __init__(self, **kwargs):
+        # Списки состояния, объекты которых сглаживаются между тиками
+        self.lists = ["enemies", "bullets", "enemy_bullets", "bonuses", "explosions", "meteors", "blackholes"]
+        self.teleport_distance = TELEPORT_DISTANCE
+        # Позиции до последнего тика — параллельные списки, которые переиспользуются каждый тик,
+        # чтобы снимок не создавал новый Vector2 на каждый объект
+        self.objs = []
+        self.prev_x = []
+        self.prev_y = []
+        self.count = 0
+        # Векторы, сдвинутые apply(), и их настоящие координаты для restore()
+        self.saved = []
+        self.cur_x = []
+        self.cur_y = []
+        self.saved_count = 0
+        self.projectiles = None
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def snapshot(self, state):
+        """Remember positions before a simulation tick (call right before each tick)."""
+        n = 0
+        for key in ("player", "camera"):
+            obj = state.get(key)
+            if obj is not None:
+                n = self._remember(n, obj)
+        for key in self.lists:
+            for obj in state.get(key, ()):
+                n = self._remember(n, obj)
+        # Хвост от прошлого, более длинного снимка не должен держать удалённые объекты
+        objs = self.objs
+        for i in range(n, self.count):
+            objs[i] = None
+        self.count = n
+
+    def _remember(self, n, obj):
+        pos = getattr(obj, "pos", None)
+        if not isinstance(pos, pygame.Vector2):
+            return n
+        if n < len(self.objs):
+            self.objs[n] = obj
+            self.prev_x[n] = pos.x
+            self.prev_y[n] = pos.y
+        else:
+            self.objs.append(obj)
+            self.prev_x.append(pos.x)
+            self.prev_y.append(pos.y)
+        return n + 1
+
+    def apply(self, state, alpha):
+        """Move everything to prev + (cur - prev) * alpha for drawing; undo with restore()."""
+        alpha = max(0.0, min(1.0, alpha))
+        limit = self.teleport_distance * self.teleport_distance
+        objs, prev_x, prev_y = self.objs, self.prev_x, self.prev_y
+        saved, cur_x, cur_y = self.saved, self.cur_x, self.cur_y
+        m = 0
+        for i in range(self.count):
+            pos = getattr(objs[i], "pos", None)
+            if not isinstance(pos, pygame.Vector2):
+                continue
+            px, py = prev_x[i], prev_y[i]
+            cx, cy = pos.x, pos.y
+            dx, dy = cx - px, cy - py
+            # Телепорты и объекты из пула, занявшие новое место, не сглаживаем
+            if dx * dx + dy * dy > limit:
+                continue
+            pos.update(px + dx * alpha, py + dy * alpha)
+            if m < len(saved):
+                saved[m] = pos
+                cur_x[m] = cx
+                cur_y[m] = cy
+            else:
+                saved.append(pos)
+                cur_x.append(cx)
+                cur_y.append(cy)
+            m += 1
+        self.saved_count = m
+        self.projectiles = state.get("projectiles")
+        if self.projectiles is not None:
+            self.projectiles.alpha = alpha
+
+    def restore(self):
+        saved, cur_x, cur_y = self.saved, self.cur_x, self.cur_y
+        for i in range(self.saved_count):
+            saved[i].update(cur_x[i], cur_y[i])
+            saved[i] = None
+        self.saved_count = 0
+        if self.projectiles is not None:
+            self.projectiles.alpha = 1.0
+            self.projectiles = None
+
+class GameClock:
+    """Game time counted in simulation ticks; get_ticks() mirrors pygame.time.get_ticks()."""
+    def __init__(self, rate=SIM_RATE, **kwargs):
+        self.rate = rate
+        self.ticks = 0
+        # Моды могут добавить любые новые поля через kwargs
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def tick(self):
+        self.ticks += 1
+
+    def reset(self, ticks=0):
+        self.ticks = ticks
+
+    def get_ticks(self):
+        # Миллисекунды игрового времени: стоят на паузе и не зависят от скорости машины
+        return self.ticks * 1000 // self.rate
+
+interpolator = Interpolator()
+game_clock = GameClock()
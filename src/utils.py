@@ -1,43 +1,46 @@
 import pygame
-import random
+from rng import rng
 import math
 import sys
 from settings import *
+from starfield import starfield as default_starfield
+from text import text_cache
+from hud import hud as default_hud
+from spatial import SpatialHash
+from projectiles import PLAYER, ENEMY
+from pool import pools
+from timestep import game_clock
+from dispatch import dispatch
+from audio import audio
+from entities import entities, PLAYER_LAYER, PROJECTILE_LAYER
+from bullet import Bullet
+from enemy import Enemy
+from explosion import Explosion
+from bonus import Bonus
+from meteor import Meteor
+from blackhole import BlackHole
+
+# Сетка врагов переиспользуется между кадрами, чтобы не создавать словари заново
+enemy_grid = SpatialHash()
+# Набор методов-компонентов по классу объекта: проверка на класс, а не на каждый объект
+components = entities.components
 
 def draw_background(surface, camera_pos, config, game_api=None):
-    if game_api and "draw_background" in game_api and game_api["draw_background"] is not draw_background:
-        return game_api["draw_background"](surface, camera_pos, config, game_api)
+    if game_api and dispatch.draw_background is not draw_background:
+        return dispatch.draw_background(surface, camera_pos, config, game_api)
     surface.fill((10, 10, 30))
-    parallax_layers = [
-        (0.2, 80),
-        (0.4, 60),
-        (0.6, 40),
-        (0.8, 30),
-        (0.95, 20)
-    ]
-    for layer, num_stars in parallax_layers:
-        rng = random.Random(int(layer * 10000))
-        for i in range(num_stars):
-            star_seed = int(layer * 10000) + i
-            star_rng = random.Random(star_seed)
-            star_x = star_rng.uniform(0, config.width)
-            star_y = star_rng.uniform(0, config.height)
-            scolor = star_rng.choice(STAR_COLORS)
-            sradius = star_rng.randint(1, 2 if layer < 0.7 else 3)
-            offset_x = (camera_pos.x * (1 - layer)) % config.width
-            offset_y = (camera_pos.y * (1 - layer)) % config.height
-            screen_x = (star_x - offset_x) % config.width
-            screen_y = (star_y - offset_y) % config.height
-            pygame.draw.circle(surface, scolor, (int(screen_x), int(screen_y)), sradius)
+    # Слои звёзд отрисованы заранее, здесь только сдвиг на смещение камеры
+    starfield = dispatch.starfield if game_api else default_starfield
+    starfield.draw(surface, camera_pos, config)
 
 def draw_enemy_indicators(surface, camera_pos, enemies, config, game_api=None):
-    if game_api and "draw_enemy_indicators" in game_api and game_api["draw_enemy_indicators"] is not draw_enemy_indicators:
-        return game_api["draw_enemy_indicators"](surface, camera_pos, enemies, config, game_api)
+    if game_api and dispatch.draw_enemy_indicators is not draw_enemy_indicators:
+        return dispatch.draw_enemy_indicators(surface, camera_pos, enemies, config, game_api)
     center = pygame.Vector2(config.width // 2, config.height // 2)
     radius = min(config.width, config.height) // 2 - 40
     for enemy in enemies:
         # Используем кастомный draw, если есть
-        if hasattr(enemy, "draw") and hasattr(enemy.draw, "__call__") and hasattr(enemy, "config"):
+        if "draw" in components[enemy.__class__] and hasattr(enemy, "config"):
             enemy_screen = enemy.pos - camera_pos + center
             if not (0 <= enemy_screen.x < config.width and 0 <= enemy_screen.y < config.height):
                 direction = (enemy.pos - camera_pos)
@@ -54,30 +57,30 @@ def draw_enemy_indicators(surface, camera_pos, enemies, config, game_api=None):
                     ]
                     pygame.draw.polygon(surface, (255, 100, 0), triangle_points)
 
-def draw_lives(screen, lives, config, game_api=None):
-    if game_api and "draw_lives" in game_api and game_api["draw_lives"] is not draw_lives:
-        return game_api["draw_lives"](screen, lives, config, game_api)
+def draw_lives(screen, lives, config, game_api=None, origin=(0, 0)):
+    # origin — экранные координаты левого верхнего угла screen (колонка HUD)
+    if game_api and dispatch.draw_lives is not draw_lives:
+        return dispatch.draw_lives(screen, lives, config, game_api)
     for i in range(PLAYER_LIVES):
         color = PLAYER_COLORS[i] if i < lives else (40, 40, 40)
-        x = config.width - 40 - i * 40
-        pygame.draw.circle(screen, color, (x, 40), 16)
+        x = config.width - 40 - i * 40 - origin[0]
+        pygame.draw.circle(screen, color, (x, 40 - origin[1]), 16)
 
 def draw_menu(surface, text_lines, config, game_api=None):
-    if game_api and "draw_menu" in game_api and game_api["draw_menu"] is not draw_menu:
-        return game_api["draw_menu"](surface, text_lines, config, game_api)
+    if game_api and dispatch.draw_menu is not draw_menu:
+        return dispatch.draw_menu(surface, text_lines, config, game_api)
     surface.fill((10, 10, 30))
-    font = pygame.font.SysFont("consolas", 48)
     total_height = len(text_lines) * 60
     start_y = config.height // 2 - total_height // 2
     for i, line in enumerate(text_lines):
-        surf = font.render(line, True, (255, 255, 0))
+        surf = text_cache.render(line, (255, 255, 0), "consolas", 48)
         rect = surf.get_rect(center=(config.width // 2, start_y + i * 60))
         surface.blit(surf, rect)
     pygame.display.flip()
 
 def menu_loop(surface, lines, config, achievements, game_api=None):
-    if game_api and "menu_loop" in game_api and game_api["menu_loop"] is not menu_loop:
-        return game_api["menu_loop"](surface, lines, config, achievements, game_api)
+    if game_api and dispatch.menu_loop is not menu_loop:
+        return dispatch.menu_loop(surface, lines, config, achievements, game_api)
     menu_items = []
     for line in lines:
         if "начать" in line.lower():
@@ -86,14 +89,13 @@ def menu_loop(surface, lines, config, achievements, game_api=None):
             menu_items.append(line)
     menu_items += ["Сбросить прогресс", "Выйти"]
     selected = 0
-    font = pygame.font.SysFont("consolas", 48)
     total_height = len(menu_items) * 60
     start_y = config.height // 2 - total_height // 2
     while True:
         surface.fill((10, 10, 30))
         for i, line in enumerate(menu_items):
             color = (255, 255, 0) if i == selected else (180, 180, 180)
-            surf = font.render(line, True, color)
+            surf = text_cache.render(line, color, "consolas", 48)
             rect = surf.get_rect(center=(config.width // 2, start_y + i * 60))
             surface.blit(surf, rect)
         pygame.display.flip()
@@ -111,8 +113,7 @@ def menu_loop(surface, lines, config, achievements, game_api=None):
                         return "start"
                     elif menu_items[selected] == "Сбросить прогресс":
                         achievements.reset()
-                        font2 = pygame.font.SysFont("consolas", 36)
-                        surf2 = font2.render("Прогресс сброшен!", True, (255, 255, 0))
+                        surf2 = text_cache.render("Прогресс сброшен!", (255, 255, 0), "consolas", 36)
                         rect2 = surf2.get_rect(center=(config.width // 2, config.height // 2 + 200))
                         surface.blit(surf2, rect2)
                         pygame.display.flip()
@@ -125,29 +126,26 @@ def menu_loop(surface, lines, config, achievements, game_api=None):
                     return
 
 def select_difficulty(surface, config, current_difficulty, game_api=None):
-    if game_api and "select_difficulty" in game_api and game_api["select_difficulty"] is not select_difficulty:
-        return game_api["select_difficulty"](surface, config, current_difficulty, game_api)
+    if game_api and dispatch.select_difficulty is not select_difficulty:
+        return dispatch.select_difficulty(surface, config, current_difficulty, game_api)
     options = [
         "Легко",
         "Средне",
         "Сложно"
     ]
     selected = current_difficulty - 1 if 0 <= current_difficulty - 1 < len(options) else 0
-    font = pygame.font.SysFont("consolas", 48)
-    title_font = pygame.font.SysFont("consolas", 56, bold=True)
     while True:
         surface.fill((10, 10, 30))
-        title = title_font.render("Выберите сложность", True, (255, 255, 0))
+        title = text_cache.render("Выберите сложность", (255, 255, 0), "consolas", 56, bold=True)
         surface.blit(title, (config.width // 2 - title.get_width() // 2, config.height // 2 - 160))
         total_height = len(options) * 60
         start_y = config.height // 2 - total_height // 2
         for i, opt in enumerate(options):
             color = (255, 255, 0) if i == selected else (180, 180, 180)
-            surf = font.render(opt, True, color)
+            surf = text_cache.render(opt, color, "consolas", 48)
             rect = surf.get_rect(center=(config.width // 2, start_y + i * 60))
             surface.blit(surf, rect)
-        hint_font = pygame.font.SysFont("consolas", 28)
-        hint = hint_font.render("Навигация: стрелки/W/S  |  Выбор: ENTER/SPACE", True, (180, 180, 180))
+        hint = text_cache.render("Навигация: стрелки/W/S  |  Выбор: ENTER/SPACE", (180, 180, 180), "consolas", 28)
         surface.blit(hint, (config.width // 2 - hint.get_width() // 2, config.height // 2 + 120))
         pygame.display.flip()
         for event in pygame.event.get():
@@ -165,21 +163,19 @@ def select_difficulty(surface, config, current_difficulty, game_api=None):
                     return current_difficulty
 
 def draw_event_banner(surface, event_name, config, game_api=None):
-    if game_api and "draw_event_banner" in game_api and game_api["draw_event_banner"] is not draw_event_banner:
-        return game_api["draw_event_banner"](surface, event_name, config, game_api)
+    if game_api and dispatch.draw_event_banner is not draw_event_banner:
+        return dispatch.draw_event_banner(surface, event_name, config, game_api)
     if not event_name:
         return
-    font = pygame.font.SysFont("arial", 36, bold=True)
-    text = font.render(event_name, True, (255, 255, 80))
+    text = text_cache.render(event_name, (255, 255, 80), "arial", 36, bold=True)
     rect = text.get_rect(center=(config.width // 2, 32))
     pygame.draw.rect(surface, (30, 30, 30), rect.inflate(40, 16), border_radius=12)
     pygame.draw.rect(surface, (255, 255, 80), rect.inflate(40, 16), 2, border_radius=12)
     surface.blit(text, rect)
 
 def handle_player_shoot(state, mouse_pos, config, sounds, game_api=None):
-    if game_api and "handle_player_shoot" in game_api and game_api["handle_player_shoot"] is not handle_player_shoot:
-        return game_api["handle_player_shoot"](state, mouse_pos, config, sounds, game_api)
-    from bullet import Bullet
+    if game_api and dispatch.handle_player_shoot is not handle_player_shoot:
+        return dispatch.handle_player_shoot(state, mouse_pos, config, sounds, game_api)
     player = state["player"]
     screen_center = pygame.Vector2(config.width // 2, config.height // 2)
     mouse_offset = pygame.Vector2(mouse_pos) - screen_center
@@ -188,105 +184,173 @@ def handle_player_shoot(state, mouse_pos, config, sounds, game_api=None):
     if direction.length() > 0:
         bullet_color = player.color
         bullet_velocity = direction.normalize() * BULLET_SPEED - player.vel * 0.35
-        state["bullets"].append(Bullet(player.pos, bullet_velocity, bullet_velocity.length(), bullet_color, BULLET_LIFETIME, config))
+        if hasattr(state["bullets"], "spawn"):
+            state["bullets"].spawn(player.pos, bullet_velocity, bullet_velocity.length(), bullet_color, BULLET_LIFETIME, config)
+        else:
+            state["bullets"].append(pools.acquire(Bullet, player.pos, bullet_velocity, bullet_velocity.length(), bullet_color, BULLET_LIFETIME, config))
         player.vel -= direction.normalize() * 4
-        sounds["shoot"].play()
+        audio.play("shoot", sounds=sounds)
     state["camera"].kickback(-direction.normalize() * 12)
 
 def spawn_enemy(state, config, game_api=None):
-    if game_api and "spawn_enemy_func" in game_api and game_api["spawn_enemy_func"] is not spawn_enemy:
-        return game_api["spawn_enemy_func"](state, config, game_api)
-    from enemy import Enemy
+    if game_api and dispatch.spawn_enemy_func is not spawn_enemy:
+        return dispatch.spawn_enemy_func(state, config, game_api)
     player = state["player"]
-    angle = random.uniform(0, 2 * math.pi)
-    dist = random.randint(600, 1200)
+    angle = rng.uniform(0, 2 * math.pi)
+    dist = rng.randint(600, 1200)
     enemy_pos = player.pos + pygame.Vector2(math.cos(angle), math.sin(angle)) * dist
     enemy_types = ["default", "fast", "tank", "zigzag"]
-    enemy_type = random.choices(enemy_types, weights=[0.5, 0.2, 0.15, 0.15])[0]
+    enemy_type = rng.choices(enemy_types, weights=[0.5, 0.2, 0.15, 0.15])[0]
     state["enemies"].append(Enemy(enemy_pos, config, enemy_type, game_api=game_api))
 
+def kill_enemy(enemy, state, achievements, config, sounds):
+    exp_color = {
+        "fast": (100, 255, 255),
+        "tank": (180, 80, 80),
+        "zigzag": (180, 255, 100),
+        "default": (255, 180, 0)
+    }.get(getattr(enemy, "type", "default"), (255, 180, 0))
+    state["explosions"].append(pools.acquire(Explosion, enemy.pos, color=exp_color, type="big"))
+    state["enemies"].remove(enemy)
+    state["score"] += 1
+    achievements.stats["enemies_killed"] += 1
+    if getattr(enemy, "type", "") == "tank":
+        achievements.stats["tank_kills"] += 1
+    elif getattr(enemy, "type", "") == "fast":
+        achievements.stats["fast_kills"] += 1
+    elif getattr(enemy, "type", "") == "zigzag":
+        achievements.stats["zigzag_kills"] += 1
+    now = game_clock.get_ticks()
+    if now - achievements.stats["last_kill_time"] < 5000:
+        achievements.stats["combo_counter"] += 1
+    else:
+        achievements.stats["combo_counter"] = 1
+    achievements.stats["last_kill_time"] = now
+    achievements.stats["shots_hit"] += 1
+    audio.play("hit", enemy.pos, state["camera"].pos, sounds)
+    if rng.random() < 0.2:
+        state["bonuses"].append(pools.acquire(Bonus, enemy.pos, config))
+
+def handle_projectile_enemy_collisions(projectiles, state, achievements, config, sounds, killed_ids, game_api=None):
+    # Движение и истечение срока — одной операцией над массивами
+    expired = projectiles.step(PLAYER)
+    if len(expired):
+        state["explosions"].extend(pools.acquire(Explosion, p, color=(180, 180, 255), type="small") for p in projectiles.pos[expired].tolist())
+        projectiles.remove(expired)
+    # Поштучно проверяются только пули, попавшие в занятые врагами ячейки
+    consumed = []
+    for i in projectiles.candidates(PLAYER, enemy_grid):
+        bx, by = projectiles.pos[i].tolist()
+        for enemy in enemy_grid.query_point(pygame.Vector2(bx, by)):
+            if id(enemy) in killed_ids:
+                continue
+            dx, dy = enemy.pos.x - bx, enemy.pos.y - by
+            hit_r = enemy.radius + 5
+            if dx * dx + dy * dy < hit_r * hit_r:
+                consumed.append(i)
+                killed = enemy.is_hit(projectiles.view(i), game_api=game_api) if "is_hit" in components[enemy.__class__] else False
+                if killed:
+                    kill_enemy(enemy, state, achievements, config, sounds)
+                    killed_ids.add(id(enemy))
+                break
+    if consumed:
+        projectiles.remove(consumed)
+
 def handle_bullet_enemy_collisions(state, achievements, config, sounds, game_api=None):
-    if game_api and "handle_bullet_enemy_collisions" in game_api and game_api["handle_bullet_enemy_collisions"] is not handle_bullet_enemy_collisions:
-        return game_api["handle_bullet_enemy_collisions"](state, achievements, config, sounds, game_api)
-    from explosion import Explosion
-    from bonus import Bonus
+    if game_api and dispatch.handle_bullet_enemy_collisions is not handle_bullet_enemy_collisions:
+        return dispatch.handle_bullet_enemy_collisions(state, achievements, config, sounds, game_api)
+    # Враги за время обработки не двигаются: раскладываем их по сетке один раз.
+    # Каждый враг лежит во всех ячейках, которые задевает круг radius + 5,
+    # поэтому для пули достаточно одной ячейки, а порядок врагов в ней совпадает со списком.
+    enemy_grid.build(state["enemies"], margin=5)
+    killed_ids = set()
+    projectiles = state.get("projectiles")
+    if projectiles is not None and projectiles.count:
+        handle_projectile_enemy_collisions(projectiles, state, achievements, config, sounds, killed_ids, game_api)
+    # Пули-объекты (моды, свои классы) — прежним поштучным путём
     for bullet in state["bullets"][:]:
         # Используем кастомный update, если есть
-        if hasattr(bullet, "update") and callable(bullet.update):
+        has = components[bullet.__class__]
+        if "update" in has:
             bullet.update(game_api=game_api)
         if not bullet.is_alive(game_api=game_api):
-            state["explosions"].append(Explosion(bullet.pos, color=(180, 180, 255), type="small"))
+            state["explosions"].append(pools.acquire(Explosion, bullet.pos, color=(180, 180, 255), type="small"))
             state["bullets"].remove(bullet)
+            pools.release(bullet)
             continue
-        for enemy in state["enemies"][:]:
-            hit = enemy.pos.distance_to(bullet.pos) < (enemy.radius + 5)
+        bx, by = bullet.pos.x, bullet.pos.y
+        for enemy in enemy_grid.query_point(bullet.pos):
+            if id(enemy) in killed_ids:
+                continue
+            dx, dy = enemy.pos.x - bx, enemy.pos.y - by
+            hit_r = enemy.radius + 5
+            hit = dx * dx + dy * dy < hit_r * hit_r
             if hit:
                 if bullet in state["bullets"]:
                     state["bullets"].remove(bullet)
                 # Используем кастомный is_hit, если есть
-                killed = enemy.is_hit(bullet, game_api=game_api) if hasattr(enemy, "is_hit") else False
+                killed = enemy.is_hit(bullet, game_api=game_api) if "is_hit" in components[enemy.__class__] else False
                 if killed:
-                    exp_color = {
-                        "fast": (100, 255, 255),
-                        "tank": (180, 80, 80),
-                        "zigzag": (180, 255, 100),
-                        "default": (255, 180, 0)
-                    }.get(getattr(enemy, "type", "default"), (255, 180, 0))
-                    state["explosions"].append(Explosion(enemy.pos, color=exp_color, type="big"))
-                    state["enemies"].remove(enemy)
-                    state["score"] += 1
-                    achievements.stats["enemies_killed"] += 1
-                    if getattr(enemy, "type", "") == "tank":
-                        achievements.stats["tank_kills"] += 1
-                    elif getattr(enemy, "type", "") == "fast":
-                        achievements.stats["fast_kills"] += 1
-                    elif getattr(enemy, "type", "") == "zigzag":
-                        achievements.stats["zigzag_kills"] += 1
-                    now = pygame.time.get_ticks()
-                    if now - achievements.stats["last_kill_time"] < 5000:
-                        achievements.stats["combo_counter"] += 1
-                    else:
-                        achievements.stats["combo_counter"] = 1
-                    achievements.stats["last_kill_time"] = now
-                    achievements.stats["shots_hit"] += 1
-                    sounds["hit"].play()
-                    if random.random() < 0.2:
-                        state["bonuses"].append(Bonus(enemy.pos, config))
+                    kill_enemy(enemy, state, achievements, config, sounds)
+                    killed_ids.add(id(enemy))
+                pools.release(bullet)
                 break
 
 def handle_enemy_bullet_player_collisions(state, achievements, sounds, game_api=None):
-    if game_api and "handle_enemy_bullet_player_collisions" in game_api and game_api["handle_enemy_bullet_player_collisions"] is not handle_enemy_bullet_player_collisions:
-        return game_api["handle_enemy_bullet_player_collisions"](state, achievements, sounds, game_api)
-    from explosion import Explosion
+    if game_api and dispatch.handle_enemy_bullet_player_collisions is not handle_enemy_bullet_player_collisions:
+        return dispatch.handle_enemy_bullet_player_collisions(state, achievements, sounds, game_api)
     player = state["player"]
+    projectiles = state.get("projectiles")
+    if projectiles is not None and projectiles.count:
+        expired = projectiles.step(ENEMY)
+        if len(expired):
+            state["explosions"].extend(pools.acquire(Explosion, p, color=RED, type="small") for p in projectiles.pos[expired].tolist())
+            projectiles.remove(expired)
+        if player.lives > 0:
+            hits = projectiles.hits(ENEMY, player.pos, player.radius)
+            if len(hits):
+                projectiles.remove(hits)
+                for _ in range(len(hits)):
+                    if not (hasattr(player, "has_effect") and player.has_effect("shield")):
+                        if hasattr(player, "take_damage") and player.take_damage():
+                            state["camera"].shake(strength=24, duration=18)
+                            achievements.stats["damage_taken"] += 1
+                            state["explosions"].append(pools.acquire(Explosion, player.pos, color=(255, 80, 80), type="hollow"))
+                            audio.play("player_hit", sounds=sounds)
+                    if player.lives <= 0:
+                        return "dead"
     for bullet in state["enemy_bullets"][:]:
-        if hasattr(bullet, "update") and callable(bullet.update):
+        has = components[bullet.__class__]
+        if "update" in has:
             bullet.update(game_api=game_api)
         if not bullet.is_alive(game_api=game_api):
-            state["explosions"].append(Explosion(bullet.pos, color=RED, type="small"))
+            state["explosions"].append(pools.acquire(Explosion, bullet.pos, color=RED, type="small"))
             state["enemy_bullets"].remove(bullet)
-        elif bullet.pos.distance_to(player.pos) < (player.radius + 5) and player.lives > 0:
+            pools.release(bullet)
+        elif bullet.pos.distance_squared_to(player.pos) < (player.radius + 5) ** 2 and player.lives > 0:
             state["enemy_bullets"].remove(bullet)
+            pools.release(bullet)
             if not (hasattr(player, "has_effect") and player.has_effect("shield")):
                 if hasattr(player, "take_damage") and player.take_damage():
                     state["camera"].shake(strength=24, duration=18)
                     achievements.stats["damage_taken"] += 1
-                    state["explosions"].append(Explosion(player.pos, color=(255, 80, 80), type="hollow"))
-                    sounds["player_hit"].play()
+                    state["explosions"].append(pools.acquire(Explosion, player.pos, color=(255, 80, 80), type="hollow"))
+                    audio.play("player_hit", sounds=sounds)
             if player.lives <= 0:
                 return "dead"
     return None
 
 def handle_bonuses(state, achievements, sounds, game_api=None):
-    if game_api and "handle_bonuses" in game_api and game_api["handle_bonuses"] is not handle_bonuses:
-        return game_api["handle_bonuses"](state, achievements, sounds, game_api)
-    from explosion import Explosion
+    if game_api and dispatch.handle_bonuses is not handle_bonuses:
+        return dispatch.handle_bonuses(state, achievements, sounds, game_api)
     player = state["player"]
     for bonus in state["bonuses"][:]:
-        if hasattr(bonus, "update") and callable(bonus.update):
+        has = components[bonus.__class__]
+        if "update" in has:
             bonus.update(player, game_api=game_api)
-        if not (hasattr(bonus, "is_alive") and bonus.is_alive(game_api=game_api)):
+        if "is_alive" not in has or not bonus.is_alive(game_api=game_api):
             state["bonuses"].remove(bonus)
+            pools.release(bonus)
         elif player.pos.distance_to(bonus.pos) < (player.radius + bonus.radius):
             if bonus.type == "heal" and player.lives < PLAYER_LIVES:
                 if hasattr(player, "apply_effect"):
@@ -296,42 +360,38 @@ def handle_bonuses(state, achievements, sounds, game_api=None):
                 if hasattr(player, "apply_effect"):
                     player.apply_effect("shield", duration=300)
                 achievements.stats["shield_collected"] += 1
-            state["explosions"].append(Explosion(bonus.pos, color=(100, 200, 255) if bonus.type == "shield" else (100, 255, 100), type="hollow"))
-            sounds["bonus"].play()
+            state["explosions"].append(pools.acquire(Explosion, bonus.pos, color=(100, 200, 255) if bonus.type == "shield" else (100, 255, 100), type="hollow"))
+            audio.play("bonus", sounds=sounds)
             achievements.stats["bonuses_collected"] += 1
             state["camera"].shake(strength=10, duration=10)
             state["bonuses"].remove(bonus)
+            pools.release(bonus)
 
 def handle_explosions(state, game_api=None):
-    if game_api and "handle_explosions" in game_api and game_api["handle_explosions"] is not handle_explosions:
-        return game_api["handle_explosions"](state, game_api)
+    if game_api and dispatch.handle_explosions is not handle_explosions:
+        return dispatch.handle_explosions(state, game_api)
     for explosion in state["explosions"][:]:
-        if hasattr(explosion, "update") and callable(explosion.update):
+        has = components[explosion.__class__]
+        if "update" in has:
             explosion.update(game_api=game_api)
-        if not (hasattr(explosion, "is_alive") and explosion.is_alive(game_api=game_api)):
+        if "is_alive" not in has or not explosion.is_alive(game_api=game_api):
             state["explosions"].remove(explosion)
+            pools.release(explosion)
 
 def handle_events(state, achievements, game_api=None):
-    if game_api and "handle_events" in game_api and game_api["handle_events"] is not handle_events:
-        return game_api["handle_events"](state, achievements, game_api)
+    if game_api and dispatch.handle_events is not handle_events:
+        return dispatch.handle_events(state, achievements, game_api)
     cam_w, cam_h = state["player"].config.width, state["player"].config.height
     camera_pos = state["camera"].get()
     player = state["player"]
-    Meteor = None
-    BlackHole = None
-    if game_api:
-        Meteor = game_api.get("Meteor")
-        BlackHole = game_api.get("BlackHole")
-    if not Meteor:
-        from meteor import Meteor
-    if not BlackHole:
-        from blackhole import BlackHole
+    meteor_cls = (dispatch.Meteor if game_api else None) or Meteor
+    blackhole_cls = (dispatch.BlackHole if game_api else None) or BlackHole
 
     if state["event_timer"] <= 0:
-        event_type = random.choice(["meteor_shower", "blackhole"])
+        event_type = rng.choice(["meteor_shower", "blackhole"])
         state["event_active"] = event_type
-        state["event_duration"] = random.randint(180, 240)
-        state["event_timer"] = random.randint(1200, 2000)
+        state["event_duration"] = rng.randint(180, 240)
+        state["event_timer"] = rng.randint(1200, 2000)
         if event_type == "meteor_shower":
             state["current_event_name"] = "Метеоритный дождь!"
         else:
@@ -342,17 +402,17 @@ def handle_events(state, achievements, game_api=None):
     if state["event_active"] == "meteor_shower":
         if state["event_duration"] > 0:
             state["event_duration"] -= 1
-            if random.random() < 0.25:
+            if rng.random() < 0.25:
                 attempts = 0
                 while attempts < 10:
-                    mx = camera_pos.x - cam_w // 2 + random.uniform(40, cam_w - 80)
+                    mx = camera_pos.x - cam_w // 2 + rng.uniform(40, cam_w - 80)
                     my = camera_pos.y - cam_h // 2 + 10
                     meteor_pos = pygame.Vector2(mx, my)
                     if abs(meteor_pos.x - player.pos.x) > player.radius * 2:
-                        meteor = Meteor(player.config, meteor_pos)
-                        meteor.radius = random.randint(28, 48)
+                        meteor = meteor_cls(player.config, meteor_pos)
+                        meteor.radius = rng.randint(28, 48)
                         meteor.angle = 0
-                        meteor.speed = random.uniform(6, 10)
+                        meteor.speed = rng.uniform(6, 10)
                         state["meteors"].append(meteor)
                         break
                     attempts += 1
@@ -366,15 +426,15 @@ def handle_events(state, achievements, game_api=None):
     if state["event_active"] == "blackhole":
         if state["event_duration"] > 0:
             state["event_duration"] -= 1
-            if len(state["blackholes"]) < 2 and random.random() < 0.04:
+            if len(state["blackholes"]) < 2 and rng.random() < 0.04:
                 attempts = 0
                 while attempts < 10:
-                    bx = camera_pos.x - cam_w // 2 + random.uniform(100, cam_w - 200)
-                    by = camera_pos.y - cam_h // 2 + random.uniform(100, cam_h - 200)
+                    bx = camera_pos.x - cam_w // 2 + rng.uniform(100, cam_w - 200)
+                    by = camera_pos.y - cam_h // 2 + rng.uniform(100, cam_h - 200)
                     bh_pos = pygame.Vector2(bx, by)
                     if bh_pos.distance_to(player.pos) > 200:
-                        bh = BlackHole(bh_pos, player.config)
-                        bh.radius = random.randint(90, 140)
+                        bh = blackhole_cls(bh_pos, player.config)
+                        bh.radius = rng.randint(90, 140)
                         state["blackholes"].append(bh)
                         break
                     attempts += 1
@@ -387,15 +447,15 @@ def handle_events(state, achievements, game_api=None):
 
     # Обновление и удаление метеоров
     for meteor in state["meteors"][:]:
-        if hasattr(meteor, "update") and callable(meteor.update):
+        has = components[meteor.__class__]
+        if "update" in has:
             meteor.update(game_api=game_api)
         if meteor.pos.y - meteor.radius > camera_pos.y + cam_w // 2 + 100:
             state["meteors"].remove(meteor)
-        elif player.pos.distance_to(meteor.pos) < (meteor.radius + player.radius):
+        elif player.pos.distance_squared_to(meteor.pos) < (meteor.radius + player.radius) ** 2:
             if not (hasattr(player, "has_effect") and player.has_effect("shield")):
                 if hasattr(player, "take_damage") and player.take_damage(amount=1, source="meteor"):
-                    from explosion import Explosion
-                    state["explosions"].append(Explosion(meteor.pos, color=(180, 180, 180), type="big"))
+                    state["explosions"].append(pools.acquire(Explosion, meteor.pos, color=(180, 180, 180), type="big"))
                     achievements.stats["damage_taken"] += 1
                     state["camera"].shake(strength=18, duration=12)
                     if player.lives <= 0:
@@ -404,9 +464,10 @@ def handle_events(state, achievements, game_api=None):
 
     # Обновление и удаление чёрных дыр
     for bh in state["blackholes"][:]:
-        if hasattr(bh, "update") and callable(bh.update):
+        has = components[bh.__class__]
+        if "update" in has:
             bh.update(game_api=game_api)
-        if hasattr(bh, "attract") and callable(bh.attract):
+        if "attract" in has:
             bh.attract(player, game_api=game_api)
         cam_w, cam_h = player.config.width, player.config.height
         draw_x = bh.pos.x - camera_pos.x + cam_w // 2
@@ -414,18 +475,17 @@ def handle_events(state, achievements, game_api=None):
         if not (0 <= draw_x < cam_w and 0 <= draw_y < cam_h):
             state["blackholes"].remove(bh)
             continue
-        if not (hasattr(bh, "is_alive") and bh.is_alive(game_api=game_api)):
+        if "is_alive" not in has or not bh.is_alive(game_api=game_api):
             state["blackholes"].remove(bh)
             continue
         player.vel += (bh.pos - player.pos).normalize() * 0.15
-        if player.pos.distance_to(bh.pos) < 60:
+        if player.pos.distance_squared_to(bh.pos) < 3600:
             if state.get("blackhole_damage_timer", 0) <= 0:
                 if not (hasattr(player, "has_effect") and player.has_effect("shield")):
                     if hasattr(player, "take_damage") and player.take_damage(amount=1, source="blackhole"):
-                        from explosion import Explosion
                         state["camera"].shake(strength=24, duration=18)
                         achievements.stats["damage_taken"] += 1
-                        state["explosions"].append(Explosion(player.pos, color=(80, 80, 255), type="hollow"))
+                        state["explosions"].append(pools.acquire(Explosion, player.pos, color=(80, 80, 255), type="hollow"))
                         if player.lives <= 0:
                             return "dead"
                 state["blackhole_damage_timer"] = 60
@@ -433,35 +493,53 @@ def handle_events(state, achievements, game_api=None):
             state["blackhole_damage_timer"] -= 1
 
 def draw_game(state, achievements, screen, config, game_api):
-    game_api["draw_background"](screen, state["camera"].get(), config, game_api)
-    for bonus in state["bonuses"]:
-        if hasattr(bonus, "draw") and callable(bonus.draw):
-            bonus.draw(screen, state["camera"].get(), state["player"], game_api)
-    for explosion in state["explosions"]:
-        if hasattr(explosion, "draw") and callable(explosion.draw):
-            explosion.draw(screen, state["camera"].get(), config, game_api)
-    if hasattr(state["player"], "draw") and callable(state["player"].draw):
-        state["player"].draw(screen, state["camera"].get(), pygame.mouse.get_pos(), game_api)
-    for enemy in state["enemies"]:
-        if hasattr(enemy, "draw") and callable(enemy.draw):
-            enemy.draw(screen, state["camera"].get(), game_api)
-    for bullet in state["bullets"]:
-        if hasattr(bullet, "draw") and callable(bullet.draw):
-            bullet.draw(screen, state["camera"].get(), game_api)
-    for bullet in state["enemy_bullets"]:
-        if hasattr(bullet, "draw") and callable(bullet.draw):
-            bullet.draw(screen, state["camera"].get(), game_api)
-    for meteor in state["meteors"]:
-        if hasattr(meteor, "draw") and callable(meteor.draw):
-            meteor.draw(screen, state["camera"].get(), game_api)
-    for bh in state["blackholes"]:
-        if hasattr(bh, "draw") and callable(bh.draw):
-            bh.draw(screen, state["camera"].get(), game_api)
-    game_api["draw_enemy_indicators"](screen, state["camera"].get(), state["enemies"], config, game_api)
-    game_api["draw_lives"](screen, state["player"].lives, config, game_api)
-    achievements.draw_stats(screen)
-    achievements.draw_achievements(screen)
+    camera_pos = state["camera"].get()
+    entities.begin_frame()
+    dispatch.draw_background(screen, camera_pos, config, game_api)
+    player = state["player"]
+    entities.draw(screen, camera_pos, state, config, game_api, (None, PLAYER_LAYER))
+    draw = getattr(player, "draw", None)
+    if draw is not None:
+        draw(screen, camera_pos, pygame.mouse.get_pos(), game_api)
+    entities.draw(screen, camera_pos, state, config, game_api, (PLAYER_LAYER, PROJECTILE_LAYER))
+    if "projectiles" in state:
+        projectiles = state["projectiles"]
+        projectiles.draw(screen, camera_pos, config)
+        entities.note(projectiles.drawn, projectiles.count - projectiles.drawn)
+    entities.draw(screen, camera_pos, state, config, game_api, (PROJECTILE_LAYER, None))
+    dispatch.draw_enemy_indicators(screen, camera_pos, state["enemies"], config, game_api)
+    # Жизни, статистика и достижения собраны в один слой и перерисовываются только при изменениях.
+    # Заменённый модом draw_lives может быть анимированным, поэтому рисуется каждый кадр.
+    hud = dispatch.hud
+    if dispatch.draw_lives is draw_lives:
+        hud.draw(screen, achievements, player.lives, config, draw_lives, game_api)
+    else:
+        dispatch.draw_lives(screen, player.lives, config, game_api)
+        hud.draw(screen, achievements, player.lives, config, None, game_api)
     achievements.update_popups()
     achievements.draw_popups(screen)
-    game_api["draw_event_banner"](screen, state.get("current_event_name", ""), config, game_api)
-    pygame.display.flip()
\ No newline at end of file
+    dispatch.draw_event_banner(screen, state.get("current_event_name", ""), config, game_api)
+    pygame.display.flip()
+
+# Реализации ядра, которые подставляются, пока мод не заменил их в game_api
+dispatch.register(
+    draw_game=draw_game,
+    handle_events=handle_events,
+    handle_player_shoot=handle_player_shoot,
+    spawn_enemy_func=spawn_enemy,
+    handle_bullet_enemy_collisions=handle_bullet_enemy_collisions,
+    handle_enemy_bullet_player_collisions=handle_enemy_bullet_player_collisions,
+    handle_bonuses=handle_bonuses,
+    handle_explosions=handle_explosions,
+    draw_background=draw_background,
+    draw_enemy_indicators=draw_enemy_indicators,
+    draw_lives=draw_lives,
+    draw_menu=draw_menu,
+    menu_loop=menu_loop,
+    select_difficulty=select_difficulty,
+    draw_event_banner=draw_event_banner,
+    starfield=default_starfield,
+    hud=default_hud,
+    Meteor=Meteor,
+    BlackHole=BlackHole,
+)